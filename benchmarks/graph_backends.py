@@ -0,0 +1,170 @@
+"""
+Parity check and micro-benchmark for the graph backends.
+
+Builds a synthetic cohort, writes it as a score sheet, loads it into the
+embedded backend and checks that the score snapshot answers every read the
+same way. With --neo4j the live graph at NEO4J_URI is compared too; import
+the same sheet first (--write-csv, then student_graph.py).
+
+    python -m benchmarks.graph_backends --students 2000
+    python -m benchmarks.graph_backends --students 2000 --write-csv /tmp/cohort.csv
+    python -m benchmarks.graph_backends --students 2000 --neo4j
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.synthetic import DEFAULT_TOPICS, synthetic_scores, to_score_sheet
+from sahayak.tools.graph_backends import EmbeddedBackend, GraphBackend, Neo4jBackend
+from sahayak.tools.score_snapshot import ScoreSnapshot
+
+GRADE = "6"
+TOPICS = DEFAULT_TOPICS[:4]
+MISSING_TOPIC = "Volcanoes"
+
+
+def _close(a, b) -> bool:
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def _same_rows(a: List[Dict[str, Any]], b: List[Dict[str, Any]], keys) -> bool:
+    return len(a) == len(b) and all(
+        all(_close(x.get(key), y.get(key)) for key in keys) for x, y in zip(a, b)
+    )
+
+
+def _top_k(rows) -> List[Any]:
+    # Students tied on score may come back in any order; only scores must agree
+    return [row["score"] for row in rows]
+
+
+def _team(rows) -> Dict[Any, Any]:
+    return {
+        row["topic"]: (
+            row["topic_exists"],
+            {s["roll_no"]: round(s["score"], 9) for s in row["scores"]},
+        )
+        for row in rows
+    }
+
+
+class SnapshotReads:
+    """The score snapshot behind the backend read signatures."""
+
+    name = "snapshot"
+
+    def __init__(self, snapshot: ScoreSnapshot):
+        self.snapshot = snapshot
+
+    async def top_students(self, topic, grade, k):
+        return self.snapshot.top_students(topic, grade, k)
+
+    async def topic_statistics(self, topics, grades):
+        return self.snapshot.topic_statistics(topics, grades)
+
+    async def team_scores(self, topics, grade):
+        return self.snapshot.team_scores(topics, grade)
+
+
+STAT_KEYS = ["topic", "grade", "topic_exists", "total_scores", "average_score", "min_score", "max_score"]
+
+CHECKS = {
+    "top_students": (
+        lambda b: b.top_students(TOPICS[0], GRADE, 5),
+        lambda a, b: _top_k(a) == _top_k(b),
+    ),
+    "top_students_no_grade": (
+        lambda b: b.top_students(TOPICS[0], None, 5),
+        lambda a, b: _top_k(a) == _top_k(b),
+    ),
+    "topic_statistics": (
+        lambda b: b.topic_statistics(TOPICS + [MISSING_TOPIC], [GRADE]),
+        lambda a, b: _same_rows(a, b, STAT_KEYS),
+    ),
+    "topic_statistics_all_grades": (
+        lambda b: b.topic_statistics(TOPICS[:2], None),
+        lambda a, b: _same_rows(a, b, STAT_KEYS),
+    ),
+    "team_scores": (
+        lambda b: b.team_scores(TOPICS[:2] + [MISSING_TOPIC], GRADE),
+        lambda a, b: _team(a) == _team(b),
+    ),
+}
+
+
+async def _timed(coro_fn, backend, repeat: int):
+    result = await coro_fn(backend)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await coro_fn(backend)
+    return result, (time.perf_counter() - started) / repeat * 1e6
+
+
+async def compare(reference: GraphBackend, others: List[Any], repeat: int) -> bool:
+    ok = True
+    header = "".join(f"{b.name + ' µs':>14}" for b in [reference] + others)
+    print(f"{'read':<30}{header}  parity")
+    for name, (call, same) in CHECKS.items():
+        expected, ref_micros = await _timed(call, reference, repeat)
+        cells, verdicts = [f"{ref_micros:>14.0f}"], []
+        for other in others:
+            actual, micros = await _timed(call, other, repeat)
+            cells.append(f"{micros:>14.0f}")
+            verdicts.append(same(expected, actual))
+        ok = ok and all(verdicts)
+        print(f"{name:<30}{''.join(cells)}  {'✅' if all(verdicts) else '❌'}")
+
+    roll_nos = list(range(1, 51))
+    expected = {frozenset(p) for p in await reference.similar_pairs(roll_nos, GRADE)}
+    for other in others:
+        if isinstance(other, GraphBackend):
+            actual = {frozenset(p) for p in await other.similar_pairs(roll_nos, GRADE)}
+            same = expected == actual
+            ok = ok and same
+            print(f"{'similar_pairs (' + other.name + ')':<30}{len(actual):>14} pairs  {'✅' if same else '❌'}")
+    return ok
+
+
+async def run(students: int, repeat: int, neo4j: bool, csv_path: str) -> bool:
+    frame = synthetic_scores(students, topics=TOPICS, tests=["Unit Test 1", "Unit Test 2"], grade=GRADE)
+    to_score_sheet(frame).to_csv(csv_path, index=False)
+
+    started = time.perf_counter()
+    embedded = EmbeddedBackend.from_csv(csv_path, grade=GRADE)
+    print(f"👥 {students:,} students loaded into the embedded backend in {time.perf_counter() - started:.2f}s")
+
+    snapshot = ScoreSnapshot.from_frame(await embedded.snapshot_frame())
+    others: List[Any] = [SnapshotReads(snapshot)]
+    if neo4j:
+        others.append(Neo4jBackend())
+    try:
+        return await compare(embedded, others, repeat)
+    finally:
+        for backend in [embedded] + others:
+            if isinstance(backend, GraphBackend):
+                await backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--neo4j", action="store_true", help="also compare the live graph")
+    parser.add_argument("--write-csv", help="keep the generated score sheet at this path")
+    args = parser.parse_args()
+
+    csv_path = args.write_csv or os.path.join(tempfile.mkdtemp(), "cohort.csv")
+    ok = asyncio.run(run(args.students, args.repeat, args.neo4j, csv_path))
+    print("✅ backends agree" if ok else "❌ backends disagree")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
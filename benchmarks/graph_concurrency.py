@@ -0,0 +1,75 @@
+"""
+Concurrency check for GraphVisualizer.run_async.
+
+Gives the tool a fake backend whose queries sleep for a random latency, fires N analytics calls at once and checks that the wall
+time tracks the slowest call rather than the sum of all of them.
+
+    python -m benchmarks.graph_concurrency --calls 20
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from sahayak.tools.graph import GraphVisualizer
+from sahayak.tools.graph_backends import GraphBackend
+from sahayak.tools.graph_cache import graph_cache
+
+
+class FakeBackend(GraphBackend):
+    """Answers every query after a per-call latency drawn up front."""
+
+    name = "fake"
+
+    def __init__(self, latencies):
+        self.pending = iter(latencies)
+
+    async def data_version(self):
+        return 0
+
+    async def top_students(self, topic, grade, k):
+        await asyncio.sleep(next(self.pending))
+        return [{"student_name": "Tanya Patel", "score": 10}]
+
+    async def topic_statistics(self, topics, grades):
+        raise NotImplementedError
+
+    async def team_scores(self, topics, grade):
+        raise NotImplementedError
+
+    async def similar_pairs(self, roll_nos, grade):
+        raise NotImplementedError
+
+    async def snapshot_frame(self):
+        raise NotImplementedError
+
+
+async def main(calls: int, min_latency: float, max_latency: float):
+    latencies = [random.uniform(min_latency, max_latency) for _ in range(calls)]
+    tool = GraphVisualizer(backend=FakeBackend(latencies))
+    args = {"user_intent": "find_highest", "topic_a": "light", "grade": "6"}
+    # Every call must reach the backend
+    graph_cache.enabled = False
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(tool.run_async(args=args, tool_context=None) for _ in range(calls))
+    )
+    wall = time.perf_counter() - started
+
+    print(f"calls:          {calls}")
+    print(f"slowest call:   {max(latencies) * 1000:.1f} ms")
+    print(f"sum of calls:   {sum(latencies) * 1000:.1f} ms")
+    print(f"wall time:      {wall * 1000:.1f} ms")
+    assert wall < max(latencies) * 1.5, "calls did not overlap"
+    print("✅ calls overlapped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--min-latency", type=float, default=0.05)
+    parser.add_argument("--max-latency", type=float, default=0.3)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.min_latency, args.max_latency))
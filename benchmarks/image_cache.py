@@ -0,0 +1,87 @@
+"""
+Check for the content-addressed slide image cache, with a fake Gemini client.
+
+Regenerating a deck should make no model calls and still save every image
+as an artifact; a reworded-only-in-case/spacing description should hit;
+identical descriptions in one deck should share one call; a waiter whose
+leader is cancelled should generate the image itself; and the cache
+directory should stay under its size limit.
+
+    python -m benchmarks.image_cache --slides 8
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from benchmarks.slide_images import FakeModels, FakeToolContext
+from sahayak.tools import image, image_variants
+from sahayak.tools.image_cache import ImageCache
+
+
+async def run_deck(descriptions, latency=0.2):
+    models = FakeModels({d: latency for d in descriptions})
+    image._client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    context = FakeToolContext([{"heading": f"Slide {i}", "image_description": d} for i, d in enumerate(descriptions)])
+    started = time.perf_counter()
+    result = await image.create_slide_images(context)
+    assert result["status"] == "success", result
+    return models.calls, context, time.perf_counter() - started
+
+
+async def main(slides: int, workdir: str):
+    image.image_cache = ImageCache(directory=os.path.join(workdir, "cache"))
+    image_variants.IMAGE_VARIANTS_ENABLED = False
+    deck = [f"Diagram {i} of the water cycle" for i in range(slides)]
+
+    cold_calls, _, cold = await run_deck(deck)
+    warm_calls, context, warm = await run_deck(deck)
+    assert cold_calls == slides and warm_calls == 0, (cold_calls, warm_calls)
+    assert len(context.artifacts) == slides, context.artifacts
+    print(f"✅ regenerated deck: {warm_calls} model calls, {len(context.artifacts)} artifacts "
+          f"({cold:.2f}s cold, {warm:.2f}s warm)")
+
+    calls, _, _ = await run_deck(["  DIAGRAM 0 of the   water cycle "])
+    assert calls == 0, calls
+    print("✅ case and whitespace changes hit the cache")
+
+    calls, context, _ = await run_deck(["A banyan tree at school"] * 5)
+    assert calls == 1 and len(context.artifacts) == 5, (calls, context.artifacts)
+    print("✅ 5 concurrent slides with one description share 1 model call")
+
+    cache = ImageCache(directory=os.path.join(workdir, "cancel"))
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return b"picture"
+
+    leader = asyncio.create_task(cache.get_or_generate("model", "a cancelled picture", generate))
+    await asyncio.sleep(0.05)
+    waiter = asyncio.create_task(cache.get_or_generate("model", "a cancelled picture", generate))
+    await asyncio.sleep(0.05)
+    leader.cancel()
+    data, _ = await waiter
+    assert leader.cancelled() and data == b"picture" and len(calls) == 2, (data, calls)
+    print("✅ a waiter whose leader is cancelled generates the image itself")
+
+    small = ImageCache(directory=os.path.join(workdir, "small"), max_bytes=3 * 100)
+    image.image_cache = small
+    await run_deck([f"picture {i}" for i in range(10)])
+    on_disk = sum(len(files) for _, _, files in os.walk(small.directory))
+    assert small.stats()["bytes"] <= small.max_bytes and on_disk == small.stats()["entries"], small.stats()
+    print(f"✅ size limit holds: {on_disk} images on disk, {small.evictions} evicted")
+    print(f"cache stats:      {small.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slides", type=int, default=8)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        asyncio.run(main(args.slides, workdir))
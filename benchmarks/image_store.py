@@ -0,0 +1,88 @@
+"""
+Check for the slide image store, with fake Gemini clients.
+
+Two sessions building decks at once must not overwrite each other's
+images, saving must not wait for the local mirror, the janitor must bring
+the mirror under its quota oldest-first, and create_slide_images_test must
+leave the working directory alone.
+
+    python -m benchmarks.image_store --slides 6
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from benchmarks.slide_images import PNG, FakeModels, FakeToolContext
+from sahayak.tools import image, image_variants
+from sahayak.tools.image_cache import image_cache
+from sahayak.tools.image_store import ImageStore
+
+
+async def build_deck(session_id, slides):
+    descriptions = [f"{session_id} picture {i}" for i in range(slides)]
+    context = FakeToolContext(
+        [{"heading": f"Slide {i}", "image_description": d} for i, d in enumerate(descriptions)], session_id
+    )
+    result = await image.create_slide_images(context)
+    assert result["status"] == "success", result
+    return context
+
+
+async def main(slides: int, workdir: str):
+    image_cache.enabled = False
+    image_variants.IMAGE_VARIANTS_ENABLED = False
+    store = image.image_store = ImageStore(mirror_dir=os.path.join(workdir, "mirror"))
+    latencies = {f"{s} picture {i}": 0.05 for s in ("alice", "bob") for i in range(slides)}
+    image._client = SimpleNamespace(aio=SimpleNamespace(models=FakeModels(latencies)))
+
+    alice, bob = await asyncio.gather(build_deck("alice", slides), build_deck("bob", slides))
+    again = await build_deck("alice", slides)
+    await store.close()
+    names = [set(c.artifacts) for c in (alice, bob, again)]
+    assert all(len(n) == slides for n in names) and not (names[0] & names[2]), names
+    for session, context in (("alice", alice), ("bob", bob)):
+        for name, versions in context.artifacts.items():
+            with open(store.mirror_path(session, name), "rb") as f:
+                assert f.read() == versions[-1].inline_data.data, name
+    print(f"✅ concurrent sessions and repeated decks keep separate images ({store.mirrored} mirrored)")
+
+    slow = ImageStore(mirror_dir=os.path.join(workdir, "slow"))
+    write = slow.write_mirror
+    slow.write_mirror = lambda *args: (time.sleep(0.5), write(*args))[1]
+    started = time.perf_counter()
+    await slow.save(alice, "slow.png", PNG)
+    returned = time.perf_counter() - started
+    await slow.close()
+    assert returned < 0.1 and slow.mirrored == 1, (returned, slow.stats())
+    print(f"✅ save returns in {returned * 1000:.1f} ms while a 500 ms mirror write finishes behind it")
+
+    quota = ImageStore(mirror_dir=os.path.join(workdir, "quota"), quota_bytes=len(PNG) * 5)
+    for i in range(20):
+        path = quota.write_mirror(f"s{i % 3}", f"image_{i}.png", PNG)
+        os.utime(path, (i, i))
+    deleted, freed = quota.enforce_quota()
+    left = sorted(n for _, _, files in os.walk(quota.mirror_dir) for n in files)
+    assert deleted == 15 and left == sorted(f"image_{i}.png" for i in range(15, 20)), left
+    print(f"✅ janitor deleted the {deleted} oldest images ({freed} bytes) to get under quota")
+
+    part = SimpleNamespace(inline_data=SimpleNamespace(data=PNG))
+    response = SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+    image.genai.Client = lambda: SimpleNamespace(models=SimpleNamespace(generate_content=lambda **_: response))
+    cwd = os.getcwd()
+    result = image.create_slide_images_test()
+    filenames = [s["image_filename"] for s in result["slide_contents"]["slides"]]
+    assert os.getcwd() == cwd and len(set(filenames)) == len(filenames), (os.getcwd(), filenames)
+    print(f"✅ create_slide_images_test wrote {len(filenames)} distinct images without changing directory")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slides", type=int, default=6)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        asyncio.run(main(args.slides, workdir))
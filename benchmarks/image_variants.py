@@ -0,0 +1,99 @@
+"""
+Benchmark for slide image variants, with a fake Gemini client that returns
+real PNGs.
+
+Builds a deck, checks every slide gets a compressed variant and a
+thumbnail saved as artifacts, reports the bytes saved, and checks the
+event loop stays responsive while Pillow works in the process pool.
+
+    python -m benchmarks.image_variants --slides 8 --size 1024
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from io import BytesIO
+from types import SimpleNamespace
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from benchmarks.rag_concurrency import heartbeat
+from benchmarks.slide_images import FakeModels, FakeToolContext
+from sahayak.tools import image, image_variants
+from sahayak.tools.image_cache import image_cache
+
+
+def illustration(seed: int, size: int) -> bytes:
+    """A PNG with shapes over textured gradients, roughly like a generated illustration."""
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient("L").resize((size, size)).convert("RGB")
+    texture = Image.effect_noise((size, size), 48).convert("RGB").filter(ImageFilter.GaussianBlur(1))
+    canvas = Image.blend(gradient, texture, 0.4)
+    draw = ImageDraw.Draw(canvas)
+    for _ in range(40):
+        x, y = rng.randrange(size), rng.randrange(size)
+        r = rng.randrange(size // 20, size // 5)
+        colour = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=colour, outline=(0, 0, 0), width=3)
+    out = BytesIO()
+    canvas.save(out, format="PNG")
+    return out.getvalue()
+
+
+class PngModels(FakeModels):
+    def __init__(self, images):
+        super().__init__({d: 0.1 for d in images})
+        self.images = images
+
+    async def generate_content(self, model, contents, config):
+        response = await super().generate_content(model, contents, config)
+        response.candidates[0].content.parts[0].inline_data.data = self.images[contents]
+        return response
+
+
+async def main(slides: int, size: int):
+    image_cache.enabled = False
+    images = {f"illustration {i}": illustration(i, size) for i in range(slides)}
+    image._client = SimpleNamespace(aio=SimpleNamespace(models=PngModels(images)))
+    context = FakeToolContext([{"heading": d, "image_description": d} for d in images])
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(heartbeat(stop))
+    started = time.perf_counter()
+    result = await image.create_slide_images(context)
+    wall = time.perf_counter() - started
+    stop.set()
+    worst_lag = await lag
+    await image.image_store.close()
+    image_variants.shutdown()
+
+    assert result["status"] == "success", result
+    for slide in result["slide_contents"]["slides"]:
+        variants = slide["image_variants"]
+        assert set(variants) == {"compressed", "thumbnail"}, slide
+        assert variants["compressed"]["bytes"] < slide["image_bytes"], slide
+        for variant in variants.values():
+            assert variant["filename"] in context.artifacts, variant
+        with Image.open(BytesIO(context.artifacts[variants["thumbnail"]["filename"]][-1].inline_data.data)) as thumb:
+            assert max(thumb.size) <= image_variants.IMAGE_THUMBNAIL_SIZE, thumb.size
+
+    totals = result["image_bytes"]
+    print(f"slides:           {slides} ({size}x{size} PNG, {image_variants.IMAGE_VARIANT_FORMAT} q{image_variants.IMAGE_VARIANT_QUALITY})")
+    print(f"original:         {totals['original'] / 1e6:.2f} MB")
+    print(f"compressed:       {totals['compressed'] / 1e6:.2f} MB ({totals['saved'] / max(totals['original'], 1):.0%} saved)")
+    print(f"thumbnails:       {totals['thumbnails'] / 1e3:.1f} kB")
+    print(f"deck wall time:   {wall:.2f} s")
+    print(f"worst loop lag:   {worst_lag * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slides", type=int, default=8)
+    parser.add_argument("--size", type=int, default=1024)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        asyncio.run(main(args.slides, args.size))
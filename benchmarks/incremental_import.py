@@ -0,0 +1,148 @@
+"""
+Check that an incremental re-import leaves the same graph as a full one.
+
+Imports a synthetic score sheet into an in-memory stand-in for the Neo4j
+session, edits some scores and clears some cells, then re-imports it with
+--incremental. The scores and SIMILAR_TO edges must match a fresh full
+import of the edited sheet, both when the edit keeps every column's range
+(only affected students are re-linked) and when it moves one (everyone is).
+
+    python -m benchmarks.incremental_import --students 500
+"""
+
+import argparse
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+import student_graph
+from benchmarks.synthetic import synthetic_scores, to_score_sheet
+
+
+class FakeGraph:
+    """Runs the importer's UNWIND queries against dicts instead of Neo4j."""
+
+    def __init__(self):
+        self.students = {}
+        self.scores = {}
+        self.edges = {}
+
+    def run(self, query, rows):
+        sg = student_graph
+        if query is sg.STUDENTS_QUERY:
+            for row in rows:
+                self.students[(row["grade"], row["roll_no"])] = row["name"]
+        elif query is sg.SCORES_QUERY:
+            for row in rows:
+                key = (row["grade"] or "", row["roll_no"], row["topic"], row["test"])
+                self.scores[key] = row["score"]
+        elif query is sg.DELETE_SCORES_QUERY:
+            for row in rows:
+                self.scores.pop((row["grade"] or "", row["roll_no"], row["topic"], row["test"]), None)
+        elif query is sg.SIMILAR_QUERY:
+            for row in rows:
+                edge = ((row["a_grade"], row["a"]), (row["b_grade"], row["b"]), row["source"])
+                self.edges[edge] = row["similarity"]
+        elif query is sg.DELETE_SIMILAR_QUERY:
+            owners = {(row["grade"], row["roll_no"], row["source"]) for row in rows}
+            self.edges = {
+                edge: sim
+                for edge, sim in self.edges.items()
+                if (*edge[0], edge[2]) not in owners
+            }
+        elif query is sg.PICKED_BY_QUERY:
+            targets = {((row["grade"], row["roll_no"]), row["source"]) for row in rows}
+            peers = {a for a, b, source in self.edges if (b, source) in targets}
+            return [{"grade": grade, "roll_no": roll_no} for grade, roll_no in peers]
+        elif query is not sg.TOPICS_QUERY:
+            raise AssertionError(f"unexpected query {query}")
+        return []
+
+
+class FakeSession:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def execute_write(self, fn, query, rows):
+        self.graph.run(query, rows)
+
+    def execute_read(self, fn, query, rows):
+        return self.graph.run(query, rows)
+
+
+class FakeDriver:
+    def __init__(self, graph):
+        self.graph = graph
+
+    @contextmanager
+    def session(self):
+        yield FakeSession(self.graph)
+
+
+def import_into(graph, path, incremental):
+    student_graph.driver = FakeDriver(graph)
+    return student_graph.import_file(path, "6", incremental=incremental)
+
+
+def pairs(graph):
+    return {frozenset((a, b)) for a, b, _ in graph.edges}
+
+
+def picks(graph, sources=None):
+    """Edges as (from, to, source name), with sources renamed through ``sources``."""
+    sources = sources or {}
+    return {(a, b, sources.get(source, source)) for a, b, source in graph.edges}
+
+
+def check(sheet, edited, workdir, name):
+    path = os.path.join(workdir, f"{name}.csv")
+    sheet.to_csv(path, index=False)
+    incremental = FakeGraph()
+    import_into(incremental, path, incremental=True)
+    edited.to_csv(path, index=False)
+    import_into(incremental, path, incremental=True)
+
+    fresh_path = os.path.join(workdir, f"{name}_fresh.csv")
+    edited.to_csv(fresh_path, index=False)
+    full = FakeGraph()
+    import_into(full, fresh_path, incremental=False)
+
+    assert incremental.scores == full.scores, "scores differ"
+    renamed = {student_graph.sheet_source(fresh_path): student_graph.sheet_source(path)}
+    assert picks(incremental) == picks(full, renamed), (
+        len(picks(incremental) ^ picks(full, renamed)),
+        "SIMILAR_TO edges differ",
+    )
+    return len(full.scores), len(pairs(full))
+
+
+def main(students: int, edits: int):
+    rng = np.random.default_rng(1)
+    sheet = to_score_sheet(synthetic_scores(students, topics=["Light", "Sound", "Water"], tests=["UT1", "UT2"]))
+    columns = [c for c in sheet.columns if "out of" in c]
+    # Pin every column's range so edits inside it don't rescale anyone
+    sheet.loc[0, columns], sheet.loc[1, columns] = 0, 10
+
+    edited = sheet.copy().astype({c: float for c in columns})
+    rows = rng.choice(np.arange(2, students), size=edits, replace=False)
+    edited.loc[rows, columns[0]] = rng.integers(0, 11, size=edits)
+    edited.loc[rows[: edits // 2], columns[1]] = np.nan
+
+    with tempfile.TemporaryDirectory() as workdir:
+        scores, links = check(sheet, edited, workdir, "same_range")
+        print(f"✅ {edits} edited students: incremental import matches full ({scores} scores, {links} similar pairs)")
+
+        rescaled = edited.copy()
+        rescaled.loc[0, columns[2]] = 5
+        scores, links = check(sheet, rescaled, workdir, "rescaled")
+        print(f"✅ a moved column range re-links everyone and still matches ({links} similar pairs)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+    main(args.students, args.edits)
@@ -0,0 +1,114 @@
+"""
+Offline check and benchmark for ingest_textbooks.py.
+
+Writes synthetic text PDFs with "Chapter N" headings, ingests them with the
+hashed embedding and checks that a re-run skips every book, that changing
+one book re-ingests only that one, that a run interrupted after staging
+resumes without redoing work, and that the index answers queries.
+
+    python -m benchmarks.ingest_textbooks --books 4 --pages 60
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import ingest_textbooks
+from sahayak.tools import local_rag
+
+WORDS = ["plant", "cell", "energy", "water", "light", "soil", "root", "leaf", "force", "motion",
+         "heat", "sound", "magnet", "circuit", "rock", "river", "air", "fraction", "angle", "area"]
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """A minimal PDF with one Helvetica text page per list of lines."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+        content = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {content} 0 R "
+            f"/Resources << /Font << /F1 3 0 R >> >> >>".encode()
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def book_pages(seed, pages, lines=40):
+    rng = random.Random(seed)
+    book = []
+    for number in range(pages):
+        text = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines)]
+        if number % 10 == 0:
+            text.insert(0, f"Chapter {number // 10 + 1} Topic {seed}")
+        book.append(text)
+    return book
+
+
+def run(books_dir, output, workers):
+    started = time.perf_counter()
+    code = ingest_textbooks.main([books_dir, "--output", output, "--embedding", "hashed", "--workers", str(workers)])
+    assert code == 0, code
+    return time.perf_counter() - started
+
+
+def main(books: int, pages: int, workers: int):
+    with tempfile.TemporaryDirectory() as root:
+        books_dir, output = os.path.join(root, "books"), os.path.join(root, "index")
+        os.makedirs(books_dir)
+        for i in range(books):
+            write_pdf(os.path.join(books_dir, f"book-{i}.pdf"), book_pages(i, pages))
+        first = books_dir + "/book-0.pdf"
+        write_pdf(first, book_pages(0, pages)[:-1] + [["Mitochondria are the powerhouse of the cell."]])
+
+        cold = run(books_dir, output, workers)
+        warm = run(books_dir, output, workers)
+        print(f"✅ full run {cold:.2f}s ({books * pages / cold:,.1f} pages/s); unchanged re-run {warm:.2f}s")
+
+        write_pdf(os.path.join(books_dir, "book-1.pdf"), book_pages(100, pages))
+        staged = set(os.listdir(os.path.join(output, ingest_textbooks.STAGED_DIR)))
+        run(books_dir, output, workers)
+        after = set(os.listdir(os.path.join(output, ingest_textbooks.STAGED_DIR)))
+        assert len(after - staged) == 2 and len(staged - after) == 2, (staged, after)
+        print("✅ changing one book re-ingests only that book")
+
+        # An interruption after staging but before the index and manifest were written
+        os.remove(os.path.join(output, local_rag.INDEX_FILE))
+        os.remove(os.path.join(output, ingest_textbooks.MANIFEST_FILE))
+        resumed = run(books_dir, output, workers)
+        print(f"✅ interrupted run resumes from staged books in {resumed:.2f}s")
+
+        index = local_rag.LocalRagIndex(output)
+        top = index.search("mitochondria powerhouse of the cell", 3, 1.0)[0]
+        assert "Mitochondria" in top["text"], top
+        chunk = next(c for c in index.chunks if "Mitochondria" in c["text"])
+        assert chunk["page"] >= pages - 1 and chunk["chapter"] == f"Chapter {(pages - 1) // 10 + 1} Topic 0", chunk
+        print(f"✅ index answers queries; chunks carry chapter and page ({len(index.chunks)} chunks)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.books, args.pages, args.workers)
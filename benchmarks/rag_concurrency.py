@@ -0,0 +1,84 @@
+"""
+Load test for the async rag_query tool.
+
+Replaces the blocking Vertex AI call with a fake that sleeps for a random
+latency, fires N distinct queries at once (as N concurrent sessions would)
+and checks that they overlap instead of queueing, and that the event loop
+stays responsive while they run. A timed-out call is checked too.
+
+    python -m benchmarks.rag_concurrency --calls 8
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+
+from sahayak.tools import rag
+from sahayak.tools.semantic_cache import semantic_cache
+
+
+class FakeToolContext:
+    state = {"current_grade": {"grade": "6"}}
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Worst event-loop lag seen while the retrievals run."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def main(calls: int, min_latency: float, max_latency: float):
+    latencies = {f"query {i}": random.uniform(min_latency, max_latency) for i in range(calls)}
+
+    def fake_retrieval(rag_corpus, query, top_k, threshold):
+        time.sleep(latencies[query])
+        return [{"source_uri": "gs://book.pdf", "source_name": "book.pdf", "text": query, "score": 0.2}]
+
+    rag._retrieval_query = fake_retrieval
+    # Query embeddings would call Vertex AI too; benchmarks/semantic_cache.py covers that cache
+    semantic_cache.enabled = False
+    context = FakeToolContext()
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(heartbeat(stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(rag.rag_query("", query, context) for query in latencies)
+    )
+    wall = time.perf_counter() - started
+    stop.set()
+    worst_lag = await lag
+
+    assert all(r["status"] == "success" for r in results), results
+    workers = rag.rag_executor._max_workers
+    # With more calls than workers, calls run in waves of `workers`
+    expected = max(latencies.values()) * math.ceil(calls / workers)
+    print(f"calls:            {calls} ({workers} workers)")
+    print(f"slowest call:     {max(latencies.values()) * 1000:.1f} ms")
+    print(f"sum of calls:     {sum(latencies.values()) * 1000:.1f} ms")
+    print(f"wall time:        {wall * 1000:.1f} ms")
+    print(f"worst loop lag:   {worst_lag * 1000:.1f} ms")
+    assert wall < expected * 1.5, "retrievals did not overlap"
+    assert worst_lag < 0.05, "event loop was blocked"
+    print("✅ retrievals overlapped without blocking the event loop")
+
+    latencies["slow query"] = 0.5
+    rag.RAG_TIMEOUT_SECONDS = 0.1
+    result = await rag.rag_query("", "slow query", context)
+    assert result["status"] == "error" and "timed out" in result["message"], result
+    print(f"✅ slow retrieval timed out: {result['message']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--min-latency", type=float, default=0.1)
+    parser.add_argument("--max-latency", type=float, default=0.4)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.min_latency, args.max_latency))
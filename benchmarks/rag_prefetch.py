@@ -0,0 +1,105 @@
+"""
+Check for speculative RAG prefetch, against a fake Vertex AI call.
+
+Memorizes a grade for a session with a saved curriculum, then checks that
+the predicted retrievals run in the background within the concurrency
+bound, that the planner's next rag_query is served warm, that confirming
+other chapters or switching grade cancels what is no longer wanted, and
+that sessions are forgotten once their prefetches finish or expire.
+
+    python -m benchmarks.rag_prefetch --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+from sahayak.tools import rag
+from sahayak.tools.memory import memorize_dict, memorize_list
+from sahayak.tools.prefetch import CHAPTER_QUERY, prefetcher
+from sahayak.tools.semantic_cache import semantic_cache
+
+CURRICULUM = {"terms": [{"months": [{"chapters": [{"name": f"Chapter {i}"} for i in range(1, 7)]}]}]}
+
+
+class FakeToolContext:
+    def __init__(self, state):
+        # The session key lives in session state, like under ADK
+        self.state = state
+        self.invocation_id = "invocation"
+
+
+async def main(latency: float):
+    os.environ["RAG_CORPUS_GRADE_6"] = "corpus-6"
+    os.environ["RAG_CORPUS_GRADE_7"] = "corpus-7"
+    semantic_cache.enabled = False
+    running, peak, lock = 0, 0, threading.Lock()
+
+    def fake_retrieval(rag_corpus, query, top_k, threshold):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(latency)
+        with lock:
+            running -= 1
+        return [{"source_uri": "gs://book.pdf", "source_name": "book.pdf", "text": query, "score": 0.2}]
+
+    rag._retrieval_query = fake_retrieval
+
+    state = {"curriculum": CURRICULUM}
+    context = FakeToolContext(state)
+    memorize_dict("current_grade", {"classId": "", "grade": 6, "subject": "Science"}, context)
+    assert prefetcher.stats()["running"] == 7, prefetcher.stats()
+    await asyncio.sleep(latency * 5)
+    assert peak <= prefetcher.max_concurrency, peak
+    print(f"✅ 7 predicted retrievals prefetched, at most {peak} at a time")
+
+    started = time.perf_counter()
+    result = await rag.rag_query("", CHAPTER_QUERY.format(chapter="Chapter 1"), context)
+    warm = time.perf_counter() - started
+    started = time.perf_counter()
+    await rag.rag_query("", "something nobody predicted", context)
+    cold = time.perf_counter() - started
+    assert result["status"] == "success" and warm < latency / 2, (warm, result)
+    print(f"✅ lesson designer's first query served warm: {warm * 1000:.1f} ms vs {cold * 1000:.1f} ms cold")
+
+    memorize_list("confirmed_chapters", ["Light", "Sound", "Heat", "Magnets"], context)
+    await asyncio.sleep(0)
+    before = prefetcher.cancelled
+    memorize_list("confirmed_chapters", ["Light", "Sound", "Water"], context)
+    await asyncio.sleep(0)
+    assert prefetcher.cancelled - before == 2, prefetcher.stats()
+    print("✅ confirming other chapters cancelled the 2 prefetches no longer predicted")
+
+    memorize_dict("current_grade", {"classId": "", "grade": 7, "subject": "Science"}, context)
+    await asyncio.sleep(0)
+    assert prefetcher.cancelled >= 2, prefetcher.stats()
+    print(f"✅ switching grade cancelled {prefetcher.cancelled} pending prefetches")
+    await asyncio.sleep(latency * 5)
+    assert prefetcher.stats()["sessions"] == 0, prefetcher.stats()
+    print("✅ sessions are forgotten once their prefetches finish")
+
+    prefetcher.session_ttl = latency / 2
+    os.environ["RAG_CORPUS_GRADE_8"] = "corpus-8"
+    os.environ["RAG_CORPUS_GRADE_9"] = "corpus-9"
+    stale = FakeToolContext({"curriculum": CURRICULUM})
+    memorize_dict("current_grade", {"classId": "", "grade": 8, "subject": "Science"}, stale)
+    await asyncio.sleep(latency)
+    fresh = FakeToolContext({"curriculum": CURRICULUM})
+    memorize_dict("current_grade", {"classId": "", "grade": 9, "subject": "Science"}, fresh)
+    assert prefetcher.stats()["sessions"] == 1, prefetcher.stats()
+    print(f"✅ prefetches waiting longer than {prefetcher.session_ttl:g}s are cancelled")
+    await asyncio.sleep(latency * 5)
+
+    stats = prefetcher.stats()
+    print(f"prefetch stats:   {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency))
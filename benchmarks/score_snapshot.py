@@ -0,0 +1,126 @@
+"""
+Score snapshot engine vs. the live Neo4j/Cypher path.
+
+Times GraphVisualizer's read intents (top-k, statistics, comparison, team
+scores) on an in-memory snapshot of synthetic cohorts. With --neo4j the
+same queries also run against NEO4J_URI; import a matching cohort first,
+e.g. with --write-csv and student_graph.py.
+
+    python -m benchmarks.score_snapshot --students 100 10000 1000000
+    python -m benchmarks.score_snapshot --students 10000 --write-csv /tmp/cohort.csv
+    python -m benchmarks.score_snapshot --students 10000 --neo4j
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.synthetic import DEFAULT_TOPICS, synthetic_scores, to_score_sheet
+from sahayak.tools.graph_backends import (
+    TEAM_SCORES_QUERY,
+    TOP_STUDENTS_QUERY,
+    TOPIC_STATISTICS_QUERY,
+)
+from sahayak.tools.graph_driver import driver_manager
+from sahayak.tools.score_snapshot import ScoreSnapshot
+
+GRADE = "6"
+TOPICS = DEFAULT_TOPICS[:4]
+
+
+def _time(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def bench_snapshot(snapshot: ScoreSnapshot, repeat: int) -> dict:
+    return {
+        "top_students": _time(lambda: snapshot.top_students(TOPICS[0], GRADE, 5), repeat),
+        "statistics": _time(lambda: snapshot.topic_statistics(TOPICS, [GRADE]), repeat),
+        "compare": _time(lambda: snapshot.topic_statistics(TOPICS[:2], [GRADE]), repeat),
+        # The first call per (topic, grade) builds the per-student rows; later ones reuse them
+        "team_scores_cold": _time(lambda: snapshot.team_scores(TOPICS[:2], GRADE), 1),
+        "team_scores": _time(lambda: snapshot.team_scores(TOPICS[:2], GRADE), repeat),
+    }
+
+
+class SlowBackend:
+    """Serves a fixed frame after a delay, like a large SNAPSHOT_QUERY."""
+
+    def __init__(self, frame, delay: float):
+        self.frame = frame
+        self.delay = delay
+
+    async def snapshot_frame(self):
+        await asyncio.sleep(self.delay)
+        return self.frame
+
+
+async def check_background_refresh(frame, delay: float = 0.5) -> None:
+    """After the first load, a new data version is loaded without blocking readers."""
+    snapshot = ScoreSnapshot()
+    snapshot.enabled = True
+    backend = SlowBackend(frame, delay)
+    await snapshot.refresh(backend, 1)
+    started = time.perf_counter()
+    await snapshot.refresh(backend, 2)
+    waited = time.perf_counter() - started
+    assert waited < delay / 2 and snapshot.version == 1, (waited, snapshot.version)
+    assert snapshot.top_students(TOPICS[0], GRADE, 1), "the old snapshot should keep answering"
+    await snapshot._loading
+    assert snapshot.version == 2, snapshot.version
+    print(f"✅ reload ran in the background; readers waited {waited * 1e3:.1f} ms, not {delay:g} s")
+
+
+async def bench_neo4j(repeat: int) -> dict:
+    queries = {
+        "top_students": (TOP_STUDENTS_QUERY, {"topic": TOPICS[0], "grade": GRADE, "k": 5}),
+        "statistics": (TOPIC_STATISTICS_QUERY, {"topics": TOPICS, "grades": [GRADE]}),
+        "compare": (TOPIC_STATISTICS_QUERY, {"topics": TOPICS[:2], "grades": [GRADE]}),
+        "team_scores": (TEAM_SCORES_QUERY, {"topics": TOPICS[:2], "grade": GRADE}),
+    }
+    timings = {}
+    async with driver_manager.session() as session:
+        for name, (query, params) in queries.items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                result = await session.run(query, params)
+                await result.data()
+            timings[name] = (time.perf_counter() - started) / repeat * 1e6
+    await driver_manager.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--neo4j", action="store_true", help="also time the live Cypher path")
+    parser.add_argument("--write-csv", help="write the cohort as an importable score sheet")
+    args = parser.parse_args()
+
+    for n in args.students:
+        frame = synthetic_scores(n, grade=GRADE)
+        if args.write_csv:
+            to_score_sheet(frame).to_csv(args.write_csv, index=False)
+            print(f"📝 Wrote {n} students to {args.write_csv}")
+
+        started = time.perf_counter()
+        snapshot = ScoreSnapshot.from_frame(frame)
+        load_s = time.perf_counter() - started
+
+        print(f"\n👥 {n:,} students ({snapshot.stats()['bytes'] / 1e6:.1f} MB, built in {load_s:.2f}s)")
+        snap = bench_snapshot(snapshot, args.repeat)
+        live = asyncio.run(bench_neo4j(args.repeat)) if args.neo4j else {}
+        print(f"{'intent':<18}{'snapshot µs':>14}{'neo4j µs':>14}")
+        for name, micros in snap.items():
+            live_micros = f"{live[name]:>14.0f}" if name in live else f"{'-':>14}"
+            print(f"{name:<18}{micros:>14.0f}{live_micros}")
+
+    asyncio.run(check_background_refresh(synthetic_scores(min(args.students), grade=GRADE)))
+
+
+if __name__ == "__main__":
+    main()
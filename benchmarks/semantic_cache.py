@@ -0,0 +1,117 @@
+"""
+Semantic RAG cache check and micro-benchmark, with the local hashed
+embedding so it runs offline.
+
+Fills one corpus index to capacity, times lookups, checks that reworded
+queries hit, that unrelated queries and different retrieval parameters
+miss, and that a full ring and a capped corpus count evict. Then checks
+that a hanging or failing embedding call falls back to plain retrieval
+within the timeout and trips the breaker.
+
+    python -m benchmarks.semantic_cache --entries 512 --lookups 2000
+"""
+
+import argparse
+import threading
+import time
+
+from sahayak.tools.embeddings import hashed_embedding
+from sahayak.tools.semantic_cache import SemanticRagCache
+
+CORPUS = "grade-6"
+
+
+def fetcher(calls: list, label: str):
+    def fetch():
+        calls.append(label)
+        return [{"source_uri": "gs://book.pdf", "text": label, "score": 0.3}]
+
+    return fetch
+
+
+def main(entries: int, lookups: int, threshold: float):
+    cache = SemanticRagCache(
+        embed=hashed_embedding, threshold=threshold, max_entries=entries, max_corpora=2
+    )
+    calls: list = []
+
+    cache.get_or_fetch(CORPUS, "Get all the chapters for grade 6", 10, 0.6, fetcher(calls, "chapters"))
+    reworded = cache.get_or_fetch(CORPUS, "get all chapters for grade 6", 10, 0.6, fetcher(calls, "x"))
+    assert reworded[0]["text"] == "chapters" and len(calls) == 1, "rewording should hit"
+    cache.get_or_fetch(CORPUS, "Explain photosynthesis in plants", 10, 0.6, fetcher(calls, "photo"))
+    assert len(calls) == 2, "an unrelated query should miss"
+    cache.get_or_fetch(CORPUS, "Get all the chapters for grade 6", 5, 0.6, fetcher(calls, "top5"))
+    assert len(calls) == 3, "different top_k should miss"
+    print("✅ rewordings hit; unrelated queries and other parameters miss")
+
+    for i in range(entries):
+        cache.get_or_fetch(CORPUS, f"t{i} a{i * 7919}", 10, 0.6, fetcher(calls, str(i)))
+    before = len(calls)
+    cache.get_or_fetch(CORPUS, "Get all the chapters for grade 6", 10, 0.6, fetcher(calls, "again"))
+    assert len(calls) == before + 1, "the oldest entry should have been overwritten"
+    print(f"✅ ring of {entries} evicts its oldest entry")
+
+    cache.get_or_fetch("grade-7", "q", 10, 0.6, fetcher(calls, "g7"))
+    cache.get_or_fetch("grade-8", "q", 10, 0.6, fetcher(calls, "g8"))
+    assert CORPUS not in cache.stats()["corpora"], "least recently used corpus should go"
+    print("✅ corpus cap drops the least recently used corpus")
+
+    cache.get_or_fetch(CORPUS, "warm", 10, 0.6, fetcher(calls, "warm"))
+    queries = [f"t{i} b{i}" for i in range(lookups)]
+    vectors = hashed_embedding(queries)
+    index = cache._indexes[CORPUS]
+    started = time.perf_counter()
+    for vector in vectors:
+        index.lookup(vector, (10, 0.6), time.monotonic())
+    per_lookup = (time.perf_counter() - started) / lookups * 1e6
+
+    stats = cache.stats()
+    print(f"index:            {entries} x {index.vectors.shape[1]} float32 ({stats['index_bytes'] / 1e6:.2f} MB)")
+    print(f"lookup:           {per_lookup:.1f} µs")
+    print(f"lookups so far:   {stats['hits']} hits, {stats['misses']} misses")
+
+
+def check_embedding_failures(timeout: float = 0.2, failures: int = 3, cooldown: float = 0.5):
+    release = threading.Event()
+
+    def hanging(texts):
+        release.wait()
+        return hashed_embedding(texts)
+
+    cache = SemanticRagCache(
+        embed=hanging, embed_timeout=timeout, breaker_failures=failures, breaker_cooldown=cooldown
+    )
+    calls: list = []
+    started = time.perf_counter()
+    results = cache.get_or_fetch(CORPUS, "slow query", 10, 0.6, fetcher(calls, "slow"))
+    waited = time.perf_counter() - started
+    assert results[0]["text"] == "slow" and waited < timeout + 0.1, waited
+    release.set()
+    time.sleep(0.05)
+    assert cache.stats()["corpora"].get(CORPUS) == 1, "a late embedding should still index the result"
+    print(f"✅ a hanging embedding is cut off after {waited:.2f}s; its late vector still indexes the result")
+
+    def broken(texts):
+        raise RuntimeError("embedding service unavailable")
+
+    cache = SemanticRagCache(embed=broken, breaker_failures=failures, breaker_cooldown=cooldown)
+    for i in range(failures + 2):
+        cache.get_or_fetch(CORPUS, f"q{i}", 10, 0.6, fetcher(calls, str(i)))
+    stats = cache.stats()
+    assert stats["embed_errors"] == failures and stats["breaker_skips"] == 2, stats
+    cache._embed = hashed_embedding
+    time.sleep(cooldown)
+    cache.get_or_fetch(CORPUS, "after cooldown", 10, 0.6, fetcher(calls, "ok"))
+    assert not cache.stats()["breaker_open"], cache.stats()
+    print(f"✅ {failures} failed embeddings open the breaker; a probe after {cooldown:g}s closes it")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=512)
+    parser.add_argument("--lookups", type=int, default=2000)
+    # The hashed stand-in scores rewordings lower than real embeddings do
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+    main(args.entries, args.lookups, args.threshold)
+    check_embedding_failures()
@@ -0,0 +1,114 @@
+"""
+Load test for create_slide_images against a fake async Gemini client.
+
+Each slide's image takes a random time to "generate". With enough slots,
+the deck's wall time should be close to its slowest slide, not the sum of
+all of them; with fewer slots the calls run in waves. A slide that hangs is
+cut off by the per-slide timeout without holding up the rest.
+
+    python -m benchmarks.slide_images --slides 12 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+
+from sahayak.tools import image, image_variants
+from sahayak.tools.image_cache import image_cache
+from sahayak.tools.session_key import SESSION_KEY_STATE
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+class FakeModels:
+    def __init__(self, latencies):
+        self.latencies = latencies
+        self.running = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.latencies[contents])
+        finally:
+            self.running -= 1
+        part = SimpleNamespace(inline_data=SimpleNamespace(data=PNG + contents.encode()))
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+class FakeToolContext:
+    def __init__(self, slides, session_id="session"):
+        self.state = {"slide_contents": {"slides": slides}, SESSION_KEY_STATE: session_id}
+        self.artifacts = {}
+        self.invocation_id = "invocation"
+
+    async def save_artifact(self, filename, artifact):
+        versions = self.artifacts.setdefault(filename, [])
+        versions.append(artifact)
+        return len(versions) - 1
+
+
+async def run_deck(latencies):
+    slides = [{"heading": f"Slide {i}", "image_description": d} for i, d in enumerate(latencies)]
+    models = FakeModels(latencies)
+    image._client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    context = FakeToolContext(slides)
+    started = time.perf_counter()
+    result = await image.create_slide_images(context)
+    return time.perf_counter() - started, result, models.peak
+
+
+async def main(slides: int, concurrency: int, min_latency: float, max_latency: float):
+    # Every run generates afresh; benchmarks/image_cache.py covers the cache
+    image_cache.enabled = False
+    # The fake images aren't decodable; benchmarks/image_variants.py covers variants
+    image_variants.IMAGE_VARIANTS_ENABLED = False
+    image.IMAGE_GEN_CONCURRENCY = concurrency
+    latencies = {f"slide {i} picture": random.uniform(min_latency, max_latency) for i in range(slides)}
+
+    wall, result, peak = await run_deck(latencies)
+    assert result["status"] == "success", result
+    assert all("image_filename" in s for s in result["slide_contents"]["slides"]), result
+    assert peak <= concurrency, peak
+    slowest, total = max(latencies.values()), sum(latencies.values())
+    # Calls run in waves of `concurrency`, each about as long as its slowest call
+    bound = slowest * math.ceil(slides / concurrency)
+    print(f"slides:           {slides} ({concurrency} slots, peak {peak} in flight)")
+    print(f"slowest slide:    {slowest:.2f} s")
+    print(f"sum of slides:    {total:.2f} s")
+    print(f"deck wall time:   {wall:.2f} s (bound {bound:.2f} s)")
+    assert wall < bound + 0.5, "image calls should overlap"
+
+    image.IMAGE_GEN_CONCURRENCY = slides
+    image._semaphore_loop = None  # rebuild the semaphore with the new size
+    wall, _, _ = await run_deck(latencies)
+    print(f"with {slides} slots:   {wall:.2f} s (slowest slide {slowest:.2f} s)")
+    assert wall < slowest + 0.5, "with a slot per slide the deck should take its slowest slide"
+
+    image.IMAGE_GEN_TIMEOUT_SECONDS = max_latency
+    hung = dict(latencies, **{"hung slide picture": 3600})
+    wall, result, _ = await run_deck(hung)
+    missing = [s["heading"] for s in result["slide_contents"]["slides"] if "image_filename" not in s]
+    assert len(missing) == 1 and wall < max_latency * 2 + 0.5, (missing, wall)
+    print(f"✅ a hung slide times out after {max_latency:g}s; the other {slides} images are kept")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slides", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--min-latency", type=float, default=0.5)
+    parser.add_argument("--max-latency", type=float, default=2.0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        # create_slide_images writes its files under the working directory
+        os.chdir(workdir)
+        asyncio.run(main(args.slides, args.concurrency, args.min_latency, args.max_latency))
@@ -0,0 +1,99 @@
+"""
+Check for progressive slide delivery, with a fake Gemini client.
+
+Subscribes to a session's slide events while a deck with mixed latencies
+and one failing slide is generated, and checks that the first slide
+arrives about when the fastest image is done (not the slowest), that every
+slide is reported individually (including the failure), and that a
+reconnecting client resumes after its Last-Event-ID, even one from before
+a restart.
+
+    python -m benchmarks.slide_streaming --slides 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from benchmarks.slide_images import FakeModels, FakeToolContext
+from sahayak.tools import image, image_variants
+from sahayak.tools.image_cache import image_cache
+from sahayak.tools.slide_events import SlideEventBroker, slide_events
+
+SESSION = "teacher-1"
+
+
+class FailingModels(FakeModels):
+    async def generate_content(self, model, contents, config):
+        if contents == "broken picture":
+            await asyncio.sleep(0.1)
+            raise RuntimeError("image generation blocked")
+        return await super().generate_content(model, contents, config)
+
+
+async def collect(after=0):
+    received = []
+    async with contextlib.aclosing(slide_events.subscribe(SESSION, after=after)) as events:
+        async for event in events:
+            received.append((time.perf_counter(), event))
+            if event["type"] == "deck_done":
+                return received
+
+
+async def main(slides: int):
+    image_cache.enabled = False
+    image_variants.IMAGE_VARIANTS_ENABLED = False
+    image.IMAGE_GEN_CONCURRENCY = slides + 1
+    latencies = {f"picture {i}": 0.3 + 0.3 * i for i in range(slides)}
+    image._client = SimpleNamespace(aio=SimpleNamespace(models=FailingModels(latencies)))
+    descriptions = list(reversed(latencies)) + ["broken picture"]
+    context = FakeToolContext([{"heading": d, "image_description": d} for d in descriptions], SESSION)
+
+    listener = asyncio.create_task(collect())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    result = await image.create_slide_images(context)
+    received = await listener
+
+    types = [event["type"] for _, event in received]
+    first_ready = next(at for at, event in received if event["type"] == "slide_ready") - started
+    print(f"first slide:      {first_ready:.2f} s (fastest image {min(latencies.values()):.2f} s)")
+    print(f"whole deck:       {received[-1][0] - started:.2f} s (slowest image {max(latencies.values()):.2f} s)")
+    assert types[0] == "deck_started" and types[-1] == "deck_done", types
+    assert types.count("slide_ready") == slides and types.count("slide_failed") == 1, types
+    assert first_ready < min(latencies.values()) + 0.2, first_ready
+    print("✅ slides stream in as they finish")
+
+    assert result["status"] == "partial" and len(result["failed_slides"]) == 1, result
+    failure = result["failed_slides"][0]
+    assert failure["index"] == slides + 1 and "blocked" in failure["error"], failure
+    assert result["slide_contents"]["slides"][slides]["image_error"] == failure["error"], result
+    print(f"✅ failed slide reported on its own: {failure}")
+
+    resume_after = received[3][1]["id"]
+    replayed = await collect(after=resume_after)
+    assert [e["id"] for _, e in replayed] == [e["id"] for _, e in received[4:]], replayed
+    print(f"✅ reconnecting after event {resume_after} replays the {len(replayed)} events missed")
+
+    restarted = SlideEventBroker()
+    restarted.publish(SESSION, "deck_started", deck_id="after-restart", slides=1)
+    restarted.publish(SESSION, "deck_done", deck_id="after-restart", ready=1, failed=[])
+    stale = received[-1][1]["id"]
+    async with contextlib.aclosing(restarted.subscribe(SESSION, after=stale)) as events:
+        replayed = [await events.__anext__(), await events.__anext__()]
+    assert [e["type"] for e in replayed] == ["deck_started", "deck_done"], replayed
+    print(f"✅ an id from before a restart ({stale}) doesn't hide the new events")
+    print(f"broker stats:     {slide_events.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slides", type=int, default=8)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        asyncio.run(main(args.slides))
@@ -0,0 +1,60 @@
+"""
+Synthetic student score cohorts for benchmarks.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOPICS = ["Light", "Plants", "Motion", "Magnets", "Water", "Air", "Food", "Sound"]
+
+
+def synthetic_scores(
+    n_students: int,
+    topics: Optional[List[str]] = None,
+    tests: Optional[List[str]] = None,
+    grade: str = "6",
+    out_of: int = 10,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Long-format score rows (roll_no, name, topic, grade, test, score, out_of),
+    the same shape SNAPSHOT_QUERY returns from Neo4j.
+    """
+    rng = np.random.default_rng(seed)
+    topics = topics or DEFAULT_TOPICS
+    tests = tests or ["Unit Test 1"]
+
+    ability = rng.normal(0.65, 0.15, size=(n_students, 1))
+    columns = [(topic, test) for topic in topics for test in tests]
+    noise = rng.normal(0, 0.12, size=(n_students, len(columns)))
+    scores = np.clip(np.rint((ability + noise) * out_of), 0, out_of).astype(np.int32)
+
+    roll_nos = np.arange(1, n_students + 1)
+    return pd.DataFrame(
+        {
+            "roll_no": np.repeat(roll_nos, len(columns)),
+            "name": np.repeat([f"Student {r}" for r in roll_nos], len(columns)),
+            "topic": np.tile([c[0] for c in columns], n_students),
+            "grade": grade,
+            "test": np.tile([c[1] for c in columns], n_students),
+            "score": scores.ravel(),
+            "out_of": out_of,
+        }
+    )
+
+
+def to_score_sheet(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pivot long rows into the wide sheet layout student_graph.py imports:
+    Roll No, Name, Gender, "<test> - <topic> (out of N)".
+    """
+    frame = frame.assign(
+        column=frame["test"] + " - " + frame["topic"] + " (out of " + frame["out_of"].astype(str) + ")"
+    )
+    sheet = frame.pivot(index=["roll_no", "name"], columns="column", values="score")
+    sheet = sheet.reset_index().rename(columns={"roll_no": "Roll No", "name": "Name"})
+    sheet.columns.name = None
+    sheet.insert(2, "Gender", np.where(sheet["Roll No"] % 2, "F", "M"))
+    return sheet
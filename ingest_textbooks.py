@@ -0,0 +1,275 @@
+"""
+Build a local textbook index from PDFs, for RAG_CORPUS_GRADE_<n>=local:<dir>.
+
+    python ingest_textbooks.py books/grade6/*.pdf --output indexes/grade6
+    python ingest_textbooks.py books/grade7/ --output indexes/grade7 --workers 8
+
+Pages are extracted in a process pool, chunked with chapter and page numbers
+and embedded in batches. Each finished book is staged under <output>/staged,
+keyed by its content hash and the chunking settings, so re-runs skip
+unchanged books and an interrupted run picks up where it stopped.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+from pypdf import PdfReader
+
+from sahayak.tools.embeddings import get_embedding
+from sahayak.tools.local_rag import write_index
+
+load_dotenv()
+
+# Words per chunk, and words shared by consecutive chunks
+CHUNK_WORDS = int(os.environ.get("INGEST_CHUNK_WORDS", "200"))
+CHUNK_OVERLAP = int(os.environ.get("INGEST_CHUNK_OVERLAP", "40"))
+# Pages extracted per process-pool task
+PAGES_PER_TASK = int(os.environ.get("INGEST_PAGES_PER_TASK", "16"))
+# Chunks per embedding request
+EMBED_BATCH_SIZE = int(os.environ.get("INGEST_EMBED_BATCH_SIZE", "32"))
+WORKERS = int(os.environ.get("INGEST_WORKERS", str(os.cpu_count() or 4)))
+
+STAGED_DIR = "staged"
+MANIFEST_FILE = "ingest_manifest.json"
+
+# Chapter headings, for books without an outline
+_HEADING = re.compile(r"^\s*((?:chapter|unit|lesson)\s+\d+\b.*)$", re.IGNORECASE | re.MULTILINE)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_key(content_hash, embedding):
+    # Changing how chunks are cut or embedded invalidates staged books too
+    settings = f"{content_hash}:{embedding}:{CHUNK_WORDS}:{CHUNK_OVERLAP}"
+    return hashlib.sha256(settings.encode()).hexdigest()[:32]
+
+
+def extract_pages(path, start, end):
+    """Text of pages [start, end) of a PDF; runs in a worker process."""
+    reader = PdfReader(path)
+    return [(number, reader.pages[number].extract_text() or "") for number in range(start, end)]
+
+
+def outline_chapters(reader):
+    """{first page: title} from the top level of the PDF outline, if it has one."""
+    chapters = {}
+    try:
+        for item in reader.outline:
+            # Nested lists are sub-sections of the entry before them
+            if isinstance(item, list):
+                continue
+            page = reader.get_destination_page_number(item)
+            if page is not None:
+                chapters.setdefault(page, item.title.strip())
+    except Exception as e:
+        print(f"⚠️ Could not read the outline: {e}")
+    return chapters
+
+
+def chunk_pages(pages, chapters, source_uri, source_name):
+    """Overlapping word windows over the book; each chunk keeps its chapter and first page."""
+    words, page_of, chapter_of = [], [], []
+    chapter = None
+    for number, text in pages:
+        if number in chapters:
+            chapter = chapters[number]
+        elif not chapters:
+            heading = _HEADING.search(text)
+            if heading:
+                chapter = heading.group(1).strip()
+        page_words = text.split()
+        words.extend(page_words)
+        page_of.extend([number + 1] * len(page_words))
+        chapter_of.extend([chapter] * len(page_words))
+
+    chunks = []
+    step = max(1, CHUNK_WORDS - CHUNK_OVERLAP)
+    for start in range(0, len(words), step):
+        chunks.append({
+            "source_uri": source_uri,
+            "source_name": source_name,
+            "text": " ".join(words[start:start + CHUNK_WORDS]),
+            "chapter": chapter_of[start],
+            "page": page_of[start],
+        })
+        if start + CHUNK_WORDS >= len(words):
+            break
+    return chunks
+
+
+def embed_batches(embed, texts, batch_size=EMBED_BATCH_SIZE):
+    batches = [embed(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+    return np.concatenate(batches) if batches else None
+
+
+def stage_paths(output, key):
+    base = os.path.join(output, STAGED_DIR, key)
+    return base + ".jsonl", base + ".npy"
+
+
+def is_staged(output, key):
+    return all(os.path.exists(p) for p in stage_paths(output, key))
+
+
+def save_staged(output, key, chunks, embeddings):
+    chunks_path, embeddings_path = stage_paths(output, key)
+    with open(chunks_path + ".tmp", "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+    with open(embeddings_path + ".tmp", "wb") as f:
+        np.save(f, embeddings)
+    # The embeddings land last, so a book only counts as staged once both are complete
+    os.replace(chunks_path + ".tmp", chunks_path)
+    os.replace(embeddings_path + ".tmp", embeddings_path)
+
+
+def load_staged(output, key):
+    chunks_path, embeddings_path = stage_paths(output, key)
+    with open(chunks_path, encoding="utf-8") as f:
+        chunks = [json.loads(line) for line in f if line.strip()]
+    return chunks, np.load(embeddings_path)
+
+
+def load_manifest(output):
+    try:
+        with open(os.path.join(output, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(output, manifest):
+    path = os.path.join(output, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def expand_paths(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "**", "*.pdf"), recursive=True))
+        else:
+            files.extend(glob.glob(path) or [path])
+    return sorted(dict.fromkeys(os.path.abspath(f) for f in files))
+
+
+def ingest_book(path, key, pool, embed, output):
+    """Extract, chunk, embed and stage one book; returns (pages, chunks)."""
+    reader = PdfReader(path)
+    page_count = len(reader.pages)
+    chapters = outline_chapters(reader)
+    tasks = [
+        pool.submit(extract_pages, path, start, min(start + PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ]
+    pages = [page for task in tasks for page in task.result()]
+
+    chunks = chunk_pages(pages, chapters, Path(path).as_uri(), os.path.basename(path))
+    embeddings = embed_batches(embed, [c["text"] for c in chunks])
+    if embeddings is None:
+        raise ValueError("no text could be extracted")
+    save_staged(output, key, chunks, embeddings)
+    return page_count, len(chunks)
+
+
+def build_index(output, manifest, embedding):
+    """Concatenate the staged books into the index local_rag loads."""
+    chunks, embeddings = [], []
+    for path in sorted(manifest):
+        book_chunks, book_embeddings = load_staged(output, manifest[path]["key"])
+        chunks.extend(book_chunks)
+        embeddings.append(book_embeddings)
+    write_index(output, chunks, np.concatenate(embeddings), embedding)
+
+    # Staged books no longer in the manifest are from replaced or removed versions
+    keep = {entry["key"] for entry in manifest.values()}
+    for staged in glob.glob(os.path.join(output, STAGED_DIR, "*")):
+        if Path(staged).name.split(".")[0] not in keep:
+            os.remove(staged)
+    return len(chunks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="PDF files, globs or directories")
+    parser.add_argument("--output", required=True, help="index directory to create or update")
+    parser.add_argument("--embedding", default=os.environ.get("RAG_EMBEDDING", "vertex"),
+                        help="embedding function (see sahayak/tools/embeddings.py)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="page extraction processes")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    files = expand_paths(args.paths)
+    if not files:
+        print("❌ No PDF files found")
+        return 1
+    embed = get_embedding(args.embedding)
+    os.makedirs(os.path.join(args.output, STAGED_DIR), exist_ok=True)
+
+    previous = load_manifest(args.output)
+    manifest, failed = {}, []
+    pages = skipped = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for path in files:
+            name = os.path.basename(path)
+            try:
+                content_hash = file_hash(path)
+                key = stage_key(content_hash, args.embedding)
+                if is_staged(args.output, key):
+                    # Unchanged since the last run, or staged before an interruption
+                    manifest[path] = previous.get(path) or {"sha256": content_hash, "key": key}
+                    manifest[path].update(sha256=content_hash, key=key)
+                    skipped += 1
+                    print(f"⏭️ {name}: unchanged")
+                    continue
+
+                book_started = time.perf_counter()
+                book_pages, book_chunks = ingest_book(path, key, pool, embed, args.output)
+                elapsed = time.perf_counter() - book_started
+                manifest[path] = {"sha256": content_hash, "key": key, "pages": book_pages, "chunks": book_chunks}
+                pages += book_pages
+                print(f"📚 {name}: {book_pages} pages, {book_chunks} chunks in {elapsed:.2f}s "
+                      f"({book_pages / max(elapsed, 1e-9):,.1f} pages/s)")
+            except Exception as e:
+                failed.append(path)
+                print(f"❌ {name}: {e}")
+                # Keep the last good version of the book in the index
+                if path in previous and is_staged(args.output, previous[path]["key"]):
+                    manifest[path] = previous[path]
+            # Saved per book so an interrupted run knows what is already done
+            save_manifest(args.output, {**previous, **manifest})
+
+    save_manifest(args.output, manifest)
+    if not manifest:
+        print("❌ Nothing to index")
+        return 1
+    chunks = build_index(args.output, manifest, args.embedding)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'✅' if not failed else '⚠️'} Indexed {len(manifest)} books ({chunks} chunks) in {args.output}: "
+        f"{pages} pages ingested, {skipped} books unchanged, {len(failed)} failed, "
+        f"in {elapsed:.2f}s ({pages / max(elapsed, 1e-9):,.1f} pages/s)."
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
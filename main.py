@@ -1,11 +1,32 @@
+import asyncio
+import json
 import os
+import secrets
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from sse_starlette.sse import EventSourceResponse
 from google.adk.cli.fast_api import get_fast_api_app
 from dotenv import load_dotenv
 # fetch create_slide_images_test
 from sahayak.tools.image import create_slide_images_test
+from sahayak.tools.graph_driver import driver_manager
+from sahayak.tools.graph_schema import apply_schema_async
+from sahayak.tools.graph_cache import graph_cache
+from sahayak.tools.score_snapshot import score_snapshot
+from sahayak.tools.rag import corpus_for_grade
+from sahayak.tools.context_packing import RAG_CONTEXT_PACKING, load_encoder_async
+from sahayak.tools.rag_cache import rag_cache
+from sahayak.tools.semantic_cache import semantic_cache
+from sahayak.tools.prefetch import prefetcher
+from sahayak.tools.image_cache import image_cache
+from sahayak.tools.image_store import image_store
+from sahayak.tools import image_variants
+from sahayak.tools.slide_events import slide_events
+from sahayak.tools.session_key import SESSION_KEY_STATE
 
 load_dotenv()
 
@@ -17,8 +38,31 @@ SESSION_SERVICE_URI = ""
 ALLOWED_ORIGINS = ["http://localhost", "http://localhost:8080", "*"]
 # Set web=True if you intend to serve a web interface, False otherwise
 SERVE_WEB_INTERFACE = True
+# Shared secret for the /admin routes, sent as X-Admin-Token; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
 print(f"gs://{os.environ.get('GOOGLE_CLOUD_STORAGE_BUCKET')}/artifacts")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared Neo4j pool up front so the first analytics question
+    # doesn't pay for the handshake, and close it cleanly on shutdown.
+    try:
+        if os.getenv("GRAPH_BACKEND", "neo4j") == "neo4j" and await driver_manager.verify_connectivity():
+            async with driver_manager.session() as session:
+                await apply_schema_async(session)
+        if RAG_CONTEXT_PACKING:
+            # So the first retrieval doesn't wait for tiktoken's encoding to load
+            await load_encoder_async()
+        yield
+    finally:
+        # Worker processes must not outlive the app, whatever else fails here
+        image_variants.shutdown()
+        await image_store.close()
+        await driver_manager.close()
+
+
 # Call the function to get the FastAPI app instance
 app: FastAPI = get_fast_api_app(
     agents_dir=AGENT_DIR,
@@ -26,6 +70,7 @@ app: FastAPI = get_fast_api_app(
     # artifact_service_uri=f"gs://{os.environ.get('GOOGLE_CLOUD_STORAGE_BUCKET')}/artifacts",
     allow_origins=ALLOWED_ORIGINS,
     web=SERVE_WEB_INTERFACE,
+    lifespan=lifespan,
 )
 
 # You can add more FastAPI routes or configurations below if needed
@@ -34,9 +79,133 @@ async def read_root():
     return {"Hello": "World"}
 
 
+@app.get("/metrics/neo4j")
+async def neo4j_metrics():
+    return driver_manager.metrics()
+
+
+@app.get("/metrics/graph_cache")
+async def graph_cache_metrics():
+    return graph_cache.stats()
+
+
+@app.get("/metrics/score_snapshot")
+async def score_snapshot_metrics():
+    return score_snapshot.stats()
+
+
+@app.get("/metrics/rag_cache")
+async def rag_cache_metrics():
+    return rag_cache.stats()
+
+
+@app.get("/metrics/semantic_cache")
+async def semantic_cache_metrics():
+    return semantic_cache.stats()
+
+
+@app.get("/metrics/rag_prefetch")
+async def rag_prefetch_metrics():
+    return prefetcher.stats()
+
+
+@app.get("/metrics/image_cache")
+async def image_cache_metrics():
+    return image_cache.stats()
+
+
+@app.get("/metrics/image_store")
+async def image_store_metrics():
+    return image_store.stats()
+
+
+# ADK's own session lookup; it raises 404 unless the session belongs to the user
+get_session = next(
+    route.endpoint
+    for route in app.routes
+    if getattr(route, "path", None) == "/apps/{app_name}/users/{user_id}/sessions/{session_id}"
+    and "GET" in route.methods
+)
+# How often to look for a new session's key, until its first turn sets it,
+# and how long to keep looking before ending the stream
+SLIDE_EVENT_KEY_POLL_SECONDS = float(os.getenv("SLIDE_EVENT_KEY_POLL_SECONDS", 1))
+SLIDE_EVENT_KEY_WAIT_SECONDS = float(os.getenv("SLIDE_EVENT_KEY_WAIT_SECONDS", 300))
+
+
+async def find_session(app_name: str, user_id: str, session_id: str):
+    """The session, or None if it doesn't exist (any more)."""
+    try:
+        return await get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    except HTTPException as e:
+        if e.status_code == 404:
+            return None
+        raise
+
+
+@app.get("/apps/{app_name}/users/{user_id}/sessions/{session_id}/slides/events")
+async def stream_slide_events(
+    request: Request,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-sent events for a session's slide images: deck_started, then
+    slide_ready or slide_failed per slide as it finishes, then deck_done.
+    Reconnecting clients resume after Last-Event-ID. The stream ends if the
+    session is deleted, or runs no turn within SLIDE_EVENT_KEY_WAIT_SECONDS.
+    """
+    session = await get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def events():
+        current = session
+        deadline = time.monotonic() + SLIDE_EVENT_KEY_WAIT_SECONDS
+        # Tools publish under the session key, which the root agent sets on the first turn
+        while current is not None and not current.state.get(SESSION_KEY_STATE):
+            if time.monotonic() >= deadline or await request.is_disconnected():
+                return
+            await asyncio.sleep(SLIDE_EVENT_KEY_POLL_SECONDS)
+            current = await find_session(app_name, user_id, session_id)
+        if current is None:
+            return
+        key = current.state[SESSION_KEY_STATE]
+        async for event in slide_events.subscribe(key, after=last_event_id):
+            yield {"id": event["id"], "event": event["type"], "data": json.dumps(event, default=str)}
+
+    return EventSourceResponse(events(), ping=15)
+
+
+@app.get("/metrics/slide_events")
+async def slide_events_metrics():
+    return slide_events.stats()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # CORS allows any origin, so admin routes must not rely on it
+    if not ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.post("/admin/rag_cache/flush", dependencies=[Depends(require_admin)])
+async def flush_rag_cache(corpus: Optional[str] = None, grade: Optional[str] = None):
+    """Drop cached retrievals for one corpus (by name or grade), or for all of them."""
+    if grade is not None:
+        corpus = corpus_for_grade(grade)
+        if corpus is None:
+            # An unconfigured grade must not turn into "flush everything"
+            return {"corpus": None, "flushed": 0, "semantic_flushed": 0}
+    return {
+        "corpus": corpus,
+        "flushed": rag_cache.flush(corpus),
+        "semantic_flushed": semantic_cache.flush(corpus),
+    }
+
+
 @app.post("/create_slide_images_test")
 async def create_slide_images_test_endpoint():
-    return create_slide_images_test()
+    # It blocks on the sync client, so keep it off the event loop
+    return await asyncio.to_thread(create_slide_images_test)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ from sahayak.subagents.planner.agent import planner_agent
 from sahayak.subagents.query.agent import query_agent
 from sahayak.subagents.academia.agent import academia_agent
 from sahayak.subagents.reminder.agent import task_agent
+from sahayak.tools.session_key import remember_session_key
 
 print(prompt.ROOT_INSTRUCTION)
 root_agent = Agent(
@@ -20,6 +21,7 @@ root_agent = Agent(
     instruction=prompt.ROOT_INSTRUCTION,
     sub_agents=[planner_agent, query_agent, academia_agent, task_agent],
     # before_agent_callback=_load_initial_state,
+    before_agent_callback=remember_session_key,
 )
 
 # "Help teachers create and manage educational content and tasks including: "
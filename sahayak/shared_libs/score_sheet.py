@@ -0,0 +1,164 @@
+"""
+Parsing for the student score sheets imported into the analytics graph.
+
+A sheet has one row per student with "Roll No", "Name", "Gender" and optional
+"Photo" / "Grade" columns, plus one column per assessment named
+"<test> - <topic> (out of <n>)".
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+
+class ScoreColumn(BaseModel):
+    column: str
+    test: str
+    topic: str
+    out_of: int
+
+
+def parse_score_column(column) -> Optional[ScoreColumn]:
+    """Parse an assessment header, or return None if it isn't one."""
+    if "out of" not in str(column):
+        return None
+    try:
+        parts = column.split(" - ")
+        test_type = parts[0].strip()
+        topic_part = parts[-1].split(" (out of")
+        topic = topic_part[0].strip()
+        out_of = int(topic_part[-1].strip(") ").strip())
+    except (AttributeError, IndexError, ValueError) as e:
+        print(f"Error processing column '{column}': {e}")
+        return None
+    return ScoreColumn(column=column, test=test_type, topic=topic, out_of=out_of)
+
+
+class ScoreSheet:
+    """
+    A score sheet with its header schema parsed once up front.
+
+    Args:
+        df: The raw sheet.
+        grade: Grade for every topic on the sheet, used when the sheet has no
+            "Grade" column.
+    """
+
+    def __init__(self, df: pd.DataFrame, grade: Optional[str] = None):
+        if df.empty:
+            raise ValueError("CSV file is empty")
+        if "Roll No" not in df.columns:
+            raise ValueError("CSV must contain 'Roll No' column")
+
+        self.df = df.assign(**{"Roll No": df["Roll No"].astype(int)})
+        self.grade = str(grade) if grade is not None else None
+        self.columns: List[ScoreColumn] = [
+            parsed
+            for parsed in (parse_score_column(col) for col in df.columns)
+            if parsed is not None
+        ]
+
+    def _grades(self) -> pd.Series:
+        if "Grade" in self.df.columns:
+            return self.df["Grade"].astype(str)
+        return pd.Series(self.grade, index=self.df.index, dtype=object)
+
+    def student_grades(self) -> pd.Series:
+        """Each row's grade as stored on its Student node, "" when unknown."""
+        return self._grades().fillna("")
+
+    def student_keys(self) -> pd.Series:
+        """Each row's student identity, "<grade>/<roll no>"; roll numbers repeat across grades."""
+        return self.student_grades() + "/" + self.df["Roll No"].astype(str)
+
+    def students(self) -> pd.DataFrame:
+        """One row per student: grade, roll_no, name, gender, photo."""
+        return pd.DataFrame(
+            {
+                "grade": self.student_grades(),
+                "roll_no": self.df["Roll No"],
+                "name": self.df["Name"],
+                "gender": self.df["Gender"],
+                "photo": self.df["Photo"] if "Photo" in self.df.columns else "",
+            }
+        ).drop_duplicates(["grade", "roll_no"], keep="last")
+
+    def long_scores(self) -> pd.DataFrame:
+        """
+        One row per (student, topic, test) score: roll_no, topic, grade, test,
+        score, out_of. Non-numeric cells are skipped, like a failed int().
+        """
+        return self._cells(blank=False)
+
+    def blank_scores(self) -> pd.DataFrame:
+        """The cells long_scores() skips, with the same columns (score is 0)."""
+        return self._cells(blank=True)
+
+    def _cells(self, blank: bool) -> pd.DataFrame:
+        frames = []
+        grades = self._grades()
+        for col in self.columns:
+            score = pd.to_numeric(self.df[col.column], errors="coerce")
+            selected = score.isna() if blank else score.notna()
+            if blank:
+                score = score.fillna(0)
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "roll_no": self.df["Roll No"][selected],
+                        "topic": col.topic,
+                        "grade": grades[selected],
+                        "test": col.test,
+                        "score": score[selected].astype(int),
+                        "out_of": col.out_of,
+                    }
+                )
+            )
+        if not frames:
+            return pd.DataFrame(
+                columns=["roll_no", "topic", "grade", "test", "score", "out_of"]
+            )
+        return pd.concat(frames, ignore_index=True).drop_duplicates(
+            ["roll_no", "topic", "grade", "test"], keep="last"
+        )
+
+    def _score_frame(self) -> pd.DataFrame:
+        # Always float, so hashes don't change when a blank cell turns a column from int to float
+        return self.df[[col.column for col in self.columns]].apply(
+            pd.to_numeric, errors="coerce"
+        ).astype(float)
+
+    def _row_hashes(self, frame: pd.DataFrame) -> Dict[str, str]:
+        hashes = pd.util.hash_pandas_object(frame, index=False)
+        return dict(zip(self.student_keys(), hashes.astype(str)))
+
+    def student_hashes(self) -> Dict[str, str]:
+        """Fingerprint of each student's details, by student key."""
+        details = ["Name", "Gender"] + (["Photo"] if "Photo" in self.df.columns else [])
+        return self._row_hashes(self.df[details].astype(str))
+
+    def score_hashes(self) -> Dict[str, str]:
+        """Fingerprint of each student's score vector (and grade), by student key."""
+        frame = self._score_frame().assign(_grade=self._grades().to_numpy())
+        return self._row_hashes(frame)
+
+    def column_hashes(self) -> Dict[str, str]:
+        """Fingerprint of each assessment column's scores and grades, keyed by student."""
+        scores = self._score_frame().set_index(self.student_keys())
+        grades = self._grades().to_numpy()
+        return {
+            column: str(
+                pd.util.hash_pandas_object(
+                    pd.DataFrame({"score": scores[column], "grade": grades})
+                ).sum()
+            )
+            for column in scores.columns
+        }
+
+    def score_matrix(self) -> np.ndarray:
+        """Students x assessment columns, missing scores as 0, for similarity."""
+        if not self.columns:
+            return np.empty((len(self.df), 0))
+        return self._score_frame().fillna(0).astype(float).to_numpy()
@@ -0,0 +1,105 @@
+"""
+Score-vector similarity between students, behind the SIMILAR_TO edges.
+
+Similarities are computed a block of students at a time against the whole
+cohort, so memory stays under SIMILARITY_MEMORY_MB however large the cohort
+is, and only pairs above the threshold are kept.
+"""
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.85"))
+# Most similar peers kept per student; 0 keeps every pair above the threshold
+SIMILARITY_MAX_NEIGHBOURS = int(os.getenv("SIMILARITY_MAX_NEIGHBOURS", "10"))
+# Budget for one block of the similarity matrix
+SIMILARITY_MEMORY_MB = float(os.getenv("SIMILARITY_MEMORY_MB", "256"))
+
+
+def scale_scores(matrix: np.ndarray) -> np.ndarray:
+    """Min-max scale each column to [0, 1]; constant columns become 0."""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    low = matrix.min(axis=0)
+    span = matrix.max(axis=0) - low
+    return (matrix - low) / np.where(span == 0, 1, span)
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _block_rows(n: int, memory_mb: float) -> int:
+    # A float32 similarity block plus argpartition's int64 indices
+    return max(1, int(memory_mb * 1e6 // (n * 12)))
+
+
+def similar_pairs(
+    matrix: np.ndarray,
+    threshold: float = SIMILARITY_THRESHOLD,
+    max_neighbours: Optional[int] = SIMILARITY_MAX_NEIGHBOURS,
+    memory_mb: float = SIMILARITY_MEMORY_MB,
+    rows: Optional[np.ndarray] = None,
+    directed: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sparse list of similar students as three arrays (i, j, cosine similarity)
+    with i < j, for scaled score vectors more similar than ``threshold``.
+
+    With ``max_neighbours`` each student only contributes its most similar
+    peers, so a cohort of n students yields at most n * max_neighbours pairs;
+    a pair is kept if either student picks the other. With ``rows`` only
+    pairs involving those students are computed, e.g. after a re-import; in
+    top-k mode that is the peers they pick, without re-ranking everyone
+    else's picks.
+
+    With ``directed`` the result is each queried student's own picks
+    instead: i is the student and j a peer it picked, with no i < j
+    ordering and no merging of mutual picks.
+    """
+    n = len(matrix)
+    empty = (np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0))
+    if n < 2 or np.asarray(matrix).size == 0:
+        return empty
+
+    # float32 halves the block size and is plenty for a 0.85-style cut-off
+    unit = _unit_rows(scale_scores(matrix)).astype(np.float32)
+    k = min(max_neighbours, n - 1) if max_neighbours else None
+    queried = np.zeros(n, dtype=bool)
+    queried[np.arange(n) if rows is None else rows] = True
+    query_rows = np.flatnonzero(queried)
+    firsts, seconds, sims = [], [], []
+    block = _block_rows(n, memory_mb)
+    for start in range(0, len(query_rows), block):
+        rows = query_rows[start:start + block]
+        similarity = unit[rows] @ unit.T
+        if k is None:
+            # A pair of queried students is seen from both ends; keep i < j
+            keep = similarity > threshold
+            if directed:
+                keep[np.arange(len(rows)), rows] = False
+            else:
+                keep &= (np.arange(n) > rows[:, None]) | ~queried
+            local, j = np.nonzero(keep)
+            i, sim = rows[local], similarity[local, j]
+        else:
+            similarity[np.arange(len(rows)), rows] = -np.inf
+            j = np.argpartition(similarity, n - k, axis=1)[:, n - k:]
+            sim = np.take_along_axis(similarity, j, axis=1)
+            keep = sim > threshold
+            i = np.broadcast_to(rows[:, None], j.shape)[keep]
+            j, sim = j[keep], sim[keep]
+        if not directed:
+            i, j = np.minimum(i, j), np.maximum(i, j)
+        firsts.append(i)
+        seconds.append(j)
+        sims.append(sim)
+
+    i, j, sim = np.concatenate(firsts), np.concatenate(seconds), np.concatenate(sims)
+    if k is not None and not directed:
+        # Both students may have picked each other
+        _, first = np.unique(i * n + j, return_index=True)
+        i, j, sim = i[first], j[first], sim[first]
+    return i.astype(np.int64), j.astype(np.int64), sim.astype(np.float64)
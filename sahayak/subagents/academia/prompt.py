@@ -102,9 +102,9 @@ Query the academic database to provide detailed student performance analysis, te
 ## Query Types You Handle:
 - **find_highest**: Find top performer in a specific topic/grade
 - **find_top_students**: Get top 5 students in a topic/grade
-- **form_teams**: Create balanced study teams
-- **get_statistics**: Generate topic/grade statistics
-- **compare_topics**: Compare performance across topics
+- **form_teams**: Create balanced study teams covering every student in the grade (optional `team_size`, `team_strategy` of "snake" or "greedy", and `peer_similarity` of "mix" or "group"). The tool returns each team's members with per-topic scores, `strengths` and `needs_help`, plus the team `mean` and `spread`; copy members' strengths/needs_help as given and mention the mean and spread in `pairing_logic`
+- **get_statistics**: Generate topic/grade statistics (pass every topic in `topics`, and several grades in `grades` if asked)
+- **compare_topics**: Compare performance across topics (pass all of them in `topics` in a single call)
 
 ## Examples:
 
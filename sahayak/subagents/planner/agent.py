@@ -4,7 +4,7 @@ PlannerBot is a sub-agent of the TeacherAssistant agent. It specializes in curri
 
 from google.adk.agents import Agent, LlmAgent
 from google.adk.tools.agent_tool import AgentTool
-from sahayak.tools.rag import ask_vertex_retrieval, rag_query
+from sahayak.tools.rag import ask_vertex_retrieval, rag_multi_query, rag_query
 from sahayak.tools.image import create_slide_images
 from sahayak.subagents.planner import prompt
 from sahayak.tools.memory import memorize, memorize_list, memorize_dict, load_recent_curriculum, load_recent_lesson_plan, load_recent_whiteboard
@@ -17,7 +17,7 @@ curriculum_planner = Agent(
         "An AI assistant specialized in yearly curriculum planning, calendar integration, "
         "and resource allocation based on local context."
     ),
-    tools=[rag_query, memorize],
+    tools=[rag_query, rag_multi_query, memorize, memorize_list],
     instruction=prompt.CURRICULUM_PLANNER_INSTR,
     # disallow_transfer_to_parent=True,
     # disallow_transfer_to_peers=True,
@@ -30,7 +30,7 @@ lesson_designer = Agent(
         "An AI assistant specialized in creating detailed lesson plans, interactive slides, "
         "and teaching aids."
     ),
-    tools=[rag_query, memorize],
+    tools=[rag_query, rag_multi_query, memorize],
     instruction=prompt.LESSON_DESIGNER_INSTR,
     # disallow_transfer_to_parent=True,
     # disallow_transfer_to_peers=True,
@@ -43,7 +43,7 @@ interactive_whiteboard = Agent(
     description=(
         "An AI assistant specialized in creating interactive whiteboard content/diagrams/flowcharts (image) based on the requested topic."
     ),
-    tools=[rag_query, memorize, memorize_dict],
+    tools=[rag_query, rag_multi_query, memorize, memorize_dict],
     # instruction=prompt.INTERACTIVE_WHITEBOARD_INSTR,
     instruction=(
         "You are an interactive whiteboard expert who creates diagrams, flowcharts, and visual aids based on the requested topic."
@@ -58,7 +58,7 @@ questions_generator = Agent(
     description=(
         "An AI assistant specialized in generating questions and quizzes based on the requested topic and lesson plan."
     ),
-    tools=[rag_query, memorize, memorize_dict],
+    tools=[rag_query, rag_multi_query, memorize, memorize_dict],
     # instruction=prompt.QUESTIONS_GENERATOR_INSTR,
     instruction=(
         "You are a questions generator expert who creates quizzes and questions based on the requested topic and lesson plan."
@@ -75,7 +75,7 @@ topic_helper = Agent(
         "An AI assistant specialized in explaining topics through relatable analogies and examples"
         "based on localized context to help both students and teachers understand concepts better."
     ),
-    tools=[rag_query, memorize, memorize_dict],
+    tools=[rag_query, rag_multi_query, memorize, memorize_dict],
     # instruction=prompt.TOPIC_HELPER_INSTR,
     instruction=(
         "You are a topic helper expert who explains topics through relatable analogies and examples based on localized context."
@@ -104,6 +104,7 @@ presentation_generator = Agent(
     tools=[
         AgentTool(generate_slide_contents),
         rag_query,
+        rag_multi_query,
         memorize,
         memorize_dict,
         create_slide_images,
@@ -126,7 +127,7 @@ content_creator = Agent(
         questions_generator,
         # topic_helper,
     ],
-    tools=[rag_query],
+    tools=[rag_query, rag_multi_query],
     instruction=prompt.CONTENT_CREATOR_INSTR,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
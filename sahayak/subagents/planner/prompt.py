@@ -76,9 +76,10 @@ Follow these steps to create the curriculum plan:
 1. Based on the grade ({current_grade}), retrieve chapter list using `rag_query` with query: "Get all the **CONTENTS** list about this book."
 
 2. List all chapters exactly as retrieved and ask user to confirm. Wait for confirmation before proceeding.
+    Once confirmed, store the confirmed chapter names with `memorize_list` (key: "confirmed_chapters").
 
 3. After confirmation, continue immediately with curriculum creation. DO NOT TRANSFER CONTROL.
-    Make another `rag_query` with query: "Get topics, learning objectives, key concepts for these chapters: [confirmed chapter names]"
+    Make ONE `rag_multi_query` call with one query per confirmed chapter: "Get topics, learning objectives, key concepts for the chapter: [chapter name]"
 
 4. Using the retrieved content, structure the curriculum into terms and months based on:
      - Available teaching days from {year_calendar} 
@@ -156,7 +157,7 @@ First check if curriculum is set:
 - If they want to proceed without curriculum, make a comprehensive RAG search using `rag_query` with a detailed query that includes grade, subject, chapter/topics requested to get all relevant content
 
 For the requested chapter/lesson:
-1. Make a rag search using `rag_query` with detailed query containing chapter details to get topics, subtopics, activities etc.
+1. Make a rag search using `rag_query` with the query "Get topics, learning objectives, key concepts for the chapter: [chapter name]", then further `rag_query` searches with chapter details as needed to get subtopics, activities etc.
 
 2. Using the retrieved content, create lesson plan with:
     - Overview section (chapter title, class, subject, timing, goals)
@@ -324,7 +325,7 @@ Use the `rag_query` tool to fetch relevant content for the requested topics + le
 Once you have the content, follow these steps to generate the presentation:
 1. Use the tool `generate_slide_contents` to create the presentation slides based on the topics, lesson plan, and the rag_query results.
 2. Once you have the `slide_contents`: {slide_contents}, you will now call the tool `create_slide_images` to generate the images for each slide.
-3. Once the images are generated, you will return a very short (2 lines max summary) of the presentation slides and the images generated.
+3. Once the images are generated, you will return a very short (2 lines max summary) of the presentation slides and the images generated. If the tool reports `failed_slides`, name those slides and offer to retry them.
 4. Ensure the presentation is engaging, informative, and visually appealing.
 5. If there's any changes you must stay here and take the feedback from the user and update the slides accordingly.
 """
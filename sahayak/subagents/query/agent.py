@@ -8,7 +8,7 @@ This system includes specialized sub-agents for different types of queries:
 
 from google.adk.agents import Agent, LlmAgent
 from google.adk.tools.agent_tool import AgentTool
-from sahayak.tools.rag import ask_vertex_retrieval, rag_query
+from sahayak.tools.rag import ask_vertex_retrieval, rag_multi_query, rag_query
 from sahayak.tools.image import fetch_textbook_image
 from sahayak.subagents.planner import prompt
 from sahayak.tools.memory import (
@@ -30,7 +30,7 @@ textbook_content_agent = Agent(
         "An AI assistant specialized in answering textbook-related questions using RAG retrieval "
         "and generating relatable analogies and examples to help teachers explain concepts better."
     ),
-    tools=[rag_query, memorize, memorize_dict],
+    tools=[rag_query, rag_multi_query, memorize, memorize_dict],
     instruction=(
         "You are a textbook content expert who answers questions about textbook material. "
         "First check if `current_grade`: {current_grade} has been set.\n If not, check with the user for the grade it's looking for.\n Once you know, use `memorize_dict` to store the current grade and then proceed with their query.\n"
@@ -88,7 +88,7 @@ flow_diagram_agent = Agent(
         "An AI assistant specialized in creating flow diagrams, process charts, and visual "
         "representations of concepts, processes, or systems based on textbook content."
     ),
-    tools=[rag_query, memorize, memorize_dict],
+    tools=[rag_query, rag_multi_query, memorize, memorize_dict],
     instruction=(
         "You are a flow diagram specialist who creates visual process representations. "
         "For each flow diagram request:\n"
@@ -0,0 +1,172 @@
+"""
+Token-budgeted packing of retrieval results before they reach the LLM.
+
+Contexts are taken best score first (scores are vector distances, lower is
+better). Near-duplicates and chunks mostly contained in an earlier one are
+dropped, long chunks are trimmed to their most query-relevant sentences, and
+packing stops at the token budget.
+"""
+
+import asyncio
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+RAG_CONTEXT_PACKING = os.getenv("RAG_CONTEXT_PACKING", "true").lower() != "false"
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "2000"))
+RAG_CONTEXT_CHUNK_TOKENS = int(os.getenv("RAG_CONTEXT_CHUNK_TOKENS", "400"))
+# Shingle Jaccard above which two chunks count as the same text
+NEAR_DUPLICATE_JACCARD = 0.7
+# Share of a chunk's shingles already kept above which it adds nothing new
+OVERLAP_CONTAINMENT = 0.8
+# Smallest leftover budget worth filling with a trimmed chunk
+MIN_CHUNK_TOKENS = 30
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "get", "how",
+    "in", "is", "it", "of", "on", "or", "the", "these", "this", "to", "what",
+    "which", "with", "all", "about", "explain", "give", "me", "list",
+}
+
+_encoder = None
+_encoder_failed = False
+
+
+def load_encoder():
+    """
+    tiktoken's cl100k_base encoding, loaded on first use; None if it can't
+    load. The first load may download the encoding, so async code should go
+    through load_encoder_async().
+    """
+    global _encoder, _encoder_failed
+    if _encoder is None and not _encoder_failed:
+        try:
+            import tiktoken
+
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # e.g. the encoding file can't be downloaded
+            _encoder_failed = True
+            logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+    return _encoder
+
+
+async def load_encoder_async() -> None:
+    """Load the encoding in a worker thread, unless that has been tried already."""
+    if _encoder is None and not _encoder_failed:
+        await asyncio.to_thread(load_encoder)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Tokens in ``text`` by tiktoken's cl100k_base, which tracks Gemini counts
+    closely enough for budgeting; ~4 characters per token if it can't load.
+    """
+    encoder = load_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    words = _words(text)
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def trim_to_relevant(text: str, query_terms: Set[str], max_tokens: int) -> str:
+    """The sentences sharing the most words with the query that fit, in their original order."""
+    sentences = [s.strip() for s in _SENTENCE.split(text) if s.strip()]
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: (-len(query_terms.intersection(_words(sentences[i]))), i),
+    )
+    keep, used = [], 0
+    for i in ranked:
+        tokens = count_tokens(sentences[i])
+        if used + tokens > max_tokens:
+            continue
+        keep.append(i)
+        used += tokens
+    return " ".join(sentences[i] for i in sorted(keep))
+
+
+def pack_contexts(
+    query: str,
+    results: List[Dict[str, Any]],
+    budget: Optional[int] = None,
+    chunk_tokens: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Pack retrieval results into ``budget`` tokens.
+
+    Args:
+        query: The query (or queries, joined) the results answer.
+        results: Records with at least "text" and "score".
+        budget: Token budget for all texts (RAG_CONTEXT_TOKEN_BUDGET).
+        chunk_tokens: Most tokens any one chunk may keep (RAG_CONTEXT_CHUNK_TOKENS).
+
+    Returns:
+        tuple: The packed records, best score first, and packing stats.
+    """
+    budget = budget or RAG_CONTEXT_TOKEN_BUDGET
+    chunk_tokens = chunk_tokens or RAG_CONTEXT_CHUNK_TOKENS
+    query_terms = set(_words(query)) - _STOPWORDS
+
+    tokens_before = 0
+    packed: List[Dict[str, Any]] = []
+    kept_shingles: List[Set[Tuple[str, ...]]] = []
+    seen: Set[Tuple[str, ...]] = set()
+    duplicates = over_budget = trimmed = used = 0
+
+    for result in sorted(results, key=lambda r: r.get("score", 0.0)):
+        text = result.get("text", "")
+        tokens = count_tokens(text)
+        tokens_before += tokens
+
+        shingles = _shingles(text)
+        if shingles and (
+            len(shingles & seen) / len(shingles) >= OVERLAP_CONTAINMENT
+            or any(
+                len(shingles & other) / len(shingles | other) >= NEAR_DUPLICATE_JACCARD
+                for other in kept_shingles
+            )
+        ):
+            duplicates += 1
+            continue
+
+        room = min(chunk_tokens, budget - used)
+        if room < MIN_CHUNK_TOKENS and tokens > room:
+            over_budget += 1
+            continue
+        if tokens > room:
+            text = trim_to_relevant(text, query_terms, room)
+            if not text:
+                over_budget += 1
+                continue
+            tokens = count_tokens(text)
+            trimmed += 1
+
+        packed.append(dict(result, text=text))
+        kept_shingles.append(shingles)
+        seen |= shingles
+        used += tokens
+
+    return packed, {
+        "tokens_before": tokens_before,
+        "tokens_after": used,
+        "tokens_saved": tokens_before - used,
+        "duplicates_dropped": duplicates,
+        "over_budget_dropped": over_budget,
+        "trimmed": trimmed,
+    }
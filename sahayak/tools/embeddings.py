@@ -0,0 +1,77 @@
+"""
+Text embedding functions for query-similarity features.
+
+An embedding function takes a list of texts and returns a float32 array of
+unit-length row vectors. RAG_EMBEDDING picks the default one:
+
+- "vertex": Vertex AI text embeddings (RAG_EMBEDDING_MODEL, default
+  text-embedding-004).
+- "hashed": a local, deterministic bag-of-words stand-in for tests and
+  offline benchmarks; paraphrases sharing words land close together.
+
+Other functions can be added with register_embedding().
+"""
+
+import os
+import re
+import zlib
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+EmbeddingFunction = Callable[[List[str]], np.ndarray]
+
+HASHED_DIMENSIONS = 256
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+def hashed_embedding(texts: List[str], dimensions: int = HASHED_DIMENSIONS) -> np.ndarray:
+    """Feature-hashed word unigrams and bigrams; stable across processes."""
+    vectors = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _TOKEN.findall(text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = zlib.crc32(feature.encode())
+            # One bit of the hash picks the sign, so collisions tend to cancel
+            vectors[row, digest % dimensions] += 1.0 if digest & 1 << 31 else -1.0
+    return _unit_rows(vectors)
+
+
+_vertex_model = None
+
+
+def vertex_embedding(texts: List[str]) -> np.ndarray:
+    """Vertex AI text embeddings; the model is loaded on first use."""
+    global _vertex_model
+    if _vertex_model is None:
+        from vertexai.language_models import TextEmbeddingModel
+
+        _vertex_model = TextEmbeddingModel.from_pretrained(
+            os.getenv("RAG_EMBEDDING_MODEL", "text-embedding-004")
+        )
+    embeddings = _vertex_model.get_embeddings(texts)
+    return _unit_rows(np.array([e.values for e in embeddings], dtype=np.float32))
+
+
+_EMBEDDINGS: Dict[str, EmbeddingFunction] = {
+    "vertex": vertex_embedding,
+    "hashed": hashed_embedding,
+}
+
+
+def register_embedding(name: str, function: EmbeddingFunction) -> None:
+    _EMBEDDINGS[name] = function
+
+
+def get_embedding(name: Optional[str] = None) -> EmbeddingFunction:
+    """The embedding function called ``name``, or the RAG_EMBEDDING default."""
+    name = name or os.getenv("RAG_EMBEDDING", "vertex")
+    if name not in _EMBEDDINGS:
+        raise ValueError(f"Unknown embedding function '{name}'")
+    return _EMBEDDINGS[name]
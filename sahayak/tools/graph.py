@@ -1,12 +1,17 @@
-from google.adk.tools import BaseTool
+from google.adk.tools import BaseTool, ToolContext
 from google.genai import types
-from neo4j import AsyncGraphDatabase
+import asyncio
 import logging
-import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import json
+import numpy as np
 from pydantic import BaseModel
 
+from sahayak.tools.graph_backends import GraphBackend, create_backend
+from sahayak.tools.graph_cache import graph_cache
+from sahayak.tools.score_snapshot import score_snapshot
+from sahayak.tools.teams import PEER_SIMILARITY_MODES, TEAM_STRATEGIES, form_teams
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,341 +20,409 @@ class GraphQueryState(BaseModel):
     topic_a: Optional[str] = None
     topic_b: Optional[str] = None
     grade: Optional[str] = None
+    topics: Optional[List[str]] = None
+    grades: Optional[List[str]] = None
+    team_size: Optional[int] = None
+    team_strategy: Optional[str] = None
+    peer_similarity: Optional[str] = None
+
 
+# Pure reads over imported scores, mapped to the k that shapes their result
+CACHEABLE_INTENTS = {
+    "find_highest": 1,
+    "find_top_students": 5,
+    "get_statistics": None,
+    "compare_topics": None,
+}
 
 class GraphVisualizer(BaseTool):
-    def __init__(self):
+    def __init__(self, backend: Optional[GraphBackend] = None):
         super().__init__(
             name="graph_visualizer",
-            description="Executes Neo4j graph queries to analyze student performance.",
+            description="Queries the student score graph to analyze student performance.",
+        )
+        self._backend = backend
+
+    @property
+    def backend(self) -> GraphBackend:
+        # Created on first use, so a misconfigured GRAPH_BACKEND fails the
+        # query rather than importing the agent package
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "user_intent": types.Schema(
+                        type=types.Type.STRING,
+                        enum=[
+                            "find_highest",
+                            "find_top_students",
+                            "form_teams",
+                            "get_statistics",
+                            "compare_topics",
+                        ],
+                        description="The analysis to run.",
+                    ),
+                    "topic_a": types.Schema(
+                        type=types.Type.STRING, description="Primary topic name."
+                    ),
+                    "topic_b": types.Schema(
+                        type=types.Type.STRING,
+                        description="Second topic, for comparisons and dual-topic teams.",
+                    ),
+                    "grade": types.Schema(
+                        type=types.Type.STRING, description="Grade, e.g. '6'."
+                    ),
+                    "topics": types.Schema(
+                        type=types.Type.ARRAY,
+                        items=types.Schema(type=types.Type.STRING),
+                        description="Any number of topics for get_statistics and compare_topics.",
+                    ),
+                    "grades": types.Schema(
+                        type=types.Type.ARRAY,
+                        items=types.Schema(type=types.Type.STRING),
+                        description="Several grades for get_statistics and compare_topics.",
+                    ),
+                    "team_size": types.Schema(
+                        type=types.Type.INTEGER,
+                        description="Members per team for form_teams (default 3).",
+                    ),
+                    "team_strategy": types.Schema(
+                        type=types.Type.STRING,
+                        enum=list(TEAM_STRATEGIES),
+                        description="snake draft (default) or greedy balancing.",
+                    ),
+                    "peer_similarity": types.Schema(
+                        type=types.Type.STRING,
+                        enum=list(PEER_SIMILARITY_MODES),
+                        description="Use SIMILAR_TO peers: mix them across teams or group them together.",
+                    ),
+                },
+                required=["user_intent"],
+            ),
         )
 
+    def _parse_state(self, args: Dict[str, Any]) -> GraphQueryState:
+        logger.info(f"🔧 GraphVisualizer called with: {args}")
+        return GraphQueryState(**{k: v for k, v in args.items() if v is not None})
+
+    def _format_result(self, result) -> str:
+        if isinstance(result, dict):
+            json_string = json.dumps(result, indent=2)
+            logger.info(
+                f"🔧 GraphVisualizer returning JSON string: {json_string[:200]}..."
+            )
+            return json_string
+        return result
+
+    async def _execute(self, args: Dict[str, Any]) -> str:
+        try:
+            parsed_state = self._parse_state(args)
+        except Exception as e:
+            error_msg = f"Invalid parameters: {e}"
+            logger.error(error_msg)
+            return error_msg
+
+        try:
+            return self._format_result(await self._run_query(parsed_state))
+        except Exception as e:
+            logger.exception("Graph query failed")
+            return f"Query failed: {e}"
+
+    async def run_async(
+        self, *, args: Dict[str, Any], tool_context: ToolContext
+    ) -> Dict[str, Any]:
+        """
+        Run the query on the server's event loop, sharing the pooled driver.
+        """
+        return {"result": await self._execute(args)}
+
     def run(
         self,
         user_intent: str,
-        topic_a: str,
+        topic_a: Optional[str] = None,
         grade: Optional[str] = None,
         topic_b: Optional[str] = None,
+        topics: Optional[List[str]] = None,
+        grades: Optional[List[str]] = None,
+        team_size: Optional[int] = None,
+        team_strategy: Optional[str] = None,
+        peer_similarity: Optional[str] = None,
     ):
         """
-        Sync wrapper for async Neo4j query execution.
+        Sync compatibility shim for scripts; agents go through run_async.
         """
-        logger.info(f"🔧 GraphVisualizer.run() called with:")
-        logger.info(f"   user_intent={user_intent}")
-        logger.info(f"   topic_a={topic_a}")
-        logger.info(f"   grade={grade}")
-        logger.info(f"   topic_b={topic_b}")
-
         try:
-            # Build state dict
-            state = {
-                "user_intent": user_intent,
-                "topic_a": topic_a,
-                "grade": grade,
-                "topic_b": topic_b,
-            }
-
-            # Validate state
-            parsed_state = GraphQueryState(
-                **{k: v for k, v in state.items() if v is not None}
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "GraphVisualizer.run() cannot be called from a running event loop; "
+                "await run_async() instead"
             )
 
-        except Exception as e:
-            error_msg = f"Invalid parameters: {e}"
-            logger.error(error_msg)
-            return types.Content(role="tool", parts=[types.Part(text=error_msg)])
+        async def _run_once():
+            try:
+                return await self._execute(
+                    {
+                        "user_intent": user_intent,
+                        "topic_a": topic_a,
+                        "grade": grade,
+                        "topic_b": topic_b,
+                        "topics": topics,
+                        "grades": grades,
+                        "team_size": team_size,
+                        "team_strategy": team_strategy,
+                        "peer_similarity": peer_similarity,
+                    }
+                )
+            finally:
+                # The loop created by asyncio.run dies with this call, and the
+                # Neo4j driver is bound to it.
+                if self._backend is not None and self._backend.name == "neo4j":
+                    await self._backend.close()
+
+        text = asyncio.run(_run_once())
+        return types.Content(role="tool", parts=[types.Part(text=text)])
+
+    async def _run_query(self, parsed_state: GraphQueryState) -> str:
+        """Async method to run graph queries."""
+        logger.info("🚀 Executing graph query...")
 
-        # Since we're in sync context, run the async method in a new event loop
-        import asyncio
-        import nest_asyncio  # ✅ Handle nested event loops
+        if not self._topics(parsed_state):
+            return "Please specify at least one topic"
 
         try:
-            # Allow nested event loops
-            nest_asyncio.apply()
-            result = asyncio.run(self._run_query(parsed_state))
-            if isinstance(result, dict):
-                json_string = json.dumps(result, indent=2)
-                logger.info(
-                    f"🔧 GraphVisualizer.run() returning JSON string: {json_string[:200]}..."
+            await graph_cache.sync_version(self.backend)
+            await score_snapshot.refresh(self.backend, graph_cache.data_version)
+
+            cache_key = None
+            if parsed_state.user_intent in CACHEABLE_INTENTS:
+                k = CACHEABLE_INTENTS[parsed_state.user_intent]
+                topics, grades = self._topics(parsed_state), self._grades(parsed_state)
+                if k is not None:
+                    # Top-k intents only look at the first topic and grade
+                    topics, grades = topics[:1], [parsed_state.grade]
+                cache_key = graph_cache.make_key(
+                    parsed_state.user_intent, topics, grades, k
                 )
-                return types.Content(role="tool", parts=[types.Part(text=json_string)])
-            else:
-                return types.Content(role="tool", parts=[types.Part(text=result)])
+                cached = graph_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("⚡ Serving graph query from cache")
+                    return cached
+
+            result = await self._dispatch(parsed_state)
+            if cache_key is not None:
+                graph_cache.set(cache_key, result)
+            return result
         except Exception as e:
-            error_msg = f"Query failed: {e}"
-            logger.exception("Neo4j query failed")
-            return types.Content(role="tool", parts=[types.Part(text=error_msg)])
-
-    async def _run_query(self, parsed_state: GraphQueryState) -> str:
-        """Async method to run Neo4j queries."""
-        logger.info("🚀 Executing Neo4j query...")
+            logger.exception("Graph query failed")
+            return f"Query execution failed: {e}"
 
-        driver = AsyncGraphDatabase.driver(
-            os.getenv("NEO4J_URI", "bolt://localhost:7687"),
-            auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
-        )
+    async def _dispatch(self, parsed_state: GraphQueryState):
+        if parsed_state.user_intent == "find_highest":
+            return await self._find_highest_student(parsed_state)
 
-        try:
-            async with driver.session(database="neo4j") as session:
-                if parsed_state.user_intent == "find_highest":
-                    return await self._find_highest_student(session, parsed_state)
+        elif parsed_state.user_intent == "find_top_students":
+            return await self._find_top_students(parsed_state)
 
-                elif parsed_state.user_intent == "find_top_students":
-                    return await self._find_top_students(session, parsed_state)
+        elif parsed_state.user_intent == "form_teams":
+            return await self._form_teams(parsed_state)
 
-                elif parsed_state.user_intent == "form_teams":
-                    return await self._form_teams(session, parsed_state)
+        elif parsed_state.user_intent == "get_statistics":
+            return await self._get_topic_statistics(parsed_state)
 
-                elif parsed_state.user_intent == "get_statistics":
-                    return await self._get_topic_statistics(session, parsed_state)
+        elif parsed_state.user_intent == "compare_topics":
+            return await self._compare_topics(parsed_state)
 
-                elif parsed_state.user_intent == "compare_topics":
-                    return await self._compare_topics(session, parsed_state)
+        else:
+            return "Unsupported or incomplete intent"
 
-                else:
-                    return "Unsupported or incomplete intent"
-        except Exception as e:
-            logger.exception("Neo4j query failed")
-            return f"Query execution failed: {e}"
-        finally:
-            await driver.close()
+    def _topics(self, parsed_state: GraphQueryState) -> List[str]:
+        """Topics named in the request, title-cased and de-duplicated in order."""
+        names = [parsed_state.topic_a, parsed_state.topic_b] + list(
+            parsed_state.topics or []
+        )
+        topics = []
+        for name in names:
+            if name and name.strip().title() not in topics:
+                topics.append(name.strip().title())
+        return topics
+
+    def _grades(self, parsed_state: GraphQueryState) -> Optional[List[str]]:
+        """Grades named in the request, or None to aggregate over all grades."""
+        grades = list(parsed_state.grades or [])
+        if parsed_state.grade and parsed_state.grade not in grades:
+            grades.insert(0, parsed_state.grade)
+        return [str(g) for g in grades] or None
+
+    async def _top_students(
+        self, topic: str, grade: Optional[str], k: int
+    ) -> List[Dict[str, Any]]:
+        """Top k individual scores, from the snapshot when loaded."""
+        students = score_snapshot.top_students(topic, grade, k)
+        if students is not None:
+            return students
+        return await self.backend.top_students(topic, grade, k)
+
+    async def _team_scores(
+        self, topics: List[str], grade: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Topic existence and per-topic scores in one round trip."""
+        rows = score_snapshot.team_scores(topics, grade)
+        if rows is not None:
+            return rows
+        return await self.backend.team_scores(topics, grade)
 
     async def _find_highest_student(
-        self, session, parsed_state: GraphQueryState
+        self, parsed_state: GraphQueryState
     ) -> str:
         """Find the highest scoring student."""
-        result = await session.run(
-            """
-            MATCH (s:Student)-[r:SCORED_IN]->(t:Topic {name: $topic_a, grade: $grade})
-            RETURN s.name AS student_name, r.score AS score
-            ORDER BY r.score DESC
-            LIMIT 1
-        """,
-            {"topic_a": parsed_state.topic_a.title(), "grade": parsed_state.grade},
-        )
-        record = await result.single()
+        topic = self._topics(parsed_state)[0]
+        students = await self._top_students(topic, parsed_state.grade, 1)
+        record = students[0] if students else None
         if record:
-            return f"🏆 Top student in {parsed_state.topic_a} (Grade {parsed_state.grade}): {record['student_name']} (Score: {record['score']})"
-        return f"No student found for {parsed_state.topic_a} topic in Grade {parsed_state.grade}"
+            return f"🏆 Top student in {topic} (Grade {parsed_state.grade}): {record['student_name']} (Score: {record['score']})"
+        return f"No student found for {topic} topic in Grade {parsed_state.grade}"
 
-    async def _find_top_students(self, session, parsed_state: GraphQueryState) -> str:
+    async def _find_top_students(self, parsed_state: GraphQueryState) -> str:
         """Find top 5 students for a topic."""
-        result = await session.run(
-            """
-            MATCH (s:Student)-[r:SCORED_IN]->(t:Topic {name: $topic_a, grade: $grade})
-            RETURN s.name AS student_name, r.score AS score
-            ORDER BY r.score DESC
-            LIMIT 5
-        """,
-            {"topic_a": parsed_state.topic_a.title(), "grade": parsed_state.grade},
-        )
-        students = await result.data()
+        topic = self._topics(parsed_state)[0]
+        students = await self._top_students(topic, parsed_state.grade, 5)
         if students:
             rankings = []
             for i, student in enumerate(students, 1):
                 rankings.append(f"{i}. {student['student_name']}: {student['score']}")
             return (
-                f"🏅 Top 5 students in {parsed_state.topic_a} (Grade {parsed_state.grade}):\n"
+                f"🏅 Top 5 students in {topic} (Grade {parsed_state.grade}):\n"
                 + "\n".join(rankings)
             )
-        return f"No students found for {parsed_state.topic_a} topic in Grade {parsed_state.grade}"
+        return f"No students found for {topic} topic in Grade {parsed_state.grade}"
 
     async def _form_teams(
-        self, session, parsed_state: GraphQueryState
+        self, parsed_state: GraphQueryState
     ) -> Dict[str, Any]:
-        """Enhanced team formation returning structured JSON."""
-        if parsed_state.topic_b:
-            # Dual topic team formation
-            logger.info(
-                f"Forming teams based on {parsed_state.topic_a} + {parsed_state.topic_b}"
-            )
+        """Split every student in the grade into balanced teams, as structured JSON."""
+        topics = self._topics(parsed_state)
+        logger.info(f"Forming teams based on {' + '.join(topics)}")
 
-            topic_check = await session.run(
-                """
-                MATCH (t:Topic {grade: $grade})
-                WHERE t.name IN [$topic_a, $topic_b]
-                RETURN t.name AS topic_name
-            """,
-                {
-                    "topic_a": parsed_state.topic_a.title(),
-                    "topic_b": parsed_state.topic_b.title(),
-                    "grade": parsed_state.grade,
-                },
-            )
-            existing_topics = [record["topic_name"] async for record in topic_check]
-
-            if len(existing_topics) < 2:
-                missing = set(
-                    [parsed_state.topic_a.title(), parsed_state.topic_b.title()]
-                ) - set(existing_topics)
-                return {
-                    "error": f"Cannot form teams: Topics not found: {', '.join(missing)}"
-                }
-
-            result = await session.run(
-                """
-                MATCH (s:Student)-[r1:SCORED_IN]->(t1:Topic {name: $topic_a, grade: $grade}),
-                    (s)-[r2:SCORED_IN]->(t2:Topic {name: $topic_b, grade: $grade})
-                RETURN s.name AS student_name, r1.score AS score_a, r2.score AS score_b
-                ORDER BY (r1.score + r2.score) DESC
-                LIMIT 8
-            """,
-                {
-                    "topic_a": parsed_state.topic_a.title(),
-                    "topic_b": parsed_state.topic_b.title(),
-                    "grade": parsed_state.grade,
-                },
-            )
-            students = await result.data()
+        rows = await self._team_scores(topics, parsed_state.grade)
 
-            if not students:
-                return {
-                    "error": f"No students found who have scores for both '{parsed_state.topic_a}' and '{parsed_state.topic_b}'"
-                }
-        else:
-            # Single topic team formation
-            logger.info(f"Forming teams based on {parsed_state.topic_a} only")
-
-            topic_check = await session.run(
-                """
-                MATCH (t:Topic {name: $topic_a, grade: $grade})
-                RETURN t.name AS topic_name
-            """,
-                {"topic_a": parsed_state.topic_a.title(), "grade": parsed_state.grade},
-            )
-            topic_exists = await topic_check.single()
-            if not topic_exists:
-                return {
-                    "error": f"Cannot form teams: Topic '{parsed_state.topic_a}' not found for grade {parsed_state.grade}"
-                }
-
-            result = await session.run(
-                """
-                MATCH (s:Student)-[r:SCORED_IN]->(t:Topic {name: $topic_a, grade: $grade})
-                RETURN s.name AS student_name, r.score AS score
-                ORDER BY r.score DESC
-                LIMIT 8
-            """,
-                {"topic_a": parsed_state.topic_a.title(), "grade": parsed_state.grade},
-            )
-            students = await result.data()
+        missing = [row["topic"] for row in rows if not row["topic_exists"]]
+        if missing:
+            return {
+                "error": f"Cannot form teams: Topics not found for grade {parsed_state.grade}: {', '.join(missing)}"
+            }
 
-            if not students:
-                return {
-                    "error": f"No students found with scores for '{parsed_state.topic_a}' topic"
-                }
+        names, roll_nos, matrix = self._score_matrix(rows, topics)
+        if not names:
+            return {
+                "error": f"No students found who have scores for all of: {', '.join(topics)}"
+            }
 
-        # ✅ Build structured team JSON
-        teams = await self._create_balanced_teams(
-            students, parsed_state.topic_b is not None
+        similar_pairs = None
+        if parsed_state.peer_similarity:
+            similar_pairs = await self.backend.similar_pairs(roll_nos, parsed_state.grade)
+
+        return form_teams(
+            names,
+            roll_nos,
+            matrix,
+            topics,
+            team_size=parsed_state.team_size or 3,
+            strategy=parsed_state.team_strategy or "snake",
+            similar_pairs=similar_pairs,
+            peer_similarity=parsed_state.peer_similarity,
         )
-        return {"type": "study_buddy", "teams": teams}
 
-    async def _create_balanced_teams(
-        self, students: List[Dict], is_dual_topic: bool
-    ) -> str:
-        """Create balanced teams with better distribution."""
-        if len(students) == 1:
-            student = students[0]
-            if is_dual_topic:
-                return f"Team 1: {student['student_name']} (Scores: {student['score_a']}, {student['score_b']}) (solo)"
-            else:
-                score = student.get("score", student.get("score_a", "N/A"))
-                return f"Team 1: {student['student_name']} (Score: {score}) (solo)"
-
-        # Create teams of 2-3 students for better collaboration
-        teams = []
-        team_size = 3 if len(students) >= 6 else 2
-
-        for i in range(0, len(students), team_size):
-            team_students = students[i : i + team_size]
-            team_members = []
-
-            for student in team_students:
-                if is_dual_topic and "score_a" in student:
-                    team_members.append(
-                        f"{student['student_name']} ({student['score_a']}, {student['score_b']})"
-                    )
-                else:
-                    score = student.get("score", student.get("score_a", "N/A"))
-                    team_members.append(f"{student['student_name']} ({score})")
-
-            team_str = f"Team {(i//team_size) + 1}: {', '.join(team_members)}"
-            teams.append(team_str)
-
-        return "\n".join(teams)
+    def _score_matrix(
+        self, rows: List[Dict[str, Any]], topics: List[str]
+    ) -> Tuple[List[str], List[Any], np.ndarray]:
+        """Pivot per-topic rows into a students x topics matrix of 0-1 scores."""
+        column = {topic: j for j, topic in enumerate(topics)}
+        index: Dict[Any, int] = {}
+        names: List[str] = []
+        cells: List[Tuple[int, int, float]] = []
+        for row in rows:
+            j = column[row["topic"]]
+            for entry in row["scores"]:
+                i = index.setdefault(entry["roll_no"], len(index))
+                if i == len(names):
+                    names.append(entry["student_name"])
+                score = entry["score"] or 0
+                out_of = entry.get("out_of")
+                cells.append((i, j, score / out_of if out_of else score))
+
+        matrix = np.full((len(names), len(topics)), np.nan)
+        if cells:
+            i, j, value = zip(*cells)
+            matrix[list(i), list(j)] = value
+        # Only students scored in every requested topic can be balanced fairly
+        complete = ~np.isnan(matrix).any(axis=1)
+        roll_nos = list(index)
+        keep = np.flatnonzero(complete).tolist()
+        return [names[i] for i in keep], [roll_nos[i] for i in keep], matrix[complete]
+
+    async def _topic_statistics(
+        self, parsed_state: GraphQueryState
+    ) -> List[Dict[str, Any]]:
+        """Per (topic, grade) aggregates for every requested topic in one query."""
+        topics, grades = self._topics(parsed_state), self._grades(parsed_state)
+        rows = score_snapshot.topic_statistics(topics, grades)
+        if rows is not None:
+            return rows
+        return await self.backend.topic_statistics(topics, grades)
+
+    def _label(self, row: Dict[str, Any]) -> str:
+        return f"{row['topic']} (Grade {row['grade']})" if row["grade"] else row["topic"]
 
     async def _get_topic_statistics(
-        self, session, parsed_state: GraphQueryState
+        self, parsed_state: GraphQueryState
     ) -> str:
-        """Get statistics for a topic."""
-        result = await session.run(
-            """
-            MATCH (s:Student)-[r:SCORED_IN]->(t:Topic {name: $topic_a, grade: $grade})
-            RETURN 
-                count(r) AS total_scores,
-                avg(r.score) AS average_score,
-                min(r.score) AS min_score,
-                max(r.score) AS max_score
-        """,
-            {"topic_a": parsed_state.topic_a.title(), "grade": parsed_state.grade},
-        )
-        record = await result.single()
-        if record:
-            return (
-                f"📊 Statistics for {parsed_state.topic_a} (Grade {parsed_state.grade}):\n"
-                f"• Total students: {record['total_scores']}\n"
-                f"• Average score: {record['average_score']:.1f}\n"
-                f"• Highest score: {record['max_score']}\n"
-                f"• Lowest score: {record['min_score']}"
+        """Get statistics for one or more topics."""
+        rows = await self._topic_statistics(parsed_state)
+        sections = []
+        for row in rows:
+            if not row["topic_exists"] or not row["total_scores"]:
+                sections.append(f"No data found for {self._label(row)}")
+                continue
+            sections.append(
+                f"📊 Statistics for {self._label(row)}:\n"
+                f"• Total students: {row['total_scores']}\n"
+                f"• Average score: {row['average_score']:.1f}\n"
+                f"• Highest score: {row['max_score']}\n"
+                f"• Lowest score: {row['min_score']}"
             )
-        return f"No data found for {parsed_state.topic_a} topic in Grade {parsed_state.grade}"
+        return "\n\n".join(sections)
 
-    async def _compare_topics(self, session, parsed_state: GraphQueryState) -> str:
-        """Compare performance between two topics."""
-        if not parsed_state.topic_b:
+    async def _compare_topics(self, parsed_state: GraphQueryState) -> str:
+        """Compare performance across two or more topics."""
+        if len(self._topics(parsed_state)) < 2:
             return "Please specify two topics to compare"
 
-        # Get average scores for both topics
-        result_a = await session.run(
-            """
-            MATCH (s:Student)-[r:SCORED_IN]->(t:Topic {name: $topic_a, grade: $grade})
-            RETURN avg(r.score) AS avg_score, count(r) AS student_count
-        """,
-            {"topic_a": parsed_state.topic_a.title(), "grade": parsed_state.grade},
-        )
-        record_a = await result_a.single()
-
-        result_b = await session.run(
-            """
-            MATCH (s:Student)-[r:SCORED_IN]->(t:Topic {name: $topic_b, grade: $grade})
-            RETURN avg(r.score) AS avg_score, count(r) AS student_count
-        """,
-            {"topic_b": parsed_state.topic_b.title(), "grade": parsed_state.grade},
-        )
-        record_b = await result_b.single()
+        rows = await self._topic_statistics(parsed_state)
+        missing = [self._label(r) for r in rows if not r["total_scores"]]
+        if missing:
+            return f"Insufficient data for comparison: no scores for {', '.join(missing)}"
 
-        if not record_a or not record_b:
-            return "Insufficient data for comparison"
-
-        avg_a = record_a["avg_score"] or 0
-        avg_b = record_b["avg_score"] or 0
+        ranked = sorted(rows, key=lambda r: r["average_score"] or 0, reverse=True)
 
         comparison = "📈 Topic Comparison:\n"
-        comparison += f"• {parsed_state.topic_a}: {avg_a:.1f} avg (from {record_a['student_count']} students)\n"
-        comparison += f"• {parsed_state.topic_b}: {avg_b:.1f} avg (from {record_b['student_count']} students)\n"
+        for row in ranked:
+            comparison += f"• {self._label(row)}: {row['average_score']:.1f} avg (from {row['total_scores']} students)\n"
 
-        if avg_a > avg_b:
-            diff = avg_a - avg_b
-            comparison += (
-                f"• {parsed_state.topic_a} performed better by {diff:.1f} points"
-            )
-        elif avg_b > avg_a:
-            diff = avg_b - avg_a
-            comparison += (
-                f"• {parsed_state.topic_b} performed better by {diff:.1f} points"
-            )
+        best, worst = ranked[0], ranked[-1]
+        diff = (best["average_score"] or 0) - (worst["average_score"] or 0)
+        if diff > 0:
+            comparison += f"• {self._label(best)} performed best, {diff:.1f} points ahead of {self._label(worst)}"
         else:
-            comparison += "• Both topics showed similar performance"
+            comparison += "• All topics showed similar performance"
 
         return comparison
@@ -0,0 +1,388 @@
+"""
+Storage backends behind GraphVisualizer's intent handlers.
+
+Every backend answers the same small set of reads with the same row shapes,
+so the handlers, the result cache and the score snapshot don't care where the
+scores live:
+
+- Neo4jBackend: the live graph at NEO4J_URI, queried with Cypher.
+- EmbeddedBackend: an in-process SQLite copy fed by the same score-sheet
+  CSVs student_graph.py imports, for offline benchmarking and tests.
+
+GRAPH_BACKEND selects one ("neo4j" by default, or "embedded" with
+GRAPH_EMBEDDED_CSV naming a CSV path or glob and GRAPH_EMBEDDED_GRADE the
+grade of sheets without a "Grade" column).
+"""
+
+import abc
+import asyncio
+import glob
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from sahayak.shared_libs.score_sheet import ScoreSheet
+from sahayak.shared_libs.similarity import similar_pairs
+from sahayak.tools.graph_cache import DATA_VERSION_QUERY
+from sahayak.tools.graph_driver import driver_manager
+
+logger = logging.getLogger(__name__)
+
+TOP_STUDENTS_QUERY = """
+    MATCH (s:Student)-[r:SCORED_IN]->(t:Topic {name: $topic, grade: $grade})
+    RETURN s.name AS student_name, r.score AS score
+    ORDER BY r.score DESC
+    LIMIT $k
+"""
+
+# One row per (topic, grade); topics without a matching node come back with
+# topic_exists = false instead of needing a separate existence check. Topics
+# are matched on {name, grade} so the lookup seeks the topic_name_grade index.
+TOPIC_STATISTICS_QUERY = """
+    UNWIND $topics AS topic_name
+    UNWIND $grades AS grade
+    OPTIONAL MATCH (t:Topic {name: topic_name, grade: grade})
+    OPTIONAL MATCH (:Student)-[r:SCORED_IN]->(t)
+    RETURN
+        topic_name AS topic,
+        grade,
+        count(DISTINCT t) > 0 AS topic_exists,
+        count(r) AS total_scores,
+        avg(r.score) AS average_score,
+        min(r.score) AS min_score,
+        max(r.score) AS max_score
+"""
+
+# The same, pooled over every grade of each topic (seeks the topic_name index)
+TOPIC_STATISTICS_ALL_GRADES_QUERY = """
+    UNWIND $topics AS topic_name
+    OPTIONAL MATCH (t:Topic {name: topic_name})
+    OPTIONAL MATCH (:Student)-[r:SCORED_IN]->(t)
+    RETURN
+        topic_name AS topic,
+        null AS grade,
+        count(DISTINCT t) > 0 AS topic_exists,
+        count(r) AS total_scores,
+        avg(r.score) AS average_score,
+        min(r.score) AS min_score,
+        max(r.score) AS max_score
+"""
+
+# Per-student mean over a topic's tests; the whole grade, not a top-N slice
+TEAM_SCORES_QUERY = """
+    UNWIND $topics AS topic_name
+    OPTIONAL MATCH (t:Topic {name: topic_name, grade: $grade})
+    OPTIONAL MATCH (s:Student)-[r:SCORED_IN]->(t)
+    WITH topic_name, t, s, avg(r.score) AS score, max(r.out_of) AS out_of
+    RETURN
+        topic_name AS topic,
+        count(t) > 0 AS topic_exists,
+        collect(
+            CASE WHEN s IS NULL THEN null
+            ELSE {student_name: s.name, roll_no: s.roll_no, score: score, out_of: out_of} END
+        ) AS scores
+"""
+
+# Seeks each student through the (grade, roll_no) constraint and expands its
+# picks; the far end is only filtered, so the planner has one anchor to seek
+SIMILAR_PAIRS_QUERY = """
+    UNWIND $roll_nos AS roll_no
+    MATCH (a:Student {grade: $grade, roll_no: roll_no})-[:SIMILAR_TO]->(b:Student)
+    WHERE b.grade = $grade AND b.roll_no IN $roll_nos
+    RETURN a.roll_no AS a, b.roll_no AS b
+"""
+
+SNAPSHOT_QUERY = """
+    MATCH (s:Student)-[r:SCORED_IN]->(t:Topic)
+    RETURN
+        s.roll_no AS roll_no,
+        s.name AS name,
+        t.name AS topic,
+        t.grade AS grade,
+        r.test AS test,
+        r.score AS score,
+        r.out_of AS out_of
+"""
+
+SNAPSHOT_COLUMNS = ["roll_no", "name", "topic", "grade", "test", "score", "out_of"]
+
+
+class GraphBackend(abc.ABC):
+    """Reads GraphVisualizer needs, with the row shapes it expects."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def data_version(self) -> Optional[int]:
+        """Counter that moves whenever the score data changes."""
+
+    @abc.abstractmethod
+    async def top_students(
+        self, topic: str, grade: Optional[str], k: int
+    ) -> List[Dict[str, Any]]:
+        """[{student_name, score}] for the k highest individual scores."""
+
+    @abc.abstractmethod
+    async def topic_statistics(
+        self, topics: List[str], grades: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        """[{topic, grade, topic_exists, total_scores, average_score, min_score,
+        max_score}] per (topic, grade); grades=None aggregates all grades."""
+
+    @abc.abstractmethod
+    async def team_scores(
+        self, topics: List[str], grade: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """[{topic, topic_exists, scores: [{student_name, roll_no, score,
+        out_of}]}] with each student's mean score per topic."""
+
+    @abc.abstractmethod
+    async def similar_pairs(self, roll_nos: List[Any], grade: str) -> List[Tuple[Any, Any]]:
+        """SIMILAR_TO pairs among the given students of one grade."""
+
+    @abc.abstractmethod
+    async def snapshot_frame(self) -> pd.DataFrame:
+        """Every score as long rows (SNAPSHOT_COLUMNS) for the score snapshot."""
+
+    async def close(self) -> None:
+        pass
+
+
+class Neo4jBackend(GraphBackend):
+    """The live graph, through the process-wide pooled driver."""
+
+    name = "neo4j"
+
+    async def _data(self, query: str, params: Optional[Dict[str, Any]] = None):
+        async with driver_manager.session() as session:
+            result = await session.run(query, params or {})
+            return await result.data()
+
+    async def data_version(self) -> Optional[int]:
+        rows = await self._data(DATA_VERSION_QUERY)
+        return rows[0]["version"] if rows else None
+
+    async def top_students(self, topic, grade, k):
+        return await self._data(
+            TOP_STUDENTS_QUERY, {"topic": topic, "grade": grade, "k": k}
+        )
+
+    async def topic_statistics(self, topics, grades):
+        if grades is None:
+            return await self._data(TOPIC_STATISTICS_ALL_GRADES_QUERY, {"topics": topics})
+        return await self._data(
+            TOPIC_STATISTICS_QUERY, {"topics": topics, "grades": grades}
+        )
+
+    async def team_scores(self, topics, grade):
+        return await self._data(TEAM_SCORES_QUERY, {"topics": topics, "grade": grade})
+
+    async def similar_pairs(self, roll_nos, grade):
+        rows = await self._data(SIMILAR_PAIRS_QUERY, {"roll_nos": roll_nos, "grade": grade})
+        # SIMILAR_TO edges are each student's picks, so a mutual pair comes back twice
+        return list(dict.fromkeys((min(row["a"], row["b"]), max(row["a"], row["b"])) for row in rows))
+
+    async def snapshot_frame(self):
+        rows = await self._data(SNAPSHOT_QUERY)
+        return await asyncio.to_thread(pd.DataFrame.from_records, rows, columns=SNAPSHOT_COLUMNS)
+
+    async def close(self):
+        await driver_manager.close()
+
+
+EMBEDDED_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS students (
+        grade TEXT NOT NULL, roll_no INTEGER NOT NULL, name TEXT, gender TEXT, photo TEXT,
+        PRIMARY KEY (grade, roll_no)
+    );
+    CREATE TABLE IF NOT EXISTS topics (
+        name TEXT NOT NULL, grade TEXT, UNIQUE (name, grade)
+    );
+    CREATE TABLE IF NOT EXISTS scores (
+        roll_no INTEGER NOT NULL, topic TEXT NOT NULL, grade TEXT, test TEXT NOT NULL,
+        score INTEGER, out_of INTEGER,
+        UNIQUE (roll_no, topic, grade, test)
+    );
+    CREATE INDEX IF NOT EXISTS scores_topic_grade ON scores (topic, grade);
+    CREATE TABLE IF NOT EXISTS similar (
+        a_grade TEXT NOT NULL, a INTEGER NOT NULL, b_grade TEXT NOT NULL, b INTEGER NOT NULL,
+        similarity REAL, UNIQUE (a_grade, a, b_grade, b)
+    );
+"""
+
+
+class EmbeddedBackend(GraphBackend):
+    """
+    In-process SQLite stand-in for the graph, loaded from score-sheet CSVs with
+    the same parsing and similarity rules as the importer. sqlite3 blocks, so
+    queries run in a worker thread, one at a time on the shared connection.
+    """
+
+    name = "embedded"
+
+    def __init__(self, path: str = ":memory:"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(EMBEDDED_SCHEMA)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, pattern: str, grade: Optional[str] = None) -> "EmbeddedBackend":
+        backend = cls()
+        paths = sorted(glob.glob(pattern)) or [pattern]
+        for path in paths:
+            backend.load_sheet(ScoreSheet(pd.read_csv(path), grade=grade))
+        return backend
+
+    def load_sheet(self, sheet: ScoreSheet) -> None:
+        """Upsert a sheet the way student_graph.py MERGEs it into Neo4j."""
+        students = sheet.students()
+        # NULLs never collide in a UNIQUE index, so a missing grade is stored
+        # as '' to keep re-imports upserting instead of duplicating
+        scores = sheet.long_scores()
+        scores = scores.assign(grade=scores["grade"].fillna(""))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO students VALUES (?, ?, ?, ?, ?) ON CONFLICT (grade, roll_no) DO UPDATE "
+                "SET name = excluded.name, gender = excluded.gender, photo = excluded.photo",
+                students[["grade", "roll_no", "name", "gender", "photo"]].itertuples(index=False),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO topics VALUES (?, ?)",
+                scores[["topic", "grade"]].drop_duplicates().itertuples(index=False),
+            )
+            self.conn.executemany(
+                "INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (roll_no, topic, grade, test) DO UPDATE "
+                "SET score = excluded.score, out_of = excluded.out_of",
+                scores[["roll_no", "topic", "grade", "test", "score", "out_of"]].itertuples(
+                    index=False
+                ),
+            )
+            grades, roll_nos = sheet.student_grades().to_numpy(), sheet.df["Roll No"].to_numpy()
+            i, j, sim = similar_pairs(sheet.score_matrix())
+            self.conn.executemany(
+                "INSERT INTO similar VALUES (?, ?, ?, ?, ?) ON CONFLICT (a_grade, a, b_grade, b) "
+                "DO UPDATE SET similarity = excluded.similarity",
+                zip(
+                    grades[i].tolist(),
+                    roll_nos[i].tolist(),
+                    grades[j].tolist(),
+                    roll_nos[j].tolist(),
+                    sim.tolist(),
+                ),
+            )
+        self.version += 1
+
+    def _rows(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    async def _run(self, read, *args):
+        """Run a blocking read in a worker thread, holding the connection."""
+
+        def locked():
+            with self._lock:
+                return read(*args)
+
+        return await asyncio.to_thread(locked)
+
+    async def data_version(self):
+        return self.version
+
+    async def top_students(self, topic, grade, k):
+        # "grade = NULL" never matches, just like {grade: null} in Cypher
+        return await self._run(
+            self._rows,
+            "SELECT s.name AS student_name, sc.score AS score "
+            "FROM scores sc JOIN students s USING (grade, roll_no) "
+            "WHERE sc.topic = ? AND sc.grade = ? ORDER BY sc.score DESC LIMIT ?",
+            (topic, grade, k),
+        )
+
+    def _topic_statistics(self, topics, grades):
+        rows = []
+        for topic in topics:
+            for grade in grades or [None]:
+                exists = self.conn.execute(
+                    "SELECT 1 FROM topics WHERE name = ? AND (? IS NULL OR grade = ?)",
+                    (topic, grade, grade),
+                ).fetchone()
+                # count(*), like count(r): a relationship without a score still counts
+                stats = self._rows(
+                    "SELECT count(*) AS total_scores, avg(score) AS average_score, "
+                    "min(score) AS min_score, max(score) AS max_score "
+                    "FROM scores WHERE topic = ? AND (? IS NULL OR grade = ?)",
+                    (topic, grade, grade),
+                )[0]
+                rows.append(
+                    {"topic": topic, "grade": grade, "topic_exists": exists is not None}
+                    | stats
+                )
+        return rows
+
+    async def topic_statistics(self, topics, grades):
+        return await self._run(self._topic_statistics, topics, grades)
+
+    def _team_scores(self, topics, grade):
+        rows = []
+        for topic in topics:
+            exists = self.conn.execute(
+                "SELECT 1 FROM topics WHERE name = ? AND grade = ?", (topic, grade)
+            ).fetchone()
+            scores = self._rows(
+                "SELECT s.name AS student_name, s.roll_no AS roll_no, "
+                "avg(sc.score) AS score, max(sc.out_of) AS out_of "
+                "FROM scores sc JOIN students s USING (grade, roll_no) "
+                "WHERE sc.topic = ? AND sc.grade = ? GROUP BY s.grade, s.roll_no",
+                (topic, grade),
+            )
+            rows.append(
+                {"topic": topic, "topic_exists": exists is not None, "scores": scores}
+            )
+        return rows
+
+    async def team_scores(self, topics, grade):
+        return await self._run(self._team_scores, topics, grade)
+
+    def _similar_pairs(self, roll_nos, grade):
+        wanted = set(roll_nos)
+        return [
+            (row["a"], row["b"])
+            for row in self.conn.execute(
+                "SELECT a, b FROM similar WHERE a_grade = ? AND b_grade = ?", (grade, grade)
+            )
+            if row["a"] in wanted and row["b"] in wanted
+        ]
+
+    async def similar_pairs(self, roll_nos, grade):
+        return await self._run(self._similar_pairs, roll_nos, grade)
+
+    async def snapshot_frame(self):
+        return await self._run(
+            pd.read_sql_query,
+            "SELECT sc.roll_no, s.name, sc.topic, NULLIF(sc.grade, '') AS grade, "
+            "sc.test, sc.score, sc.out_of "
+            "FROM scores sc JOIN students s USING (grade, roll_no)",
+            self.conn,
+        )
+
+    async def close(self):
+        await self._run(self.conn.close)
+
+
+def create_backend() -> GraphBackend:
+    """Backend selected by GRAPH_BACKEND."""
+    kind = os.getenv("GRAPH_BACKEND", "neo4j")
+    if kind == "embedded":
+        csv_path = os.getenv("GRAPH_EMBEDDED_CSV")
+        if not csv_path:
+            raise ValueError("GRAPH_BACKEND=embedded needs GRAPH_EMBEDDED_CSV")
+        return EmbeddedBackend.from_csv(csv_path, grade=os.getenv("GRAPH_EMBEDDED_GRADE"))
+    if kind != "neo4j":
+        raise ValueError(f"Unknown GRAPH_BACKEND '{kind}'")
+    return Neo4jBackend()
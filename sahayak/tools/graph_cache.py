@@ -0,0 +1,133 @@
+import logging
+import os
+import time
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Single node holding a counter the importer bumps after every write, so
+# readers in other processes can tell their cached results are stale.
+DATA_VERSION_QUERY = """
+    OPTIONAL MATCH (v:DataVersion {name: 'scores'})
+    RETURN v.version AS version
+"""
+
+BUMP_DATA_VERSION_QUERY = """
+    MERGE (v:DataVersion {name: 'scores'})
+    SET v.version = coalesce(v.version, 0) + 1, v.updated_at = datetime()
+    RETURN v.version AS version
+"""
+
+
+def bump_data_version(tx) -> int:
+    """Mark the score data as changed; call from the importer's write transaction."""
+    record = tx.run(BUMP_DATA_VERSION_QUERY).single()
+    return record["version"]
+
+
+class GraphResultCache:
+    """
+    Bounded LRU + TTL cache for read-only graph analytics results.
+
+    Entries are keyed on the normalized (intent, topics, grades, k) and are
+    dropped wholesale whenever the DataVersion stamp written by the importer
+    changes. The stamp is polled at most every GRAPH_CACHE_VERSION_POLL_SECONDS
+    so a hit normally costs no round trip at all.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+        version_poll_seconds: Optional[float] = None,
+    ):
+        self.maxsize = maxsize if maxsize is not None else int(os.getenv("GRAPH_CACHE_MAXSIZE", 512))
+        self.ttl = ttl if ttl is not None else float(os.getenv("GRAPH_CACHE_TTL_SECONDS", 300))
+        self.version_poll_seconds = (
+            version_poll_seconds
+            if version_poll_seconds is not None
+            else float(os.getenv("GRAPH_CACHE_VERSION_POLL_SECONDS", 5))
+        )
+        self.enabled = os.getenv("GRAPH_CACHE_ENABLED", "true").lower() != "false"
+
+        self._cache: TTLCache = TTLCache(maxsize=self.maxsize, ttl=self.ttl)
+        self._data_version: Optional[int] = None
+        self._version_checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        intent: str,
+        topics: Iterable[str],
+        grades: Optional[Iterable[Any]] = None,
+        k: Optional[int] = None,
+    ) -> Tuple[Hashable, ...]:
+        return (
+            intent,
+            tuple(sorted(t.strip().title() for t in topics)),
+            tuple(sorted(str(g).strip() for g in grades or [])),
+            k,
+        )
+
+    @property
+    def data_version(self) -> Optional[int]:
+        return self._data_version
+
+    async def sync_version(self, backend) -> None:
+        """Poll the backend's data version and clear the cache if it moved."""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_poll_seconds:
+            return
+        version = await backend.data_version()
+        self._version_checked_at = now
+        self.set_version(version)
+
+    def set_version(self, version: Optional[int]) -> None:
+        if version != self._data_version:
+            if self._data_version is not None or len(self._cache):
+                logger.info(
+                    f"♻️ Graph data version {self._data_version} -> {version}, clearing cache"
+                )
+                self.invalidate()
+            self._data_version = version
+
+    def get(self, key) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        value = self._cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value: Any) -> None:
+        # maxsize=0 turns caching off; TTLCache would reject every value
+        if self.enabled and self.maxsize and value is not None:
+            self._cache[key] = value
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "data_version": self._data_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+graph_cache = GraphResultCache()
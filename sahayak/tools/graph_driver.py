@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from neo4j import AsyncDriver, AsyncGraphDatabase
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid value for {name}, falling back to {default}")
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid value for {name}, falling back to {default}")
+        return default
+
+
+class Neo4jDriverManager:
+    """
+    Process-wide owner of the async Neo4j driver.
+
+    The driver is created lazily on first use and reused by every session, so
+    the Bolt handshake, TLS negotiation and routing-table fetch happen once per
+    process instead of once per tool call. Pool sizing is read from env:
+
+    - NEO4J_MAX_POOL_SIZE (default 50)
+    - NEO4J_ACQUISITION_TIMEOUT (seconds, default 30)
+    - NEO4J_MAX_CONNECTION_LIFETIME (seconds, default 3600)
+    - NEO4J_DATABASE (default "neo4j")
+    """
+
+    def __init__(self):
+        self._driver: Optional[AsyncDriver] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = asyncio.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.max_pool_size = _env_int("NEO4J_MAX_POOL_SIZE", 50)
+        self.acquisition_timeout = _env_float("NEO4J_ACQUISITION_TIMEOUT", 30.0)
+        self.max_connection_lifetime = _env_float(
+            "NEO4J_MAX_CONNECTION_LIFETIME", 3600.0
+        )
+        self.database = os.getenv("NEO4J_DATABASE", "neo4j")
+
+        self._in_use = 0
+        self._acquisitions = 0
+        self._acquisition_wait_total = 0.0
+        self._acquisition_wait_max = 0.0
+
+    async def get_driver(self) -> AsyncDriver:
+        """Return the shared driver, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._driver is not None and self._loop is loop:
+            return self._driver
+
+        if self._loop is not loop:
+            # asyncio primitives and the async driver are bound to the loop
+            # they were created on; a new loop (e.g. asyncio.run in a script)
+            # gets its own driver, and the old one is closed first.
+            stale, stale_loop = self._driver, self._loop
+            self._driver = None
+            self._lock = asyncio.Lock()
+            self._slots = None
+            self._in_use = 0
+            self._loop = loop
+            if stale is not None:
+                logger.warning("Event loop changed, recreating Neo4j driver")
+                await self._close_stale(stale, stale_loop)
+
+        async with self._lock:
+            if self._driver is None:
+                logger.info(
+                    f"🔌 Creating Neo4j driver (max_pool_size={self.max_pool_size})"
+                )
+                self._driver = AsyncGraphDatabase.driver(
+                    os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+                    auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+                    max_connection_pool_size=self.max_pool_size,
+                    connection_acquisition_timeout=self.acquisition_timeout,
+                    max_connection_lifetime=self.max_connection_lifetime,
+                )
+                self._slots = asyncio.Semaphore(self.max_pool_size)
+        return self._driver
+
+    async def _close_stale(
+        self, driver: AsyncDriver, old_loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
+        """Close a driver left behind on another event loop."""
+        if old_loop is not None and old_loop.is_running():
+            # Its connections belong to that loop, so close it there
+            asyncio.run_coroutine_threadsafe(self._close_driver(driver), old_loop)
+            return
+        # The old loop has stopped; release whatever can still be closed from here
+        try:
+            await asyncio.wait_for(self._close_driver(driver), self.acquisition_timeout)
+        except Exception as e:
+            logger.warning(f"Could not close the previous Neo4j driver: {e}")
+
+    @staticmethod
+    async def _close_driver(driver: AsyncDriver) -> None:
+        try:
+            await driver.close()
+            logger.info("🔌 Neo4j driver closed")
+        except Exception:
+            logger.exception("Error closing Neo4j driver")
+
+    async def verify_connectivity(self) -> bool:
+        """Open the driver and check that the server is reachable."""
+        try:
+            driver = await self.get_driver()
+            await driver.verify_connectivity()
+            logger.info("✅ Neo4j connectivity verified")
+            return True
+        except Exception:
+            logger.exception("Neo4j connectivity check failed")
+            return False
+
+    @asynccontextmanager
+    async def session(self, **kwargs):
+        """
+        Borrow a session from the shared driver.
+
+        Sessions are gated by a semaphore sized to the connection pool, so the
+        time spent waiting here is the pool acquisition wait.
+        """
+        driver = await self.get_driver()
+        kwargs.setdefault("database", self.database)
+
+        started = time.perf_counter()
+        await asyncio.wait_for(self._slots.acquire(), self.acquisition_timeout)
+        waited = time.perf_counter() - started
+
+        self._acquisitions += 1
+        self._acquisition_wait_total += waited
+        self._acquisition_wait_max = max(self._acquisition_wait_max, waited)
+        self._in_use += 1
+        try:
+            async with driver.session(**kwargs) as session:
+                yield session
+        finally:
+            self._in_use -= 1
+            self._slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of pool usage for dashboards and scaling decisions."""
+        acquisitions = self._acquisitions
+        return {
+            "driver_open": self._driver is not None,
+            "max_pool_size": self.max_pool_size,
+            "in_use": self._in_use,
+            # Sessions that can start without waiting; the driver has no public pool stats
+            "free_slots": self.max_pool_size - self._in_use,
+            "acquisitions": acquisitions,
+            "acquisition_wait_avg_ms": (
+                self._acquisition_wait_total / acquisitions * 1000
+                if acquisitions
+                else 0.0
+            ),
+            "acquisition_wait_max_ms": self._acquisition_wait_max * 1000,
+        }
+
+    async def close(self):
+        """Close the shared driver; it will be recreated on next use."""
+        if self._driver is None:
+            return
+        driver, self._driver = self._driver, None
+        await self._close_driver(driver)
+
+
+driver_manager = Neo4jDriverManager()
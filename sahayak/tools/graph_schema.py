@@ -0,0 +1,199 @@
+"""
+Idempotent Neo4j schema bootstrap for the student score graph.
+
+Run by the importer before writing and by the app on startup. Run directly to
+see PROFILEd db-hits for every GraphVisualizer query before and after the
+schema is applied:
+
+    python -m sahayak.tools.graph_schema --topic Light --grade 6
+
+"Before" only means "without the schema" on a graph that has never had it
+applied; on any later run both columns show the indexed plans. Pass
+--drop-schema to drop the indexes and constraints first (they are recreated
+right after, but writes go unchecked in between, so not on a live graph).
+"""
+
+import argparse
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_STATEMENTS = [
+    # Roll numbers repeat across grades; students used to be unique on roll_no alone
+    "DROP CONSTRAINT student_roll_no IF EXISTS",
+    # Importer MERGEs and similarity edges look students up by (grade, roll number)
+    "CREATE CONSTRAINT student_grade_roll_no IF NOT EXISTS "
+    "FOR (s:Student) REQUIRE (s.grade, s.roll_no) IS UNIQUE",
+    # Importer MERGEs topics by name; analytics match on {name, grade}
+    "CREATE INDEX topic_name IF NOT EXISTS FOR (t:Topic) ON (t.name)",
+    "CREATE INDEX topic_name_grade IF NOT EXISTS FOR (t:Topic) ON (t.name, t.grade)",
+    "CREATE CONSTRAINT data_version_name IF NOT EXISTS "
+    "FOR (v:DataVersion) REQUIRE v.name IS UNIQUE",
+]
+
+# Undo SCHEMA_STATEMENTS, for profiling the plans without it
+DROP_SCHEMA_STATEMENTS = [
+    "DROP CONSTRAINT student_grade_roll_no IF EXISTS",
+    "DROP INDEX topic_name IF EXISTS",
+    "DROP INDEX topic_name_grade IF EXISTS",
+    "DROP CONSTRAINT data_version_name IF EXISTS",
+]
+SCHEMA_NAMES = ["student_grade_roll_no", "topic_name", "topic_name_grade", "data_version_name"]
+
+SAMPLE_TOPIC_QUERY = """
+    MATCH (t:Topic)
+    WHERE t.grade IS NOT NULL
+    RETURN t.name AS topic, t.grade AS grade
+    LIMIT 1
+"""
+
+# Students of a grade that have similarity edges, so similar_pairs has real work
+SAMPLE_STUDENTS_QUERY = """
+    MATCH (s:Student {grade: $grade})-[:SIMILAR_TO]->()
+    RETURN DISTINCT s.roll_no AS roll_no
+    LIMIT $limit
+"""
+
+EXISTING_SCHEMA_QUERY = """
+    SHOW INDEXES YIELD name
+    WHERE name IN $names
+    RETURN collect(name) AS names
+"""
+
+
+def apply_schema(session) -> List[str]:
+    """Create missing constraints and indexes with a sync session."""
+    applied = []
+    for statement in SCHEMA_STATEMENTS:
+        try:
+            session.run(statement).consume()
+            applied.append(statement)
+        except Exception as e:
+            # e.g. a uniqueness constraint over existing duplicates
+            logger.error(f"Schema statement failed: {statement}: {e}")
+    return applied
+
+
+async def apply_schema_async(session) -> List[str]:
+    """Create missing constraints and indexes with an async session."""
+    applied = []
+    for statement in SCHEMA_STATEMENTS:
+        try:
+            result = await session.run(statement)
+            await result.consume()
+            applied.append(statement)
+        except Exception as e:
+            logger.error(f"Schema statement failed: {statement}: {e}")
+    return applied
+
+
+def _db_hits(plan: Optional[Dict[str, Any]]) -> int:
+    if not plan:
+        return 0
+    return plan.get("dbHits", 0) + sum(
+        _db_hits(child) for child in plan.get("children", [])
+    )
+
+
+def profiled_queries(
+    topic: str, grade: str, topic_b: Optional[str] = None, roll_nos: Optional[List[Any]] = None
+):
+    """GraphVisualizer's queries with sample parameters, keyed by name."""
+    from sahayak.tools.graph_backends import (
+        SIMILAR_PAIRS_QUERY,
+        TEAM_SCORES_QUERY,
+        TOP_STUDENTS_QUERY,
+        TOPIC_STATISTICS_ALL_GRADES_QUERY,
+        TOPIC_STATISTICS_QUERY,
+    )
+    from sahayak.tools.graph_cache import DATA_VERSION_QUERY
+
+    topics = [topic] + ([topic_b] if topic_b else [])
+    return {
+        "top_students": (TOP_STUDENTS_QUERY, {"topic": topic, "grade": grade, "k": 5}),
+        "topic_statistics": (
+            TOPIC_STATISTICS_QUERY,
+            {"topics": topics, "grades": [grade]},
+        ),
+        "topic_statistics_all_grades": (TOPIC_STATISTICS_ALL_GRADES_QUERY, {"topics": topics}),
+        "team_scores": (TEAM_SCORES_QUERY, {"topics": topics, "grade": grade}),
+        "similar_pairs": (SIMILAR_PAIRS_QUERY, {"roll_nos": roll_nos or [], "grade": grade}),
+        "data_version": (DATA_VERSION_QUERY, {}),
+    }
+
+
+def profile_queries(session, queries) -> Dict[str, int]:
+    """Total db hits per query, from PROFILE."""
+    hits = {}
+    for name, (query, params) in queries.items():
+        summary = session.run("PROFILE " + query, params).consume()
+        hits[name] = _db_hits(summary.profile)
+    return hits
+
+
+def main():
+    from dotenv import load_dotenv
+    from neo4j import GraphDatabase
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--topic", help="sample topic (default: any topic in the graph)")
+    parser.add_argument("--topic-b", help="second topic for comparisons and teams")
+    parser.add_argument("--grade", help="sample grade")
+    parser.add_argument("--students", type=int, default=50, help="students to look up similar pairs for")
+    parser.add_argument(
+        "--drop-schema",
+        action="store_true",
+        help="drop the indexes and constraints before the 'before' profile",
+    )
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+    )
+    try:
+        with driver.session(database=os.getenv("NEO4J_DATABASE", "neo4j")) as session:
+            topic, grade = args.topic, args.grade
+            if not topic or not grade:
+                record = session.run(SAMPLE_TOPIC_QUERY).single()
+                if record is None:
+                    print("❌ No graded Topic nodes to profile against")
+                    return
+                topic, grade = topic or record["topic"], grade or record["grade"]
+
+            roll_nos = [
+                record["roll_no"]
+                for record in session.run(SAMPLE_STUDENTS_QUERY, grade=grade, limit=args.students)
+            ]
+            if not roll_nos:
+                print(f"⚠️ No grade {grade} students with SIMILAR_TO edges; similar_pairs profiles an empty lookup")
+            queries = profiled_queries(topic, grade, args.topic_b, roll_nos)
+
+            if args.drop_schema:
+                for statement in DROP_SCHEMA_STATEMENTS:
+                    session.run(statement).consume()
+            else:
+                existing = session.run(EXISTING_SCHEMA_QUERY, names=SCHEMA_NAMES).single()["names"]
+                if existing:
+                    print(
+                        f"⚠️ Schema already applied ({', '.join(existing)}): 'before' is not unindexed; "
+                        "rerun with --drop-schema to compare"
+                    )
+            before = profile_queries(session, queries)
+            applied = apply_schema(session)
+            session.run("CALL db.awaitIndexes()").consume()
+            after = profile_queries(session, queries)
+
+        print(f"🧱 Applied {len(applied)}/{len(SCHEMA_STATEMENTS)} schema statements")
+        print(f"{'query':<30}{'db hits before':>16}{'db hits after':>16}")
+        for name in queries:
+            print(f"{name:<30}{before[name]:>16}{after[name]:>16}")
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
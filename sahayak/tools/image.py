@@ -1,9 +1,6 @@
-import base64
-import glob
 import os
 from typing import Dict, Optional
 
-import google.genai.types as types
 from google.adk.tools.tool_context import ToolContext
 from google import genai
 from google.genai.types import GenerateContentConfig, Modality
@@ -12,6 +9,76 @@ import asyncio
 
 import concurrent.futures
 
+from sahayak.tools.image_cache import image_cache
+from sahayak.tools.image_store import image_filename, image_store, new_deck_id
+from sahayak.tools.session_key import session_key
+from sahayak.tools.image_variants import create_variants
+from sahayak.tools.slide_events import slide_events
+
+IMAGE_MODEL = os.getenv("IMAGE_GEN_MODEL", "gemini-2.0-flash-preview-image-generation")
+# Image calls in flight at once per process, across all decks
+IMAGE_GEN_CONCURRENCY = int(os.getenv("IMAGE_GEN_CONCURRENCY", "4"))
+IMAGE_GEN_TIMEOUT_SECONDS = float(os.getenv("IMAGE_GEN_TIMEOUT_SECONDS", "60"))
+
+_client = None
+_semaphore = None
+_semaphore_loop = None
+
+
+def get_client():
+    """One shared Gemini client, so image calls reuse its connections."""
+    global _client
+    if _client is None:
+        _client = genai.Client()
+    return _client
+
+
+def _image_slots() -> asyncio.Semaphore:
+    # A semaphore belongs to the loop it was first used on
+    global _semaphore, _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore_loop is not loop:
+        _semaphore, _semaphore_loop = asyncio.Semaphore(IMAGE_GEN_CONCURRENCY), loop
+    return _semaphore
+
+
+async def generate_image(description: str, config: GenerateContentConfig, timeout: Optional[float] = None):
+    """
+    The first image generated for ``description``, or None if the model returned none.
+    Waits for a free slot first; raises asyncio.TimeoutError if generation itself
+    takes longer than ``timeout`` (IMAGE_GEN_TIMEOUT_SECONDS by default).
+    """
+    async with _image_slots():
+        response = await asyncio.wait_for(
+            get_client().aio.models.generate_content(
+                model=IMAGE_MODEL,
+                contents=description,
+                config=config,
+            ),
+            timeout if timeout is not None else IMAGE_GEN_TIMEOUT_SECONDS,
+        )
+    for part in response.candidates[0].content.parts:
+        if part.inline_data:
+            return part.inline_data.data
+    return None
+
+
+def deck_image_bytes(slides: list) -> Dict[str, int]:
+    """Bytes of a deck's original images and compressed variants, and what the variants save."""
+    original = sum(s.get("image_bytes", 0) for s in slides)
+    compressed = sum(
+        s.get("image_variants", {}).get("compressed", {}).get("bytes", s.get("image_bytes", 0))
+        for s in slides
+    )
+    thumbnails = sum(s.get("image_variants", {}).get("thumbnail", {}).get("bytes", 0) for s in slides)
+    return {
+        "original": original,
+        "compressed": compressed,
+        "thumbnails": thumbnails,
+        "saved": original - compressed,
+    }
+
+
 async def create_slide_images(
     tool_context: Optional[ToolContext] = None,
 ) -> Dict[str, any]:
@@ -36,66 +103,111 @@ async def create_slide_images(
             return {"status": "error", "message": "No slides found in slide contents"}
 
         print(f"Processing {len(slides)} slides")
-        client = genai.Client()
+        # Each run gets its own file names, so decks never overwrite each other
+        deck_id = new_deck_id()
         generation_config = GenerateContentConfig(
             response_modalities=[Modality.TEXT, Modality.IMAGE]
         )
 
+        async def add_variants(index: int, slide: dict, image_bytes: bytes):
+            # The original is already saved, so a failure here only costs the smaller copies
+            try:
+                variants = await create_variants(image_bytes)
+                slide_variants = {}
+                for name, (data, mime_type, extension) in variants.items():
+                    filename = image_filename(deck_id, index, name, extension)
+                    version = await image_store.save(tool_context, filename, data, mime_type)
+                    slide_variants[name] = {
+                        "filename": filename,
+                        "version": version,
+                        "mime_type": mime_type,
+                        "bytes": len(data),
+                    }
+                if slide_variants:
+                    slide["image_variants"] = slide_variants
+            except Exception as e:
+                print(f"Error creating image variants for slide {index}: {str(e)}")
+
         async def process_slide(index: int, slide: dict):
+            """Returns (index, slide, error); error is None once the image is saved."""
             try:
                 print(f"Generating image for slide {index}: {slide.get('content', '')[:50]}...")
 
-                response = client.models.generate_content(
-                    model="gemini-2.0-flash-preview-image-generation",
-                    contents=slide.get("image_description", ""),
-                    config=generation_config,
+                description = slide.get("image_description", "")
+                image_bytes, cached = await image_cache.get_or_generate(
+                    IMAGE_MODEL, description, lambda: generate_image(description, generation_config)
                 )
-
-                for part in response.candidates[0].content.parts:
-                    if part.inline_data:
-                        image_bytes = part.inline_data.data
-
-                        root_image_dir = "generated_images"
-                        if not os.path.exists(root_image_dir):
-                            os.makedirs(root_image_dir)
-
-                        filename = f"slide_image_{index}.png"
-                        filepath = os.path.join(root_image_dir, filename)
-                        print(f"Saving image as {filepath}")
-
-                        with open(filepath, "wb") as f:
-                            f.write(image_bytes)
-
-                        image_artifact = types.Part.from_bytes(
-                            data=image_bytes, mime_type="image/png"
-                        )
-
-                        artifact_version = await tool_context.save_artifact(
-                            filename=filename,
-                            artifact=image_artifact
-                        )
-
-                        slide["image_filename"] = filename
-                        slide["image_version"] = artifact_version
-
-                return slide
+                if cached:
+                    print(f"Reusing cached image for slide {index}")
+                if not image_bytes:
+                    return index, slide, "The model returned no image"
+
+                filename = image_filename(deck_id, index)
+                print(f"Saving image as {filename}")
+                artifact_version = await image_store.save(tool_context, filename, image_bytes)
+
+                slide["image_filename"] = filename
+                slide["image_version"] = artifact_version
+                slide["image_bytes"] = len(image_bytes)
+                await add_variants(index, slide, image_bytes)
+                return index, slide, None
+            except asyncio.TimeoutError:
+                print(f"Timed out generating image for slide {index} after {IMAGE_GEN_TIMEOUT_SECONDS:g}s")
+                return index, slide, f"Timed out after {IMAGE_GEN_TIMEOUT_SECONDS:g}s"
             except Exception as e:
                 print(f"Error processing slide {index}: {str(e)}")
-                return slide
+                return index, slide, str(e)
+
+        session_id = session_key(tool_context)
+        slide_events.publish(session_id, "deck_started", deck_id=deck_id, slides=len(slides))
+        slide_contents["deck_id"] = deck_id
 
-        # Process slides in parallel
+        # Slides are handed on as they finish, so the first ones render while the rest generate
+        updated_slides = list(slides)
+        failed = []
         tasks = [process_slide(index, slide) for index, slide in enumerate(slides, 1)]
-        updated_slides = await asyncio.gather(*tasks)
+        for next_done in asyncio.as_completed(tasks):
+            index, slide, error = await next_done
+            updated_slides[index - 1] = slide
+            if error is None:
+                slide.pop("image_error", None)
+                slide_events.publish(session_id, "slide_ready", deck_id=deck_id, index=index, slide=slide)
+            else:
+                slide["image_error"] = error
+                failed.append({"index": index, "heading": slide.get("heading", ""), "error": error})
+                slide_events.publish(session_id, "slide_failed", deck_id=deck_id, index=index, error=error)
+            slide_contents["slides"] = updated_slides
+            tool_context.state["slide_contents"] = slide_contents
 
         print("Updating slide contents")
         slide_contents["slides"] = updated_slides
         tool_context.state["slide_contents"] = slide_contents
+        image_bytes = deck_image_bytes(updated_slides)
+        print(f"Deck {deck_id} image bytes: {image_bytes}")
+        failed.sort(key=lambda f: f["index"])
+        slide_events.publish(
+            session_id,
+            "deck_done",
+            deck_id=deck_id,
+            ready=len(slides) - len(failed),
+            failed=failed,
+            image_bytes=image_bytes,
+        )
 
-        print("Successfully completed image generation", slide_contents)
+        if failed:
+            print(f"Images failed for {len(failed)} of {len(slides)} slides: {failed}")
+        else:
+            print("Successfully completed image generation", slide_contents)
         return {
-            "status": "success",
-            "message": "Images generated and slides updated",
-            "slide_contents": slide_contents
+            "status": "success" if not failed else "partial" if len(failed) < len(slides) else "error",
+            "message": (
+                "Images generated and slides updated"
+                if not failed
+                else f"Images generated for {len(slides) - len(failed)} of {len(slides)} slides"
+            ),
+            "slide_contents": slide_contents,
+            "failed_slides": failed,
+            "image_bytes": image_bytes,
         }
 
     except Exception as e:
@@ -180,70 +292,28 @@ def create_slide_images_test(
             response_modalities=[Modality.TEXT, Modality.IMAGE]
         )
 
-        def generate_image_for_slide(slide):
+        deck_id = new_deck_id()
+
+        def generate_image_for_slide(index, slide):
             try:
                 print(f"Generating image for slide: {slide.get('content', '')[:50]}...")
-                contents = [
-                    {"role": "user", "parts": [{"text": slide.get("content", "")}]}
-                ]
-
-                # response = model.generate_content(
-                #     contents=contents, generation_config=generation_config
-                # )
-
                 response = client.models.generate_content(
                     model="gemini-2.0-flash-preview-image-generation",
                     contents=slide.get("image_description", ""),
                     config=generation_config,
                 )
-                print(response)
 
                 for part in response.candidates[0].content.parts:
                     if part.inline_data:
                         image_data = BytesIO(part.inline_data.data)
                         image_bytes = image_data.getvalue()
 
-                        # Save the image to a file
-                        print("Saving image to file")
-                        if not os.path.exists("slide_images"):
-                            os.makedirs("slide_images")
-                        os.chdir("slide_images")
-                        # Generate a unique filename
-                        # to avoid overwriting existing images
-                        # This is a simple way to generate unique filenames
-                        # based on the number of existing images
-                        if not glob.glob("slide_image_*.png"):
-                            filename = "slide_image_1.png"
-                        else:
-                            # Generate a new filename based on existing files
-                            existing_files = glob.glob("slide_image_*.png")
-                            if existing_files:
-                                last_file = max(existing_files, key=os.path.getctime)
-                                last_index = int(last_file.split("_")[-1].split(".")[0])
-                                filename = f"slide_image_{last_index + 1}.png"
-                            else:
-                                filename = "slide_image_1.png"
-
-                        print(f"Saving image as {filename}")
-                        with open(filename, "wb") as img_file:
-                            img_file.write(image_bytes)
-
-                        filename = (
-                            f"slide_image_{len(glob.glob('slide_image_*.png')) + 1}.png"
-                        )
-                        print(f"Saving image as {filename}")
-                        image_artifact = types.Part(
-                            inline_data=types.Blob(
-                                data=image_bytes, mime_type="image/png"
-                            )
-                        )
-
-                        # artifact_version = tool_context.save_artifact(
-                        #     filename=filename, artifact=image_artifact
-                        # )
+                        # Mirror-only: there is no session to save artifacts to
+                        filename = image_filename(deck_id, index)
+                        path = image_store.write_mirror("test", filename, image_bytes)
+                        print(f"Saved image as {path}")
 
                         slide["image_filename"] = filename
-                        # slide["image_version"] = artifact_version
                         return slide
 
                 return slide
@@ -253,7 +323,7 @@ def create_slide_images_test(
 
         print("Starting parallel processing of slides")
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            updated_slides = list(executor.map(generate_image_for_slide, slides))
+            updated_slides = list(executor.map(generate_image_for_slide, range(1, len(slides) + 1), slides))
 
         print("Updating slide contents")
         slide_contents["slides"] = updated_slides
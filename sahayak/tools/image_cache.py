@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_description(description: str) -> str:
+    """Case and whitespace don't change the picture asked for."""
+    return re.sub(r"\s+", " ", description).strip().lower()
+
+
+class ImageCache:
+    """
+    Content-addressed disk cache for generated slide images.
+
+    Images are stored under IMAGE_CACHE_DIR by the sha256 of (model,
+    normalized description). The least recently used ones are deleted once
+    the directory grows past IMAGE_CACHE_MAX_MB. Concurrent requests for the
+    same image share one generation call.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or os.getenv("IMAGE_CACHE_DIR", "image_cache")
+        self.max_bytes = max_bytes or int(float(os.getenv("IMAGE_CACHE_MAX_MB", 512)) * 1024 * 1024)
+        self.enabled = os.getenv("IMAGE_CACHE_ENABLED", "true").lower() != "false"
+
+        # key -> size in bytes, least recently used first; loaded from disk on first use
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._bytes = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # One writer thread, so files are written and evicted in the order the
+        # index changed; a later eviction never races an earlier write
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-cache-writer")
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, description: str) -> str:
+        return hashlib.sha256(f"{model}\n{normalize_description(description)}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def _scan(self) -> "OrderedDict[str, int]":
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".png"):
+                    stat = os.stat(os.path.join(root, name))
+                    found.append((stat.st_mtime, name[:-4], stat.st_size))
+        return OrderedDict((key, size) for _, key, size in sorted(found))
+
+    async def _index(self) -> "OrderedDict[str, int]":
+        if self._entries is None:
+            entries = await asyncio.to_thread(self._scan)
+            if self._entries is None:
+                self._entries, self._bytes = entries, sum(entries.values())
+        return self._entries
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # mtime is the recency used to rebuild the LRU order after a restart
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, data: bytes, evict: list) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        for old in evict:
+            try:
+                os.remove(self._path(old))
+            except FileNotFoundError:
+                pass
+
+    async def get_or_generate(
+        self, model: str, description: str, generate: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Tuple[Optional[bytes], bool]:
+        """
+        The image for ``description``, and whether it came from the cache.
+        ``generate()`` is awaited only on a miss; empty results aren't cached.
+        """
+        if not self.enabled:
+            return await generate(), False
+        key = self.make_key(model, description)
+        entries = await self._index()
+
+        if key in entries:
+            data = await asyncio.to_thread(self._read, key)
+            if data is not None:
+                self.hits += 1
+                entries.move_to_end(key)
+                return data, True
+            # Deleted from under us
+            self._bytes -= entries.pop(key, 0)
+
+        pending = self._in_flight.get(key)
+        while pending is not None:
+            # wait() raises only if this caller is cancelled, not the leader
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                data = pending.result()
+                # An empty result was never cached, so it's a miss for this caller too
+                if not data:
+                    self.misses += 1
+                    return data, False
+                self.coalesced += 1
+                return data, True
+            # The leader was cancelled; the first waiter back takes over
+            pending = self._in_flight.get(key)
+
+        self.misses += 1
+        pending = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            data = await generate()
+            if data:
+                await self._store(key, data)
+            pending.set_result(data)
+            return data, False
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            pending.set_exception(e)
+            # Waiters get the error; nobody is left to retrieve it otherwise
+            pending.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _store(self, key: str, data: bytes) -> None:
+        entries = await self._index()
+        self._bytes += len(data) - entries.pop(key, 0)
+        entries[key] = len(data)
+        evict = []
+        while self._bytes > self.max_bytes and len(entries) > 1:
+            old, size = entries.popitem(last=False)
+            self._bytes -= size
+            evict.append(old)
+        self.evictions += len(evict)
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._writer, self._write, key, data, evict)
+        except OSError as e:
+            # A full or read-only disk only costs us the cache entry
+            self._bytes -= entries.pop(key, 0)
+            logger.warning(f"Could not cache image {key[:12]}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "entries": len(self._entries or {}),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "in_flight": len(self._in_flight),
+        }
+
+
+image_cache = ImageCache()
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+import re
+import uuid
+from typing import Any, Dict, Optional, Set, Tuple
+
+import google.genai.types as types
+
+from sahayak.tools.session_key import session_key
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def new_deck_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def image_filename(deck_id: str, index: int, variant: str = "", extension: str = "png") -> str:
+    """Artifact name of a deck's slide image; ADK already scopes artifacts to the session."""
+    suffix = f"_{variant}" if variant else ""
+    return f"deck_{deck_id}_slide_{index}{suffix}.{extension}"
+
+
+class ImageStore:
+    """
+    The one write path for generated images.
+
+    Images are saved as session artifacts first, since that is what the
+    frontend reads. If IMAGE_MIRROR_DIR is set (default generated_images), a
+    copy also goes to <dir>/<session>/<filename> in the background, and a
+    janitor deletes the oldest copies whenever the mirror grows past
+    IMAGE_MIRROR_QUOTA_MB.
+    """
+
+    def __init__(
+        self,
+        mirror_dir: Optional[str] = None,
+        quota_bytes: Optional[int] = None,
+        janitor_interval: Optional[float] = None,
+    ):
+        self.mirror_dir = mirror_dir if mirror_dir is not None else os.getenv("IMAGE_MIRROR_DIR", "generated_images")
+        self.quota_bytes = quota_bytes or int(float(os.getenv("IMAGE_MIRROR_QUOTA_MB", 1024)) * 1024 * 1024)
+        self.janitor_interval = janitor_interval or float(os.getenv("IMAGE_JANITOR_INTERVAL_SECONDS", 300))
+
+        self._pending: Set[asyncio.Task] = set()
+        self._janitor: Optional[asyncio.Task] = None
+
+        self.artifacts_saved = 0
+        self.mirrored = 0
+        self.mirror_errors = 0
+        self.janitor_runs = 0
+        self.janitor_deleted = 0
+        self.janitor_freed_bytes = 0
+
+    def mirror_path(self, session_id: str, filename: str) -> str:
+        return os.path.join(self.mirror_dir, _UNSAFE.sub("_", session_id), filename)
+
+    def write_mirror(self, session_id: str, filename: str, data: bytes) -> str:
+        """Write the local copy (blocking); returns its path."""
+        path = self.mirror_path(session_id, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a unique temporary name, so concurrent writers never see half a file
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+        return path
+
+    async def save(
+        self, tool_context, filename: str, data: bytes, mime_type: str = "image/png"
+    ) -> Optional[int]:
+        """Save an image as an artifact, then mirror it without waiting; returns the artifact version."""
+        version = await tool_context.save_artifact(
+            filename=filename, artifact=types.Part.from_bytes(data=data, mime_type=mime_type)
+        )
+        self.artifacts_saved += 1
+        if self.mirror_dir:
+            self._mirror(session_key(tool_context), filename, data)
+        return version
+
+    def _mirror(self, session_id: str, filename: str, data: bytes) -> None:
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self.write_mirror, session_id, filename, data)
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._mirrored)
+        self._start_janitor()
+
+    def _mirrored(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            # The artifact is the copy that matters; a failed mirror is only logged
+            self.mirror_errors += 1
+            logger.warning(f"Could not mirror image locally: {task.exception()}")
+        else:
+            self.mirrored += 1
+
+    async def flush(self) -> None:
+        """Wait for pending mirror writes."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def enforce_quota(self) -> Tuple[int, int]:
+        """Delete the oldest mirrored images until under quota (blocking); returns (files, bytes) deleted."""
+        files = []
+        for root, _, names in os.walk(self.mirror_dir):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        deleted = freed = 0
+        for _, size, path in sorted(files):
+            if total <= self.quota_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            deleted += 1
+            freed += size
+            try:
+                # Drop the session directory once its last image is gone
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+        return deleted, freed
+
+    async def _janitor_loop(self) -> None:
+        while True:
+            try:
+                deleted, freed = await asyncio.to_thread(self.enforce_quota)
+                self.janitor_runs += 1
+                self.janitor_deleted += deleted
+                self.janitor_freed_bytes += freed
+                if deleted:
+                    logger.info(f"🧹 Deleted {deleted} mirrored images ({freed / 1e6:.1f} MB) over quota")
+            except Exception as e:
+                logger.warning(f"Image janitor failed: {e}")
+            await asyncio.sleep(self.janitor_interval)
+
+    def _start_janitor(self) -> None:
+        if self._janitor is None or self._janitor.done():
+            self._janitor = asyncio.get_running_loop().create_task(self._janitor_loop())
+
+    async def close(self) -> None:
+        """Stop the janitor and finish pending mirror writes."""
+        if self._janitor is not None:
+            self._janitor.cancel()
+            self._janitor = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mirror_dir": self.mirror_dir or None,
+            "quota_bytes": self.quota_bytes,
+            "artifacts_saved": self.artifacts_saved,
+            "mirrored": self.mirrored,
+            "mirror_errors": self.mirror_errors,
+            "pending_writes": len(self._pending),
+            "janitor_runs": self.janitor_runs,
+            "janitor_deleted": self.janitor_deleted,
+            "janitor_freed_bytes": self.janitor_freed_bytes,
+        }
+
+
+image_store = ImageStore()
@@ -0,0 +1,99 @@
+"""
+Smaller copies of generated slide images for low-bandwidth clients.
+
+For each original PNG we make a compressed variant (WebP by default, JPEG
+as the alternative) and a thumbnail. Pillow work is CPU-bound, so it runs in
+a process pool rather than on the event loop.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANTS_ENABLED = os.getenv("IMAGE_VARIANTS_ENABLED", "true").lower() != "false"
+# "webp" or "jpeg"
+IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "webp").lower()
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "75"))
+# Longest side of the thumbnail, in pixels
+IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", "320"))
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+# Forking a process that runs an event loop, gRPC channels and driver threads
+# can deadlock the child, so workers start fresh ("spawn", or "forkserver" on Unix)
+IMAGE_VARIANT_START_METHOD = os.getenv("IMAGE_VARIANT_START_METHOD", "spawn")
+
+_FORMATS = {"webp": ("WEBP", "image/webp", "webp"), "jpeg": ("JPEG", "image/jpeg", "jpg")}
+
+# name -> (data, mime type, file extension)
+Variants = Dict[str, Tuple[bytes, str, str]]
+
+
+def _encode(image, fmt: str, quality: int) -> bytes:
+    pil_format = _FORMATS[fmt][0]
+    if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    out = BytesIO()
+    image.save(out, format=pil_format, quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def make_variants(data: bytes, fmt: str, quality: int, thumbnail_size: int) -> Variants:
+    """
+    The "compressed" and "thumbnail" variants of an image; runs in a worker process.
+    The compressed variant is left out when it wouldn't be smaller than the original.
+    """
+    from PIL import Image, features
+
+    if fmt == "webp" and not features.check("webp"):
+        fmt = "jpeg"
+    _, mime_type, extension = _FORMATS[fmt]
+    with Image.open(BytesIO(data)) as image:
+        image.load()
+        compressed = _encode(image, fmt, quality)
+        image.thumbnail((thumbnail_size, thumbnail_size))
+        thumbnail = _encode(image, fmt, quality)
+    variants = {"thumbnail": (thumbnail, mime_type, extension)}
+    if len(compressed) < len(data):
+        variants["compressed"] = (compressed, mime_type, extension)
+    return variants
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _variant_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=IMAGE_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context(IMAGE_VARIANT_START_METHOD),
+        )
+    return _pool
+
+
+async def create_variants(data: bytes) -> Variants:
+    """make_variants() off the event loop; no variants if they're disabled."""
+    if not IMAGE_VARIANTS_ENABLED:
+        return {}
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _variant_pool(),
+        make_variants,
+        data,
+        IMAGE_VARIANT_FORMAT,
+        IMAGE_VARIANT_QUALITY,
+        IMAGE_THUMBNAIL_SIZE,
+    )
+
+
+def shutdown() -> None:
+    """Stop the worker processes; called from the app's lifespan on shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
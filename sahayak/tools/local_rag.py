@@ -0,0 +1,157 @@
+"""
+Local, offline textbook retrieval: a hybrid BM25 + dense index on disk.
+
+A grade uses it when its corpus is set to a local index directory, e.g.
+RAG_CORPUS_GRADE_6=local:/data/indexes/grade6. The directory holds:
+
+- chunks.jsonl: one {source_uri, source_name, text, chapter, page} per chunk
+- embeddings.npy: float32 unit vectors, one row per chunk, loaded with
+  mmap_mode="r" so every worker process shares the same page cache
+- index.json: the embedding function name and dimensions
+
+Searches return the same {source_uri, source_name, text, score} records as
+Vertex AI RAG, with score as a distance (lower is better).
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from sahayak.tools.embeddings import get_embedding
+
+LOCAL_CORPUS_PREFIX = "local:"
+CHUNKS_FILE = "chunks.jsonl"
+EMBEDDINGS_FILE = "embeddings.npy"
+INDEX_FILE = "index.json"
+
+# Weight of the dense score in the hybrid; BM25 gets the rest
+DENSE_WEIGHT = float(os.getenv("RAG_LOCAL_DENSE_WEIGHT", "0.5"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def is_local_corpus(rag_corpus: Optional[str]) -> bool:
+    return bool(rag_corpus) and rag_corpus.startswith(LOCAL_CORPUS_PREFIX)
+
+
+def write_index(path: str, chunks: List[Dict[str, Any]], embeddings: np.ndarray, embedding: str) -> None:
+    """
+    Write an index directory. index.json goes last and is replaced atomically,
+    so readers never see it alongside a half-written chunk or embedding file.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, CHUNKS_FILE + ".tmp"), "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+    with open(os.path.join(path, EMBEDDINGS_FILE + ".tmp"), "wb") as f:
+        np.save(f, np.asarray(embeddings, dtype=np.float32))
+    os.replace(os.path.join(path, CHUNKS_FILE + ".tmp"), os.path.join(path, CHUNKS_FILE))
+    os.replace(os.path.join(path, EMBEDDINGS_FILE + ".tmp"), os.path.join(path, EMBEDDINGS_FILE))
+    with open(os.path.join(path, INDEX_FILE + ".tmp"), "w") as f:
+        json.dump(
+            {"embedding": embedding, "dimensions": int(np.shape(embeddings)[1]), "chunks": len(chunks)},
+            f,
+        )
+    os.replace(os.path.join(path, INDEX_FILE + ".tmp"), os.path.join(path, INDEX_FILE))
+
+
+class LocalRagIndex:
+    """A loaded index directory: chunk records, a BM25 term matrix and mmap'd embeddings."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            self.info = json.load(f)
+        self.embed = get_embedding(self.info["embedding"])
+
+        with open(os.path.join(path, CHUNKS_FILE), encoding="utf-8") as f:
+            self.chunks = [json.loads(line) for line in f if line.strip()]
+        self.embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+        if len(self.embeddings) != len(self.chunks):
+            raise ValueError(f"Index {path} has {len(self.chunks)} chunks but {len(self.embeddings)} embeddings")
+        self._build_bm25()
+
+    def _build_bm25(self) -> None:
+        self.vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, chunk in enumerate(self.chunks):
+            for term in tokenize(chunk.get("text", "")):
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+        n = len(self.chunks)
+        # Duplicate (row, col) entries sum up into term frequencies
+        self.term_freqs = sparse.csc_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(n, max(1, len(self.vocabulary))),
+        )
+        self.doc_lengths = np.asarray(self.term_freqs.sum(axis=1)).ravel()
+        self.average_length = self.doc_lengths.mean() if n else 0.0
+        doc_freqs = np.diff(self.term_freqs.indptr)
+        self.idf = np.log(1 + (n - doc_freqs + 0.5) / (doc_freqs + 0.5))
+
+    def bm25(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.chunks))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths / max(self.average_length, 1e-9))
+        for term in set(tokenize(query)):
+            col = self.vocabulary.get(term)
+            if col is None:
+                continue
+            start, end = self.term_freqs.indptr[col], self.term_freqs.indptr[col + 1]
+            rows = self.term_freqs.indices[start:end]
+            tf = self.term_freqs.data[start:end]
+            scores[rows] += self.idf[col] * tf * (BM25_K1 + 1) / (tf + norm[rows])
+        return scores
+
+    def search(self, query: str, top_k: int, threshold: float) -> List[Dict[str, Any]]:
+        """Hybrid search; records whose distance (1 - hybrid score) is under ``threshold``."""
+        if not self.chunks:
+            return []
+        lexical = self.bm25(query)
+        if lexical.max() > 0:
+            lexical = lexical / lexical.max()
+        dense = np.asarray(self.embeddings @ self.embed([query])[0], dtype=np.float64)
+        distance = 1 - (DENSE_WEIGHT * dense + (1 - DENSE_WEIGHT) * lexical)
+
+        k = min(top_k, len(distance))
+        best = np.argpartition(distance, k - 1)[:k]
+        best = best[np.argsort(distance[best], kind="stable")]
+        return [
+            {
+                "source_uri": self.chunks[i].get("source_uri", ""),
+                "source_name": self.chunks[i].get("source_name", ""),
+                "text": self.chunks[i].get("text", ""),
+                "score": float(distance[i]),
+            }
+            for i in best.tolist()
+            if distance[i] < threshold
+        ]
+
+
+_indexes: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_local_index(rag_corpus: str) -> LocalRagIndex:
+    """The loaded index for a "local:<path>" corpus, reloaded when it is rebuilt."""
+    path = rag_corpus[len(LOCAL_CORPUS_PREFIX):]
+    stamp = os.stat(os.path.join(path, INDEX_FILE)).st_mtime_ns
+    with _lock:
+        loaded = _indexes.get(path)
+        if loaded is None or loaded[0] != stamp:
+            loaded = _indexes[path] = (stamp, LocalRagIndex(path))
+        return loaded[1]
+
+
+def local_retrieval_query(rag_corpus: str, query: str, top_k: int, threshold: float) -> List[Dict[str, Any]]:
+    return get_local_index(rag_corpus).search(query, top_k, threshold)
@@ -7,6 +7,8 @@ from google.adk.agents.callback_context import CallbackContext
 from google.adk.sessions.state import State
 from google.adk.tools import ToolContext
 
+from sahayak.tools.rag import prefetch_for_state
+
 # from src.shared_libraries import constants
 
 
@@ -25,6 +27,7 @@ def memorize_list(key: str, value: list, tool_context: ToolContext):
     mem_dict = tool_context.state
 
     mem_dict[key] = value
+    prefetch_for_state(key, value, tool_context)
 
     print({"status": f'Stored "{key}": {mem_dict[key]}', "mem_dict": mem_dict})
     return {"status": f'Stored "{key}": {mem_dict[key]}'}
@@ -54,6 +57,7 @@ def memorize(key: str, value: str, tool_context: ToolContext):
             mem_dict[key] = value
     else:
         mem_dict[key] = value
+    prefetch_for_state(key, mem_dict[key], tool_context)
     return {"status": f'Stored "{key}": {mem_dict[key]}'}
 
 
@@ -75,6 +79,7 @@ def memorize_dict(key: str, value: dict, tool_context: ToolContext):
 
     else:
         mem_dict[key] = value
+    prefetch_for_state(key, value, tool_context)
     return {"status": f'Stored "{key}": "{value}"'}
 
 
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The planner prompts ask for these exact queries, so prefetched results hit the exact cache
+CHAPTER_LIST_QUERY = "Get all the **CONTENTS** list about this book."
+CHAPTER_QUERY = "Get topics, learning objectives, key concepts for the chapter: {chapter}"
+
+
+def _chapter_names(value: Any) -> List[str]:
+    """Chapter names from a confirmed chapter list or a curriculum plan (dict or JSON)."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value.strip().removeprefix("```json").removesuffix("```"))
+        except json.JSONDecodeError:
+            return []
+    names: List[str] = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for chapter in node.get("chapters") or []:
+                name = chapter.get("name") if isinstance(chapter, dict) else chapter
+                if isinstance(name, str) and name.strip():
+                    names.append(name.strip())
+            for child in node.values():
+                walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        names = [v.strip() for v in value if v.strip()]
+    else:
+        walk(value)
+    return list(dict.fromkeys(names))
+
+
+def predicted_queries(key: str, value: Any, state: Dict[str, Any]) -> List[str]:
+    """The retrievals the planner will make next after ``key`` is stored, if predictable."""
+    if key == "current_grade":
+        # A returning teacher's saved curriculum says which chapters come next
+        return [CHAPTER_LIST_QUERY] + [
+            CHAPTER_QUERY.format(chapter=name) for name in _chapter_names(state.get("curriculum"))
+        ]
+    if key in ("confirmed_chapters", "curriculum"):
+        return [CHAPTER_QUERY.format(chapter=name) for name in _chapter_names(value)]
+    return []
+
+
+class RetrievalPrefetcher:
+    """
+    Runs predictable retrievals in the background so that the agent's next
+    tool calls find them cached.
+
+    At most RAG_PREFETCH_CONCURRENCY prefetches run at once across sessions,
+    leaving the rest of the retrieval pool to live queries. Pending
+    prefetches are cancelled when a session switches corpus (e.g. picks
+    another grade), when the same memory is stored again with a different
+    prediction (e.g. other chapters confirmed), or when they have waited
+    longer than RAG_PREFETCH_SESSION_TTL_SECONDS. Only sessions with
+    prefetches still running are tracked, at most RAG_PREFETCH_MAX_SESSIONS
+    (least recently scheduled dropped first). Prefetched keys are remembered
+    so live lookups that find them count as prefetch hits.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queries: Optional[int] = None,
+        max_tracked: int = 1024,
+        max_sessions: Optional[int] = None,
+        session_ttl: Optional[float] = None,
+    ):
+        self.max_concurrency = max_concurrency or int(os.getenv("RAG_PREFETCH_CONCURRENCY", 2))
+        self.max_queries = max_queries or int(os.getenv("RAG_PREFETCH_MAX_QUERIES", 20))
+        self.enabled = os.getenv("RAG_PREFETCH_ENABLED", "true").lower() != "false"
+        self.max_tracked = max_tracked
+        self.max_sessions = max_sessions or int(os.getenv("RAG_PREFETCH_MAX_SESSIONS", 1000))
+        self.session_ttl = session_ttl or float(os.getenv("RAG_PREFETCH_SESSION_TTL_SECONDS", 300))
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # session -> {"corpus", "scheduled_at", "intents": {intent: {cache key: task}}}
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Prefetched keys not yet looked up by a live query, oldest first
+        self._warmed: "OrderedDict[Hashable, None]" = OrderedDict()
+
+        self.scheduled = 0
+        self.completed = 0
+        self.already_cached = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.used = 0
+
+    def _bound(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._semaphore = loop, asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def cancel(self, session_id: str) -> int:
+        """Cancel a session's pending prefetches; returns how many were still running."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return 0
+        pending = [
+            task for tasks in session["intents"].values() for task in tasks.values() if not task.done()
+        ]
+        for task in pending:
+            task.cancel()
+        return len(pending)
+
+    def _prune(self) -> None:
+        """Cancel sessions whose prefetches outlived the TTL, then the oldest over the cap."""
+        expired = time.monotonic() - self.session_ttl
+        for session_id in [s for s, session in self._sessions.items() if session["scheduled_at"] < expired]:
+            self.cancel(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self.cancel(next(iter(self._sessions)))
+
+    def _finished(self, session_id: str, intent: str, key: Hashable, task: asyncio.Task) -> None:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        tasks = session["intents"].get(intent, {})
+        if tasks.get(key) is task:
+            del tasks[key]
+        self._forget_idle(session_id)
+
+    def _forget_idle(self, session_id: str) -> None:
+        """Drop a session's entry once it has nothing left running."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        session["intents"] = {intent: tasks for intent, tasks in session["intents"].items() if tasks}
+        if not session["intents"]:
+            del self._sessions[session_id]
+
+    def schedule(
+        self,
+        session_id: str,
+        corpus: Optional[str],
+        keys: Dict[Hashable, Callable[[], Awaitable[Any]]],
+        is_cached: Callable[[Hashable], bool],
+        intent: str = "",
+    ) -> int:
+        """
+        Start background fetches for ``keys`` (cache key -> coroutine factory)
+        in ``session_id``, predicted from ``intent`` (the memory just stored).
+        Prefetches of an earlier prediction for the same intent that are no
+        longer predicted are cancelled. Must be called from the event loop;
+        returns how many started.
+        """
+        if not self.enabled or not corpus or not keys:
+            return 0
+        self._prune()
+        session = self._sessions.get(session_id)
+        if session is not None and session["corpus"] != corpus:
+            self.cancel(session_id)
+            session = None
+        if session is None:
+            session = self._sessions[session_id] = {"corpus": corpus, "intents": {}}
+        session["scheduled_at"] = time.monotonic()
+        self._sessions.move_to_end(session_id)
+
+        wanted = dict(list(keys.items())[: self.max_queries])
+        tasks: Dict[Hashable, asyncio.Task] = session["intents"].setdefault(intent, {})
+        for key in [key for key in tasks if key not in wanted]:
+            tasks.pop(key).cancel()
+
+        started = 0
+        for key, fetch in wanted.items():
+            if key in tasks:
+                continue
+            if is_cached(key):
+                self.already_cached += 1
+                continue
+            task = asyncio.get_running_loop().create_task(self._run(key, fetch))
+            tasks[key] = task
+            task.add_done_callback(
+                lambda done, key=key: self._finished(session_id, intent, key, done)
+            )
+            self._remember(key)
+            started += 1
+        self._forget_idle(session_id)
+        self.scheduled += started
+        return started
+
+    def _remember(self, key: Hashable) -> None:
+        self._warmed[key] = None
+        self._warmed.move_to_end(key)
+        while len(self._warmed) > self.max_tracked:
+            self._warmed.popitem(last=False)
+
+    async def _run(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            async with self._bound():
+                await fetch()
+            self.completed += 1
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            self._warmed.pop(key, None)
+            raise
+        except Exception as e:
+            self.failed += 1
+            self._warmed.pop(key, None)
+            logger.warning(f"Prefetch failed for {key[1] if isinstance(key, tuple) else key}: {e}")
+
+    def note_lookup(self, key: Hashable) -> None:
+        """Record a live lookup; the first one of a prefetched key is a prefetch hit."""
+        if key in self._warmed:
+            del self._warmed[key]
+            self.used += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "already_cached": self.already_cached,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "used": self.used,
+            # Share of prefetches a live query went on to use
+            "hit_rate": self.used / self.scheduled if self.scheduled else 0.0,
+            "sessions": len(self._sessions),
+            "running": sum(
+                1
+                for session in self._sessions.values()
+                for tasks in session["intents"].values()
+                for task in tasks.values()
+                if not task.done()
+            ),
+        }
+
+
+prefetcher = RetrievalPrefetcher()
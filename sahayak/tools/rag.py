@@ -1,30 +1,198 @@
+import asyncio
+import hashlib
 import os
+import re
 from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
 
 from vertexai.preview import rag
 from google.adk.tools import ToolContext
 
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
-def get_rag_resources(tool_context: ToolContext):
+from sahayak.tools.context_packing import RAG_CONTEXT_PACKING, load_encoder_async, pack_contexts
+from sahayak.tools.local_rag import is_local_corpus, local_retrieval_query
+from sahayak.tools.prefetch import predicted_queries, prefetcher
+from sahayak.tools.rag_cache import rag_cache
+from sahayak.tools.semantic_cache import semantic_cache
+from sahayak.tools.session_key import session_key
+
+RAG_TOP_K = 10
+RAG_DISTANCE_THRESHOLD = 0.6
+RAG_TIMEOUT_SECONDS = float(os.environ.get("RAG_TIMEOUT_SECONDS", "30"))
+RAG_MULTI_QUERY_MAX = 20
+RAG_MULTI_CONTEXT_TOKEN_BUDGET = int(os.environ.get("RAG_MULTI_CONTEXT_TOKEN_BUDGET", "6000"))
+
+# The Vertex RAG client blocks, so retrievals run here instead of on the
+# server's event loop; the bound caps concurrent calls per process.
+rag_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("RAG_MAX_WORKERS", "8")),
+    thread_name_prefix="rag",
+)
+
+
+def corpus_for_grade(grade) -> str:
+    """The RAG corpus for a grade, falling back to grade 6."""
+    if grade:
+        return os.environ.get(f"RAG_CORPUS_GRADE_{grade}")
+    return os.environ.get("RAG_CORPUS_GRADE_6")
+
+
+def get_rag_corpus(tool_context: ToolContext) -> str:
 
     # Access the state from tool_context
 
-    current_grade = tool_context.state.get("current_grade")
-    current_grade = current_grade.get("grade", None)
+    current_grade = tool_context.state.get("current_grade") or {}
+    return corpus_for_grade(current_grade.get("grade", None))
+
+
+def get_rag_resources(tool_context: ToolContext):
+    return [rag.RagResource(rag_corpus=get_rag_corpus(tool_context))]
+
+
+def _retrieval_query(
+    rag_corpus: str, query: str, top_k: int, threshold: float
+) -> List[Dict[str, Any]]:
+    """Call Vertex AI RAG and flatten the response into plain result dicts."""
+    # Configure retrieval parameters
+    rag_retrieval_config = rag.RagRetrievalConfig(
+        top_k=top_k,
+        filter=rag.Filter(vector_distance_threshold=threshold),
+    )
+
+    # Perform the query
+    print("Performing retrieval query...")
+    response = rag.retrieval_query(
+        rag_resources=[
+            rag.RagResource(
+                rag_corpus=rag_corpus,
+            )
+        ],
+        text=query,
+        rag_retrieval_config=rag_retrieval_config,
+    )
+
+    # Process the response into a more usable format
+    results = []
+    if hasattr(response, "contexts") and response.contexts:
+        for ctx_group in response.contexts.contexts:
+            result = {
+                "source_uri": (
+                    ctx_group.source_uri if hasattr(ctx_group, "source_uri") else ""
+                ),
+                "source_name": (
+                    ctx_group.source_display_name
+                    if hasattr(ctx_group, "source_display_name")
+                    else ""
+                ),
+                "text": ctx_group.text if hasattr(ctx_group, "text") else "",
+                "score": ctx_group.score if hasattr(ctx_group, "score") else 0.0,
+            }
+            results.append(result)
+    return results
+
+
+def _fetch(
+    rag_corpus: str, query: str, top_k: int, threshold: float
+) -> List[Dict[str, Any]]:
+    """Exact-cache miss: reuse a similar recent query's contexts, else call Vertex AI."""
+    if is_local_corpus(rag_corpus):
+        # A local search costs less than embedding the query for the semantic cache
+        return local_retrieval_query(rag_corpus, query, top_k, threshold)
+    return semantic_cache.get_or_fetch(
+        rag_corpus,
+        query,
+        top_k,
+        threshold,
+        lambda: _retrieval_query(rag_corpus, query, top_k, threshold),
+    )
+
+
+def retrieve(
+    rag_corpus: str,
+    query: str,
+    top_k: int = RAG_TOP_K,
+    threshold: float = RAG_DISTANCE_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """Retrieval results for a query, shared with identical recent or in-flight queries."""
+    key = rag_cache.make_key(rag_corpus, query, top_k, threshold)
+    prefetcher.note_lookup(key)
+    results = rag_cache.get_or_fetch(
+        key, lambda: _fetch(rag_corpus, query, top_k, threshold)
+    )
+    # Callers get their own copies; the cached list is shared
+    return [dict(result) for result in results]
+
 
-    if current_grade:
-        rag_corpus = os.environ.get(f"RAG_CORPUS_GRADE_{current_grade}")
+async def retrieve_async(
+    rag_corpus: str,
+    query: str,
+    top_k: int = RAG_TOP_K,
+    threshold: float = RAG_DISTANCE_THRESHOLD,
+    timeout: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    retrieve() without blocking the event loop; raises TimeoutError after
+    ``timeout`` (RAG_TIMEOUT_SECONDS by default).
+    """
+    key = rag_cache.make_key(rag_corpus, query, top_k, threshold)
+    prefetcher.note_lookup(key)
+    results = await rag_cache.get_or_fetch_async(
+        key,
+        lambda: _fetch(rag_corpus, query, top_k, threshold),
+        rag_executor,
+        timeout if timeout is not None else RAG_TIMEOUT_SECONDS,
+    )
+    return [dict(result) for result in results]
 
-    else:
-        rag_corpus = os.environ.get("RAG_CORPUS_GRADE_6")
 
-    return [rag.RagResource(rag_corpus=rag_corpus)]
+def prefetch_for_state(key: str, value: Any, tool_context: ToolContext) -> int:
+    """
+    Warm the cache with the retrievals the planner makes after ``key`` is
+    memorized. Returns how many prefetches started; none outside an event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return 0
+    try:
+        queries = predicted_queries(key, value, tool_context.state)
+        if not queries:
+            return 0
+        rag_corpus = get_rag_corpus(tool_context)
+
+        def fetch(query):
+            cache_key = rag_cache.make_key(rag_corpus, query, RAG_TOP_K, RAG_DISTANCE_THRESHOLD)
+            return cache_key, lambda: rag_cache.get_or_fetch_async(
+                cache_key,
+                lambda: _fetch(rag_corpus, query, RAG_TOP_K, RAG_DISTANCE_THRESHOLD),
+                rag_executor,
+                RAG_TIMEOUT_SECONDS,
+            )
+
+        started = prefetcher.schedule(
+            session_key(tool_context),
+            rag_corpus,
+            dict(map(fetch, queries)),
+            rag_cache.contains,
+            intent=key,
+        )
+        if started:
+            print(f"Prefetching {started} RAG queries after storing '{key}'")
+        return started
+    except Exception as e:
+        # Prefetching is only an optimisation; storing the memory must still succeed
+        print(f"Skipping RAG prefetch: {e}")
+        return 0
 
 
 class DynamicRagRetrieval(VertexAiRagRetrieval):
 
     async def process_llm_request(self, *, tool_context: ToolContext, llm_request):
+        if is_local_corpus(get_rag_corpus(tool_context)):
+            # Vertex grounding can't read a local index; rag_query covers it
+            print("Local RAG corpus; skipping Vertex AI retrieval grounding")
+            return
         self.vertex_rag_store.rag_resources = get_rag_resources(tool_context)
         print(f"RAG resources updated: {self.vertex_rag_store.rag_resources}")
 
@@ -40,12 +208,12 @@ ask_vertex_retrieval = DynamicRagRetrieval(
     description=(
         "Use this tool to retrieve documentation and reference materials for the question from the RAG corpus,"
     ),
-    similarity_top_k=10,
-    vector_distance_threshold=0.6,
+    similarity_top_k=RAG_TOP_K,
+    vector_distance_threshold=RAG_DISTANCE_THRESHOLD,
 )
 
 
-def rag_query(
+async def rag_query(
     corpus_name: str,
     query: str,
     tool_context: ToolContext,
@@ -63,50 +231,12 @@ def rag_query(
         dict: The query results and status
     """
     try:
-
-        # Configure retrieval parameters
-        rag_retrieval_config = rag.RagRetrievalConfig(
-            top_k=10,
-            filter=rag.Filter(vector_distance_threshold=0.6),
-        )
-
-        current_grade = tool_context.state.get("current_grade")
-        current_grade = current_grade.get("grade", None)
-
-        if current_grade:
-            rag_corpus = os.environ.get(f"RAG_CORPUS_GRADE_{current_grade}")
-        else:
-            rag_corpus = os.environ.get("RAG_CORPUS_GRADE_6")
-
-        # Perform the query
-        print("Performing retrieval query...")
-        response = rag.retrieval_query(
-            rag_resources=[
-                rag.RagResource(
-                    rag_corpus=rag_corpus,
-                )
-            ],
-            text=query,
-            rag_retrieval_config=rag_retrieval_config,
-        )
-
-        # Process the response into a more usable format
-        results = []
-        if hasattr(response, "contexts") and response.contexts:
-            for ctx_group in response.contexts.contexts:
-                result = {
-                    "source_uri": (
-                        ctx_group.source_uri if hasattr(ctx_group, "source_uri") else ""
-                    ),
-                    "source_name": (
-                        ctx_group.source_display_name
-                        if hasattr(ctx_group, "source_display_name")
-                        else ""
-                    ),
-                    "text": ctx_group.text if hasattr(ctx_group, "text") else "",
-                    "score": ctx_group.score if hasattr(ctx_group, "score") else 0.0,
-                }
-                results.append(result)
+        rag_corpus = get_rag_corpus(tool_context)
+        results = await retrieve_async(rag_corpus, query)
+        if RAG_CONTEXT_PACKING:
+            await load_encoder_async()
+            results, packing = pack_contexts(query, results)
+            print(f"Packed RAG contexts: {packing}")
 
         # If we didn't find any results
         if not results:
@@ -128,6 +258,14 @@ def rag_query(
             "results_count": len(results),
         }
 
+    except asyncio.TimeoutError:
+        return {
+            "status": "error",
+            "message": f"Querying corpus timed out after {RAG_TIMEOUT_SECONDS:g}s",
+            "query": query,
+            "corpus_name": corpus_name,
+        }
+
     except Exception as e:
         error_msg = f"Error querying corpus: {str(e)}"
         # logging.error(error_msg)
@@ -137,3 +275,116 @@ def rag_query(
             "query": query,
             "corpus_name": corpus_name,
         }
+
+
+def _context_key(result: Dict[str, Any]) -> tuple:
+    text = re.sub(r"\s+", " ", result.get("text", "")).strip().lower()
+    return (result.get("source_uri", ""), hashlib.sha1(text.encode()).hexdigest())
+
+
+def merge_results(
+    per_query: List[List[Dict[str, Any]]]
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Merge several queries' contexts, dropping repeats of the same chunk
+    (same source_uri and text). The best score is kept; scores are vector
+    distances, so lower is better. Returns (results by score, duplicates dropped).
+    """
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    duplicates = 0
+    for index, results in enumerate(per_query):
+        for result in results:
+            key = _context_key(result)
+            kept = merged.get(key)
+            if kept is None:
+                merged[key] = dict(result, queries=[index])
+                continue
+            duplicates += 1
+            if index not in kept["queries"]:
+                kept["queries"].append(index)
+            if result.get("score", 0.0) < kept.get("score", 0.0):
+                kept["score"] = result["score"]
+    return sorted(merged.values(), key=lambda r: r.get("score", 0.0)), duplicates
+
+
+async def rag_multi_query(
+    corpus_name: str,
+    queries: List[str],
+    tool_context: ToolContext,
+) -> dict:
+    """
+    Run several queries against the current grade's RAG corpus at once and return
+    their combined, de-duplicated results. Use this instead of calling `rag_query`
+    once per chapter or topic.
+
+    Args:
+        corpus_name (str): The name of the corpus to query. If empty, the current corpus will be used.
+        queries (list[str]): The text queries to search for, e.g. one per chapter
+        tool_context (ToolContext): The tool context
+
+    Returns:
+        dict: The merged results (each with the indexes of the `queries` it matched) and status
+    """
+    # Drop repeated queries, keeping the caller's order
+    unique = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    if not unique:
+        return {
+            "status": "error",
+            "message": "Please provide at least one query",
+            "queries": queries,
+            "corpus_name": corpus_name,
+        }
+    if len(unique) > RAG_MULTI_QUERY_MAX:
+        return {
+            "status": "error",
+            "message": f"At most {RAG_MULTI_QUERY_MAX} queries can be run at once",
+            "queries": unique,
+            "corpus_name": corpus_name,
+        }
+
+    rag_corpus = get_rag_corpus(tool_context)
+    outcomes = await asyncio.gather(
+        *(retrieve_async(rag_corpus, query) for query in unique),
+        return_exceptions=True,
+    )
+
+    per_query, errors = [], {}
+    for query, outcome in zip(unique, outcomes):
+        if isinstance(outcome, BaseException):
+            reason = "timed out" if isinstance(outcome, asyncio.TimeoutError) else str(outcome)
+            errors[query] = reason
+            per_query.append([])
+        else:
+            per_query.append(outcome)
+    results, duplicates = merge_results(per_query)
+    if RAG_CONTEXT_PACKING:
+        await load_encoder_async()
+        results, packing = pack_contexts(
+            " ".join(unique), results, budget=RAG_MULTI_CONTEXT_TOKEN_BUDGET
+        )
+        print(f"Packed RAG contexts: {packing}")
+
+    if len(errors) == len(unique):
+        return {
+            "status": "error",
+            "message": f"Error querying corpus: {next(iter(errors.values()))}",
+            "queries": unique,
+            "corpus_name": corpus_name,
+            "errors": errors,
+        }
+
+    return {
+        "status": "success" if results else "warning",
+        "message": (
+            f"Successfully queried corpus '{corpus_name}' with {len(unique)} queries"
+            if results
+            else f"No results found in corpus '{corpus_name}' for {len(unique)} queries"
+        ),
+        "queries": unique,
+        "corpus_name": corpus_name,
+        "results": results,
+        "results_count": len(results),
+        "results_per_query": [len(r) for r in per_query],
+        "duplicates_removed": duplicates,
+        "errors": errors,
+    }
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation don't change what is retrieved."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?.!").strip().lower()
+
+
+class RagResultCache:
+    """
+    Bounded LRU + TTL cache for RAG retrieval results, with single-flight.
+
+    Entries are keyed on (corpus, normalized query, top_k, threshold). When
+    several threads ask for the same key at once, only the first calls the
+    retrieval service and the rest wait for its result. Every flush moves the
+    corpus to a new generation: fetches started before it still answer their
+    own callers but are not cached, and later callers don't wait on them.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        self.maxsize = maxsize or int(os.getenv("RAG_CACHE_MAXSIZE", 256))
+        self.ttl = ttl or float(os.getenv("RAG_CACHE_TTL_SECONDS", 600))
+        self.enabled = os.getenv("RAG_CACHE_ENABLED", "true").lower() != "false"
+
+        self._cache: TTLCache = TTLCache(maxsize=self.maxsize, ttl=self.ttl)
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        # Bumped by flush(): all corpora, and per corpus
+        self._generation = 0
+        self._corpus_generations: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.stale_fills = 0
+        self._by_corpus: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(
+        corpus: str, query: str, top_k: int, threshold: float
+    ) -> Tuple[Hashable, ...]:
+        return (corpus, normalize_query(query), top_k, threshold)
+
+    def _count(self, corpus: str, outcome: str) -> None:
+        counts = self._by_corpus.setdefault(corpus, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def _generation_of(self, corpus: str) -> Tuple[int, int]:
+        return self._generation, self._corpus_generations.get(corpus, 0)
+
+    def _claim(self, key) -> Tuple[str, Any, Tuple[int, int]]:
+        """
+        ("hit", value), ("wait", future) behind another caller, or ("lead",
+        future) to fill, each with the corpus generation at the time.
+        """
+        corpus = key[0]
+        with self._lock:
+            generation = self._generation_of(corpus)
+            value = self._cache.get(key)
+            if value is not None:
+                self.hits += 1
+                self._count(corpus, "hits")
+                return "hit", value, generation
+            pending = self._in_flight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                self._count(corpus, "hits")
+                return "wait", pending, generation
+            self.misses += 1
+            self._count(corpus, "misses")
+            pending = self._in_flight[key] = Future()
+            return "lead", pending, generation
+
+    def _fill(
+        self,
+        key,
+        pending: Future,
+        fetch: Callable[[], List[Dict[str, Any]]],
+        generation: Tuple[int, int],
+    ):
+        try:
+            value = fetch()
+        except Exception as e:
+            with self._lock:
+                if self._in_flight.get(key) is pending:
+                    self._in_flight.pop(key)
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            if self._generation_of(key[0]) == generation:
+                self._cache[key] = value
+            else:
+                # The corpus was flushed while this fetch ran; its result may be stale
+                self.stale_fills += 1
+            if self._in_flight.get(key) is pending:
+                self._in_flight.pop(key)
+        pending.set_result(value)
+        return value
+
+    def contains(self, key) -> bool:
+        """Whether ``key`` is cached or being fetched, without counting a lookup."""
+        with self._lock:
+            return key in self._cache or key in self._in_flight
+
+    def get_or_fetch(self, key, fetch: Callable[[], List[Dict[str, Any]]]):
+        """
+        Cached results for ``key``, or ``fetch()``'s if there are none. Errors
+        are raised to every waiting caller and never cached.
+        """
+        if not self.enabled:
+            return fetch()
+        state, value, generation = self._claim(key)
+        if state == "hit":
+            return value
+        if state == "wait":
+            return value.result()
+        return self._fill(key, value, fetch, generation)
+
+    async def get_or_fetch_async(
+        self,
+        key,
+        fetch: Callable[[], List[Dict[str, Any]]],
+        executor: Executor,
+        timeout: Optional[float] = None,
+    ):
+        """
+        get_or_fetch for the event loop: the blocking ``fetch`` runs on
+        ``executor`` and waiters never tie up a thread. On timeout the fetch
+        keeps going and still fills the cache for later callers.
+        """
+        loop = asyncio.get_running_loop()
+        if not self.enabled:
+            return await asyncio.wait_for(loop.run_in_executor(executor, fetch), timeout)
+        state, value, generation = self._claim(key)
+        if state == "hit":
+            return value
+        if state == "lead":
+            executor.submit(self._fill, key, value, fetch, generation)
+        # Shielded so one caller timing out doesn't cancel the shared fetch
+        return await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(value)), timeout
+        )
+
+    def flush(self, corpus: Optional[str] = None) -> int:
+        """Drop every entry, or only one corpus's; returns how many went."""
+        with self._lock:
+            if corpus is None:
+                self._generation += 1
+            else:
+                self._corpus_generations[corpus] = self._corpus_generations.get(corpus, 0) + 1
+            keys = [k for k in list(self._cache.keys()) if corpus is None or k[0] == corpus]
+            for key in keys:
+                self._cache.pop(key, None)
+            # Fetches already running finish for their own callers only
+            for key in [k for k in self._in_flight if corpus is None or k[0] == corpus]:
+                self._in_flight.pop(key)
+            self.flushes += 1
+        logger.info(f"♻️ Flushed {len(keys)} RAG cache entries for {corpus or 'all corpora'}")
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "in_flight": len(self._in_flight),
+            "flushes": self.flushes,
+            "stale_fills": self.stale_fills,
+            "corpora": self._by_corpus,
+        }
+
+
+rag_cache = RagResultCache()
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+def _number(value: float):
+    """Whole-number scores come back as ints, like they do from Neo4j."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class ScoreSnapshot:
+    """
+    In-memory, columnar copy of the (Student)-[:SCORED_IN]->(Topic) graph.
+
+    Scores live in a students x columns float32 matrix (NaN where a student
+    has no score), one column per (topic, grade, test) so every SCORED_IN
+    relationship keeps its own cell, exactly like a row in the Cypher results.
+    The query methods mirror the row shapes of the graph backends and return
+    None whenever they can't answer, so callers fall back to the backend.
+    Returned rows may be shared between calls and must not be modified.
+
+    Enabled with GRAPH_ANALYTICS_ENGINE=snapshot and reloaded in the
+    background whenever the importer bumps the score DataVersion; the old
+    snapshot keeps serving until the new one is built.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("GRAPH_ANALYTICS_ENGINE", "cypher") == "snapshot"
+        self.version: Optional[int] = None
+        self.loaded_at: Optional[float] = None
+        self._loading: Optional[asyncio.Task] = None
+
+        self.roll_nos = np.empty(0, dtype=object)
+        self.names = np.empty(0, dtype=object)
+        self.scores = np.empty((0, 0), dtype=np.float32)
+        self.out_of = np.empty(0, dtype=np.float32)
+        self.columns: List[tuple] = []
+        self._topic_columns: Dict[tuple, np.ndarray] = {}
+        self.grade_columns: Dict[Optional[str], np.ndarray] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.enabled and self.loaded_at is not None
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "ScoreSnapshot":
+        """Build a snapshot from long-format rows (graph_backends.SNAPSHOT_COLUMNS)."""
+        snapshot = cls()
+        snapshot.enabled = True
+        snapshot._load_frame(frame)
+        return snapshot
+
+    def _load_frame(self, frame: pd.DataFrame) -> None:
+        self.__dict__.update(self._build(frame))
+
+    @staticmethod
+    def _build(frame: pd.DataFrame) -> Dict[str, Any]:
+        """
+        The snapshot's arrays and indexes for a frame, as attributes to swap
+        in. Touches no shared state, so it can run off the event loop.
+        """
+        started = time.perf_counter()
+        frame = frame.assign(
+            score=pd.to_numeric(frame["score"], errors="coerce"),
+            out_of=pd.to_numeric(frame["out_of"], errors="coerce"),
+        ).dropna(subset=["roll_no", "topic"])
+        grades = frame["grade"].astype(object)
+        grades = grades.where(grades.isna(), grades.astype(str))
+
+        # Factorize each key part separately and combine the integer codes;
+        # factorizing tuples directly is an order of magnitude slower.
+        topic_codes, topic_values = pd.factorize(frame["topic"])
+        grade_codes, grade_values = pd.factorize(grades.fillna(""))
+        # A student is a (grade, roll_no): roll numbers restart in every grade
+        roll_codes, roll_values = pd.factorize(frame["roll_no"])
+        student_codes, student_keys = pd.factorize(
+            roll_codes.astype(np.int64) * len(grade_values) + grade_codes
+        )
+        roll_nos = roll_values[student_keys // len(grade_values)]
+        test_codes, test_values = pd.factorize(frame["test"].fillna(""))
+        combined = (
+            topic_codes.astype(np.int64) * len(grade_values) + grade_codes
+        ) * len(test_values) + test_codes
+        unique_keys, column_codes = np.unique(combined, return_inverse=True)
+        columns = [
+            (
+                topic_values[key // (len(grade_values) * len(test_values))],
+                grade_values[key // len(test_values) % len(grade_values)],
+                test_values[key % len(test_values)],
+            )
+            for key in unique_keys
+        ]
+
+        scores = np.full((len(roll_nos), len(columns)), np.nan, dtype=np.float32)
+        scores[student_codes, column_codes] = frame["score"].to_numpy(np.float32)
+
+        out_of = np.full(len(columns), np.nan, dtype=np.float32)
+        np.fmax.at(out_of, column_codes, frame["out_of"].to_numpy(np.float32))
+        # fmin/fmax skip NaN, so a column holding only null scores stays NaN
+        col_min = np.full(len(columns), np.nan, dtype=np.float32)
+        col_max = np.full(len(columns), np.nan, dtype=np.float32)
+        np.fmin.at(col_min, column_codes, frame["score"].to_numpy(np.float32))
+        np.fmax.at(col_max, column_codes, frame["score"].to_numpy(np.float32))
+
+        names = np.empty(len(roll_nos), dtype=object)
+        names[student_codes] = frame["name"].to_numpy(object)
+
+        # Scores only change on import, so per-column aggregates are computed
+        # once here and statistics become a reduction over a few columns.
+        # Rows with a null score count towards total_scores, like count(r).
+        present = ~np.isnan(scores)
+        columns = [(topic, grade or None, test or None) for topic, grade, test in columns]
+        topic_columns: Dict[tuple, List[int]] = {}
+        grade_columns: Dict[Optional[str], List[int]] = {}
+        for i, (topic, grade, _) in enumerate(columns):
+            topic_columns.setdefault((topic, grade), []).append(i)
+            topic_columns.setdefault((topic, None), []).append(i)
+            grade_columns.setdefault(grade, []).append(i)
+
+        logger.info(
+            f"📦 Score snapshot built: {len(roll_nos)} students x "
+            f"{len(columns)} columns in {time.perf_counter() - started:.2f}s"
+        )
+        return {
+            "roll_nos": np.asarray(roll_nos, dtype=object),
+            "names": names,
+            "scores": scores,
+            "out_of": out_of,
+            "columns": columns,
+            "_col_rows": np.bincount(column_codes, minlength=len(columns)),
+            "_col_count": present.sum(axis=0),
+            "_col_sum": np.nansum(scores, axis=0, dtype=np.float64),
+            "_col_min": col_min,
+            "_col_max": col_max,
+            "_rankings": {},
+            "_team_scores": {},
+            "_topic_columns": {k: np.array(v) for k, v in topic_columns.items()},
+            "grade_columns": {k: np.array(v) for k, v in grade_columns.items()},
+            "loaded_at": time.time(),
+        }
+
+    async def refresh(self, backend, version: Optional[int]) -> None:
+        """
+        Reload from the graph backend if the data version moved since the last
+        load. Only the first load is waited for; later ones run in the
+        background while the current snapshot keeps answering.
+        """
+        if not self.enabled or (self.loaded_at is not None and version == self.version):
+            return
+        if self._loading is None or self._loading.done():
+            self._loading = asyncio.get_running_loop().create_task(self._reload(backend, version))
+        if self.loaded_at is None:
+            await asyncio.shield(self._loading)
+
+    async def _reload(self, backend, version: Optional[int]) -> None:
+        try:
+            frame = await backend.snapshot_frame()
+            fields = await asyncio.to_thread(self._build, frame)
+            # One synchronous swap, so no reader sees half of each snapshot
+            self.__dict__.update(fields)
+            self.version = version
+        except Exception:
+            # Keep serving the previous snapshot (or the backend) rather than failing
+            logger.exception("Failed to load score snapshot")
+
+    def _columns_for(self, topic: str, grade: Optional[str]) -> Optional[np.ndarray]:
+        """Column indices for a topic in one grade, or across all grades if None."""
+        return self._topic_columns.get((topic, str(grade) if grade else None))
+
+    def top_students(
+        self, topic: str, grade: Optional[str], k: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Highest individual scores, like TOP_STUDENTS_QUERY."""
+        if not self.ready:
+            return None
+        # Cypher matches {grade: $grade}, which never matches a null grade
+        cols = self._columns_for(topic, grade) if grade else None
+        if cols is None:
+            return []
+        top = self._ranking(topic, str(grade), cols)[:k]
+        students, cells = np.divmod(top, len(cols))
+        return [
+            {"student_name": self.names[s], "score": _number(self.scores[s, cols[c]])}
+            for s, c in zip(students, cells)
+        ]
+
+    def _ranking(self, topic: str, grade: str, cols: np.ndarray) -> np.ndarray:
+        """Scored cells of a topic in descending order, computed once per load."""
+        ranking = self._rankings.get((topic, grade))
+        if ranking is None:
+            flat = self.scores[:, cols].ravel()
+            valid = np.flatnonzero(~np.isnan(flat))
+            ranking = valid[np.argsort(-flat[valid], kind="stable")]
+            self._rankings[(topic, grade)] = ranking
+        return ranking
+
+    def topic_statistics(
+        self, topics: List[str], grades: Optional[List[str]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Per (topic, grade) aggregates, like TOPIC_STATISTICS_QUERY."""
+        if not self.ready:
+            return None
+        rows = []
+        for topic in topics:
+            for grade in grades or [None]:
+                cols = self._columns_for(topic, grade)
+                total = int(self._col_rows[cols].sum()) if cols is not None else 0
+                count = int(self._col_count[cols].sum()) if cols is not None else 0
+                rows.append(
+                    {
+                        "topic": topic,
+                        "grade": grade,
+                        "topic_exists": cols is not None,
+                        "total_scores": total,
+                        "average_score": (
+                            float(self._col_sum[cols].sum() / count) if count else None
+                        ),
+                        "min_score": _number(np.nanmin(self._col_min[cols])) if count else None,
+                        "max_score": _number(np.nanmax(self._col_max[cols])) if count else None,
+                    }
+                )
+        return rows
+
+    def team_scores(
+        self, topics: List[str], grade: Optional[str]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Per-topic, per-student mean scores, like TEAM_SCORES_QUERY."""
+        if not self.ready:
+            return None
+        rows = []
+        for topic in topics:
+            cols = self._columns_for(topic, grade) if grade else None
+            scores = self._team_topic_scores(topic, str(grade), cols) if cols is not None else []
+            rows.append(
+                {"topic": topic, "topic_exists": cols is not None, "scores": scores}
+            )
+        return rows
+
+    def _team_topic_scores(self, topic: str, grade: str, cols: np.ndarray) -> List[Dict[str, Any]]:
+        """Each student's mean over a topic's tests, computed once per load like the rankings."""
+        scores = self._team_scores.get((topic, grade))
+        if scores is None:
+            block = self.scores[:, cols]
+            counts = (~np.isnan(block)).sum(axis=1)
+            students = np.flatnonzero(counts)
+            means = (np.nansum(block[students], axis=1) / counts[students]).tolist()
+            out_of = _number(np.nanmax(self.out_of[cols])) if len(cols) else None
+            names, roll_nos = self.names[students].tolist(), self.roll_nos[students].tolist()
+            scores = [
+                {"student_name": name, "roll_no": roll_no, "score": score, "out_of": out_of}
+                for name, roll_no, score in zip(names, roll_nos, means)
+            ]
+            self._team_scores[(topic, grade)] = scores
+        return scores
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "loaded": self.loaded_at is not None,
+            "data_version": self.version,
+            "students": len(self.roll_nos),
+            "columns": len(self.columns),
+            "bytes": int(self.scores.nbytes),
+        }
+
+
+score_snapshot = ScoreSnapshot()
@@ -0,0 +1,272 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sahayak.tools.embeddings import EmbeddingFunction, get_embedding
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticIndex:
+    """
+    Fixed-size ring of recent query embeddings for one corpus. Once full, the
+    oldest entry is overwritten; expired entries are skipped at lookup.
+    """
+
+    def __init__(self, capacity: int, dimensions: int):
+        self.vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.expires = np.full(capacity, -np.inf)
+        # Retrieval parameters (top_k, threshold) per slot, as small int codes
+        self.params = np.full(capacity, -1, dtype=np.int32)
+        self.results: List[Optional[List[Dict[str, Any]]]] = [None] * capacity
+        self._param_codes: Dict[Tuple[int, float], int] = {}
+        self._next = 0
+
+    def _code(self, params: Tuple[int, float]) -> int:
+        return self._param_codes.setdefault(params, len(self._param_codes))
+
+    def lookup(
+        self, vector: np.ndarray, params: Tuple[int, float], now: float
+    ) -> Tuple[float, Optional[List[Dict[str, Any]]]]:
+        """Best (similarity, results) among live entries with the same parameters."""
+        code = self._param_codes.get(params)
+        if code is None:
+            return -1.0, None
+        similarity = self.vectors @ vector
+        similarity[(self.expires <= now) | (self.params != code)] = -np.inf
+        best = int(np.argmax(similarity))
+        return float(similarity[best]), self.results[best]
+
+    def add(self, vector: np.ndarray, params: Tuple[int, float], results, expires: float):
+        slot = self._next
+        self.vectors[slot] = vector
+        self.expires[slot] = expires
+        self.params[slot] = self._code(params)
+        self.results[slot] = results
+        self._next = (slot + 1) % len(self.expires)
+
+    def size(self, now: float) -> int:
+        return int((self.expires > now).sum())
+
+
+class SemanticRagCache:
+    """
+    Embedding-similarity cache in front of RAG retrieval.
+
+    Each corpus gets a SemanticIndex of recent queries. A new query whose
+    embedding is at least RAG_SEMANTIC_THRESHOLD cosine-similar to a cached
+    one with the same top_k and threshold reuses its contexts. Memory is
+    capped at RAG_SEMANTIC_MAX_ENTRIES per corpus and RAG_SEMANTIC_MAX_CORPORA
+    corpora (least recently used corpus dropped first).
+
+    The query embedding is waited for at most RAG_SEMANTIC_EMBED_TIMEOUT_SECONDS;
+    past that the retrieval goes ahead and the embedding, if it still arrives,
+    only indexes the result. After RAG_SEMANTIC_BREAKER_FAILURES failed or
+    timed-out embeddings in a row, semantic lookups are skipped for
+    RAG_SEMANTIC_BREAKER_COOLDOWN_SECONDS, then one query tries again.
+    Results fetched across a flush of their corpus are not indexed.
+    """
+
+    def __init__(
+        self,
+        embed: Optional[EmbeddingFunction] = None,
+        threshold: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_corpora: Optional[int] = None,
+        ttl: Optional[float] = None,
+        embed_timeout: Optional[float] = None,
+        breaker_failures: Optional[int] = None,
+        breaker_cooldown: Optional[float] = None,
+    ):
+        self._embed = embed
+        self.threshold = threshold if threshold is not None else float(os.getenv("RAG_SEMANTIC_THRESHOLD", 0.92))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("RAG_SEMANTIC_MAX_ENTRIES", 512))
+        self.max_corpora = max_corpora if max_corpora is not None else int(os.getenv("RAG_SEMANTIC_MAX_CORPORA", 16))
+        self.ttl = ttl if ttl is not None else float(os.getenv("RAG_SEMANTIC_TTL_SECONDS", 600))
+        self.enabled = os.getenv("RAG_SEMANTIC_CACHE_ENABLED", "true").lower() != "false"
+        self.embed_timeout = (
+            embed_timeout if embed_timeout is not None else float(os.getenv("RAG_SEMANTIC_EMBED_TIMEOUT_SECONDS", 2))
+        )
+        self.breaker_failures = (
+            breaker_failures if breaker_failures is not None else int(os.getenv("RAG_SEMANTIC_BREAKER_FAILURES", 5))
+        )
+        self.breaker_cooldown = (
+            breaker_cooldown
+            if breaker_cooldown is not None
+            else float(os.getenv("RAG_SEMANTIC_BREAKER_COOLDOWN_SECONDS", 60))
+        )
+
+        self._indexes: "OrderedDict[str, SemanticIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by flush(): all corpora, and per corpus
+        self._generation = 0
+        self._corpus_generations: Dict[str, int] = {}
+        self._embed_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("RAG_SEMANTIC_EMBED_WORKERS", 4)),
+            thread_name_prefix="semantic-embed",
+        )
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+
+        self.hits = 0
+        self.misses = 0
+        self.embed_errors = 0
+        self.embed_timeouts = 0
+        self.breaker_skips = 0
+        self.stale_fills = 0
+
+    @property
+    def embed(self) -> EmbeddingFunction:
+        if self._embed is None:
+            self._embed = get_embedding()
+        return self._embed
+
+    def _index(self, corpus: str, dimensions: int) -> SemanticIndex:
+        index = self._indexes.get(corpus)
+        if index is None or index.vectors.shape[1] != dimensions:
+            index = self._indexes[corpus] = SemanticIndex(self.max_entries, dimensions)
+            while len(self._indexes) > self.max_corpora:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(corpus)
+        return index
+
+    def _allow_embedding(self) -> bool:
+        """False while the breaker is open; once it cools down, one query probes at a time."""
+        with self._lock:
+            if self._failures < self.breaker_failures:
+                return True
+            if time.monotonic() < self._open_until or self._probing:
+                self.breaker_skips += 1
+                return False
+            self._probing = True
+            return True
+
+    def _embedding_done(self, ok: bool) -> None:
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._failures >= self.breaker_failures:
+                if self._failures == self.breaker_failures:
+                    logger.warning(
+                        f"Query embeddings failing; semantic cache off for {self.breaker_cooldown:g}s at a time"
+                    )
+                self._open_until = time.monotonic() + self.breaker_cooldown
+
+    def _generation_of(self, corpus: str) -> Tuple[int, int]:
+        return self._generation, self._corpus_generations.get(corpus, 0)
+
+    def _remember(
+        self, corpus: str, vector: np.ndarray, params, results, now: float, generation: Tuple[int, int]
+    ) -> None:
+        with self._lock:
+            if self._generation_of(corpus) != generation:
+                # The corpus was flushed while these results were fetched
+                self.stale_fills += 1
+                return
+            self._index(corpus, len(vector)).add(vector, params, results, now + self.ttl)
+
+    def get_or_fetch(
+        self,
+        corpus: str,
+        query: str,
+        top_k: int,
+        threshold: float,
+        fetch: Callable[[], List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """Results of a similar enough recent query, or ``fetch()``'s (then remembered)."""
+        # max_entries=0 leaves no room to remember anything
+        if not self.enabled or not self.max_entries or not self._allow_embedding():
+            return fetch()
+
+        params = (top_k, threshold)
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation_of(corpus)
+        embedding: Future = self._embed_pool.submit(self.embed, [query])
+        try:
+            vector = embedding.result(timeout=self.embed_timeout)[0]
+        except FutureTimeoutError:
+            # Retrieval must not wait on a slow embedding call; if the vector
+            # still arrives, it indexes this query's results for next time
+            self.embed_timeouts += 1
+            self._embedding_done(False)
+            logger.warning(f"Query embedding took over {self.embed_timeout:g}s; skipping semantic cache")
+            results = fetch()
+
+            def index_late(done: Future) -> None:
+                if done.exception() is None:
+                    self._remember(corpus, done.result()[0], params, results, now, generation)
+
+            embedding.add_done_callback(index_late)
+            return results
+        except Exception:
+            # Retrieval must not fail because the embedding call did
+            self.embed_errors += 1
+            self._embedding_done(False)
+            logger.exception("Query embedding failed; skipping semantic cache")
+            return fetch()
+        self._embedding_done(True)
+
+        with self._lock:
+            similarity, cached = self._index(corpus, len(vector)).lookup(vector, params, now)
+            if cached is not None and similarity >= self.threshold:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        results = fetch()
+        self._remember(corpus, vector, params, results, now, generation)
+        return results
+
+    def flush(self, corpus: Optional[str] = None) -> int:
+        """Drop every corpus's index, or one; returns how many live entries went."""
+        now = time.monotonic()
+        with self._lock:
+            if corpus is None:
+                self._generation += 1
+            else:
+                self._corpus_generations[corpus] = self._corpus_generations.get(corpus, 0) + 1
+            corpora = list(self._indexes) if corpus is None else [corpus]
+            dropped = 0
+            for name in corpora:
+                index = self._indexes.pop(name, None)
+                if index is not None:
+                    dropped += index.size(now)
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        lookups = self.hits + self.misses
+        with self._lock:
+            indexes = list(self._indexes.items())
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "max_entries_per_corpus": self.max_entries,
+            "max_corpora": self.max_corpora,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "embed_errors": self.embed_errors,
+            "embed_timeouts": self.embed_timeouts,
+            "breaker_open": self._failures >= self.breaker_failures,
+            "breaker_skips": self.breaker_skips,
+            "stale_fills": self.stale_fills,
+            "corpora": {name: index.size(now) for name, index in indexes},
+            "index_bytes": sum(index.vectors.nbytes for _, index in indexes),
+        }
+
+
+semantic_cache = SemanticRagCache()
@@ -0,0 +1,28 @@
+import uuid
+
+# Session state key holding the session's key
+SESSION_KEY_STATE = "session_key"
+
+
+def session_key(context) -> str:
+    """
+    A stable id for the ADK session behind a tool or callback context.
+
+    ADK contexts don't expose the session id publicly, so a random key is
+    kept in session state (the public, session-scoped part of the context)
+    the first time one is needed.
+    """
+    key = context.state.get(SESSION_KEY_STATE)
+    if not key:
+        key = uuid.uuid4().hex
+        context.state[SESSION_KEY_STATE] = key
+    return key
+
+
+def remember_session_key(callback_context) -> None:
+    """
+    before_agent_callback for the root agent: sets the session key on the
+    first turn, so it is committed to the session (and visible to
+    endpoints that look the session up) before any tool runs.
+    """
+    session_key(callback_context)
@@ -0,0 +1,105 @@
+import asyncio
+import itertools
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+
+class SlideEventBroker:
+    """
+    In-process pub/sub for slide generation progress, per ADK session.
+
+    create_slide_images publishes an event as each slide's image is ready
+    (or fails); the SSE endpoint forwards them to the browser. The last
+    SLIDE_EVENT_HISTORY events of each session are kept so a client that
+    connects late, or reconnects with Last-Event-ID, doesn't miss any.
+    Subscribers that fall SLIDE_EVENT_QUEUE_SIZE events behind lose the
+    oldest ones rather than holding up generation.
+
+    Event ids are "<generation>-<sequence>", where the generation is stamped
+    when the broker starts, so ids from before a restart are never mistaken
+    for new ones. Events live in this process only: the app must run as a
+    single worker, or a client may subscribe on a worker that never sees
+    its session's slides.
+    """
+
+    def __init__(
+        self,
+        history: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+    ):
+        self.history = history or int(os.getenv("SLIDE_EVENT_HISTORY", 200))
+        self.queue_size = queue_size or int(os.getenv("SLIDE_EVENT_QUEUE_SIZE", 100))
+        self.max_sessions = max_sessions or int(os.getenv("SLIDE_EVENT_MAX_SESSIONS", 1000))
+
+        self.generation = format(time.time_ns(), "x")
+        self._sequence = itertools.count(1)
+        # Events are kept as (sequence, event)
+        self._history: "OrderedDict[str, Deque[Tuple[int, Dict[str, Any]]]]" = OrderedDict()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, session_id: str, event_type: str, **data: Any) -> Dict[str, Any]:
+        """Record an event for ``session_id`` and hand it to its subscribers."""
+        sequence = next(self._sequence)
+        event = {"id": f"{self.generation}-{sequence}", "type": event_type, "time": time.time(), **data}
+        history = self._history.get(session_id)
+        if history is None:
+            history = self._history[session_id] = deque(maxlen=self.history)
+            while len(self._history) > self.max_sessions:
+                self._history.popitem(last=False)
+        self._history.move_to_end(session_id)
+        history.append((sequence, event))
+        self.published += 1
+
+        for queue in self._subscribers.get(session_id, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait((sequence, event))
+        return event
+
+    def _sequence_after(self, event_id: Optional[str]) -> int:
+        """The sequence number of ``event_id``; 0 (replay everything kept) if it is from another generation."""
+        generation, _, sequence = (event_id or "").partition("-")
+        if generation != self.generation or not sequence.isdigit():
+            return 0
+        return int(sequence)
+
+    async def subscribe(self, session_id: str, after: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Events for ``session_id`` after the event id ``after``: recent history first, then live."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscribers = self._subscribers.setdefault(session_id, set())
+        subscribers.add(queue)
+        try:
+            last = self._sequence_after(after)
+            for sequence, event in list(self._history.get(session_id, ())):
+                if sequence > last:
+                    last = sequence
+                    yield event
+            while True:
+                sequence, event = await queue.get()
+                # Skip anything already replayed from history
+                if sequence > last:
+                    last = sequence
+                    yield event
+        finally:
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "generation": self.generation,
+            "published": self.published,
+            "dropped": self.dropped,
+            "sessions": len(self._history),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+
+slide_events = SlideEventBroker()
@@ -0,0 +1,227 @@
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TEAM_STRATEGIES = ("snake", "greedy")
+PEER_SIMILARITY_MODES = ("mix", "group")
+
+
+def _team_count(n_students: int, team_size: int) -> int:
+    return max(1, math.ceil(n_students / max(1, team_size)))
+
+
+def snake_draft(combined: np.ndarray, n_teams: int) -> np.ndarray:
+    """
+    Deal students to teams in a snake order (1..n, n..1, ...) by descending
+    combined score. Fully vectorized; team sizes differ by at most one.
+    """
+    order = np.argsort(-combined, kind="stable")
+    position = np.arange(len(combined))
+    draft_round, pick = np.divmod(position, n_teams)
+    team = np.where(draft_round % 2 == 0, pick, n_teams - 1 - pick)
+    assignment = np.empty(len(combined), dtype=np.int64)
+    assignment[order] = team
+    return assignment
+
+
+def greedy_balance(
+    combined: np.ndarray,
+    n_teams: int,
+    avoid: Optional[Dict[int, set]] = None,
+) -> np.ndarray:
+    """
+    Longest-processing-time balancing: strongest students first, each to the
+    non-full team with the lowest running total. With ``avoid`` (student ->
+    peers), a team already holding a peer is skipped when another team is open.
+    """
+    n = len(combined)
+    base, extra = divmod(n, n_teams)
+    capacity = [base + (1 if t < extra else 0) for t in range(n_teams)]
+    members: List[set] = [set() for _ in range(n_teams)]
+    heap = [(0.0, t) for t in range(n_teams)]
+    assignment = [0] * n
+
+    totals = combined.tolist()
+    for student in np.argsort(-combined, kind="stable").tolist():
+        peers = avoid.get(student, ()) if avoid else ()
+        skipped: List[Tuple[float, int]] = []
+        chosen = None
+        while heap:
+            total, team = heapq.heappop(heap)
+            if len(members[team]) >= capacity[team]:
+                continue  # full teams never come back
+            if peers and not members[team].isdisjoint(peers):
+                skipped.append((total, team))
+                continue
+            chosen = (total, team)
+            break
+        if chosen is None:
+            # Every open team already has a peer; take the weakest one anyway
+            skipped.sort()
+            chosen = skipped.pop(0)
+        total, team = chosen
+        assignment[student] = team
+        members[team].add(student)
+        if len(members[team]) < capacity[team]:
+            heapq.heappush(heap, (total + totals[student], team))
+        for item in skipped:
+            heapq.heappush(heap, item)
+    return np.asarray(assignment, dtype=np.int64)
+
+
+def group_similar(
+    combined: np.ndarray, n_teams: int, team_size: int, pairs: Iterable[Tuple[int, int]]
+) -> np.ndarray:
+    """
+    Keep SIMILAR_TO peers together: order students by connected component of
+    the similarity graph (strongest component first), then fill teams in turn.
+    """
+    n = len(combined)
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+    roots = np.array([find(i) for i in range(n)])
+
+    component_best = np.full(n, -np.inf)
+    np.maximum.at(component_best, roots, combined)
+    # Sort by component strength, then component id, then score within it
+    order = np.lexsort((-combined, roots, -component_best[roots]))
+    assignment = np.empty(n, dtype=np.int64)
+    assignment[order] = np.minimum(np.arange(n) // max(1, team_size), n_teams - 1)
+    return assignment
+
+
+def form_teams(
+    names: Sequence[str],
+    roll_nos: Sequence[Any],
+    scores: np.ndarray,
+    topics: Sequence[str],
+    team_size: int = 3,
+    strategy: str = "snake",
+    similar_pairs: Optional[Iterable[Tuple[Any, Any]]] = None,
+    peer_similarity: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Split a whole cohort into balanced study teams.
+
+    Args:
+        names: Student names, one per row of ``scores``.
+        roll_nos: Student roll numbers, one per row of ``scores``.
+        scores: students x topics matrix of normalized (0-1) scores.
+        topics: Topic names for the columns of ``scores``.
+        team_size: Target members per team.
+        strategy: "snake" (snake draft) or "greedy" (lowest running total).
+        similar_pairs: (roll_no, roll_no) pairs joined by SIMILAR_TO edges.
+        peer_similarity: "mix" to spread similar peers across teams, "group"
+            to keep them together, or None to ignore similarity.
+
+    Returns:
+        dict: Teams with members, per-team mean and spread, and a summary.
+    """
+    if strategy not in TEAM_STRATEGIES:
+        raise ValueError(f"Unknown team strategy '{strategy}'")
+    if peer_similarity not in (None,) + PEER_SIMILARITY_MODES:
+        raise ValueError(f"Unknown peer similarity mode '{peer_similarity}'")
+
+    scores = np.asarray(scores, dtype=np.float64)
+    team_size = max(1, int(team_size))
+    n = len(names)
+    n_teams = _team_count(n, team_size)
+    combined = scores.mean(axis=1)
+
+    index = {roll_no: i for i, roll_no in enumerate(roll_nos)}
+    pairs = [
+        (index[a], index[b])
+        for a, b in similar_pairs or []
+        if a in index and b in index and a != b
+    ]
+
+    if peer_similarity == "group" and pairs:
+        assignment = group_similar(combined, n_teams, team_size, pairs)
+        strategy = "group_similar"
+    elif peer_similarity == "mix" and pairs:
+        avoid: Dict[int, set] = {}
+        for a, b in pairs:
+            avoid.setdefault(a, set()).add(b)
+            avoid.setdefault(b, set()).add(a)
+        assignment = greedy_balance(combined, n_teams, avoid)
+        strategy = "greedy_mix_similar"
+    elif strategy == "greedy":
+        assignment = greedy_balance(combined, n_teams)
+    else:
+        assignment = snake_draft(combined, n_teams)
+
+    counts = np.bincount(assignment, minlength=n_teams)
+    means = np.bincount(assignment, weights=combined, minlength=n_teams) / np.maximum(
+        counts, 1
+    )
+    highs = np.full(n_teams, -np.inf)
+    lows = np.full(n_teams, np.inf)
+    np.maximum.at(highs, assignment, combined)
+    np.minimum.at(lows, assignment, combined)
+
+    # A member's strengths are topics where they beat the cohort average
+    cohort_means = scores.mean(axis=0)
+    strong = scores >= cohort_means
+
+    teams: List[Dict[str, Any]] = [
+        {
+            "name": f"Study Team {t + 1}",
+            "members": [],
+            "mean": round(float(means[t]) * 100, 1),
+            "spread": round(float(highs[t] - lows[t]) * 100, 1),
+        }
+        for t in range(n_teams)
+    ]
+    # Plain lists make building thousands of member dicts cheap; there are
+    # only 2**len(topics) strength patterns, so their labels are built once.
+    percent = np.round(scores * 100, 1).tolist()
+    patterns = np.packbits(strong, axis=1, bitorder="little")[:, 0].tolist() if len(
+        topics
+    ) <= 8 else None
+    labels: Dict[Any, Tuple[List[str], List[str]]] = {}
+    team_of = assignment.tolist()
+    for i in np.argsort(-combined, kind="stable").tolist():
+        key = patterns[i] if patterns is not None else tuple(strong[i])
+        if key not in labels:
+            labels[key] = (
+                [t for t, ok in zip(topics, strong[i]) if ok],
+                [t for t, ok in zip(topics, strong[i]) if not ok],
+            )
+        strengths, needs_help = labels[key]
+        teams[team_of[i]]["members"].append(
+            {
+                "name": names[i],
+                "roll_no": roll_nos[i],
+                "scores": dict(zip(topics, percent[i])),
+                "strengths": strengths,
+                "needs_help": needs_help,
+            }
+        )
+
+    return {
+        "type": "study_buddy",
+        "topics": list(topics),
+        "strategy": strategy,
+        "team_size": team_size,
+        "students": n,
+        "teams": teams,
+        "summary": {
+            "cohort_mean": round(float(combined.mean()) * 100, 1) if n else 0.0,
+            # How far apart the strongest and weakest team are on average
+            "team_mean_range": round(float(means.max() - means.min()) * 100, 1)
+            if n
+            else 0.0,
+        },
+    }
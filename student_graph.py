@@ -1,11 +1,27 @@
+"""
+Import student score sheets into the Neo4j analytics graph.
+
+    python student_graph.py scores/grade6/*.csv --grade 6
+    python student_graph.py scores/ --workers 8 --incremental
+"""
+
 from neo4j import GraphDatabase
 import pandas as pd
+import argparse
+import glob
 import os
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics.pairwise import cosine_similarity
+import json
+import threading
+import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
+from sahayak.shared_libs.score_sheet import ScoreSheet
+from sahayak.shared_libs.similarity import similar_pairs
+from sahayak.tools.graph_cache import bump_data_version
+from sahayak.tools.graph_schema import apply_schema
+
 load_dotenv()
 
 print(os.environ.get('NEO4J_URI'))
@@ -13,109 +29,521 @@ NEO4J_URI = os.environ.get("NEO4J_URI", "bolt://localhost:7687")  # Added defaul
 NEO4J_USERNAME = os.environ.get("NEO4J_USERNAME", "neo4j")        # Added default value
 NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "password")    # Added default value
 
-CSV_PATH = r"C:\Users\prajw\Downloads\student_scores_sample.csv"
+CSV_PATH = os.environ.get("STUDENT_CSV_PATH", r"C:\Users\prajw\Downloads\student_scores_sample.csv")
+# Grade of every topic on the sheet, unless it has a "Grade" column
+GRADE = os.environ.get("STUDENT_GRADE")
+# Rows per UNWIND transaction
+BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "5000"))
+# Sheet rows read into memory at a time
+CHUNK_ROWS = int(os.environ.get("IMPORT_CHUNK_ROWS", "50000"))
+# Files imported at once; files that share a student always run one after another
+WORKERS = int(os.environ.get("IMPORT_WORKERS", "4"))
+RETRIES = int(os.environ.get("IMPORT_RETRIES", "3"))
+# Only write what changed since the import recorded in each sheet's manifest
+INCREMENTAL = os.environ.get("IMPORT_INCREMENTAL", "false").lower() == "true"
 # Connect to Neo4j
 driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
 
-def import_graph(tx, df):
-    # First clean the data
-    df['Roll No'] = df['Roll No'].astype(int)
-    
-    for _, row in df.iterrows():
-        # Create Student node
-        tx.run("""
-            MERGE (s:Student {roll_no: $roll_no})
-            SET s.name = $name,
-                s.gender = $gender,
-                s.photo = $photo
-        """, {
-            'roll_no': row['Roll No'],
-            'name': row['Name'],
-            'gender': row['Gender'],
-            'photo': row.get('Photo', '')  # Use get() with default in case column is missing
-        })
-
-        for col in df.columns:
-            if 'out of' in str(col):  # Added str() in case column is not string
-                try:
-                    parts = col.split(" - ")
-                    test_type = parts[0].strip()
-                    topic_part = parts[-1].split(" (out of")
-                    topic = topic_part[0].strip()
-                    out_of = int(topic_part[-1].strip(") ").strip())
-                    score = int(row[col])
-                except (IndexError, ValueError) as e:
-                    print(f"Error processing column '{col}': {e}")
-                    continue
-
-                tx.run("""
-                    MERGE (t:Topic {name: $topic})
-                    MERGE (s:Student {roll_no: $roll_no})
-                    MERGE (s)-[r:SCORED_IN {test: $test_type}]->(t)
-                    SET r.score = $score, r.out_of = $out_of
-                """, {
-                    'roll_no': row['Roll No'],
-                    'topic': topic,
-                    'test_type': test_type,
-                    'score': score,
-                    'out_of': out_of
-                })
-
-def add_similarity_edges(tx, df):
-    # Ensure Roll No is clean
-    df['Roll No'] = df['Roll No'].astype(int)
-    
-    score_cols = [col for col in df.columns if 'out of' in str(col)]
-    
-    if not score_cols:
-        print("⚠️ No score columns found for similarity calculation")
-        return
-        
-    # Handle missing values - fill with 0 or mean as appropriate
-    score_data = df[score_cols].fillna(0).astype(float)
-    
-    scaler = MinMaxScaler()
-    try:
-        score_vectors = scaler.fit_transform(score_data)
-    except ValueError as e:
-        print(f"Error in scaling: {e}")
-        return
-        
-    similarity_matrix = cosine_similarity(score_vectors)
-
-    for i in range(len(df)):
-        for j in range(i+1, len(df)):
-            sim = similarity_matrix[i][j]
-            if sim > 0.85:
-                tx.run("""
-                    MATCH (a:Student {roll_no: $r1}), (b:Student {roll_no: $r2})
-                    MERGE (a)-[s:SIMILAR_TO]->(b)
-                    SET s.similarity = $sim
-                """, {
-                    'r1': df.loc[i, 'Roll No'],
-                    'r2': df.loc[j, 'Roll No'],
-                    'sim': float(sim)
-                })
-
-def main():
+# Roll numbers restart in every grade, so a student is its (grade, roll_no);
+# students of sheets without a grade have grade ""
+STUDENTS_QUERY = """
+    UNWIND $rows AS row
+    MERGE (s:Student {grade: row.grade, roll_no: row.roll_no})
+    SET s.name = row.name,
+        s.gender = row.gender,
+        s.photo = row.photo
+"""
+
+# Topics are few, so they are created up front and the score batches only MATCH
+TOPICS_QUERY = """
+    UNWIND $rows AS row
+    OPTIONAL MATCH (t:Topic {name: row.topic})
+    WHERE t.grade = row.grade OR (t.grade IS NULL AND row.grade IS NULL)
+    WITH row, t
+    WHERE t IS NULL
+    CREATE (:Topic {name: row.topic, grade: row.grade})
+"""
+
+SCORES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (s:Student {grade: coalesce(row.grade, ""), roll_no: row.roll_no})
+    MATCH (t:Topic {name: row.topic})
+    WHERE t.grade = row.grade OR (t.grade IS NULL AND row.grade IS NULL)
+    MERGE (s)-[r:SCORED_IN {test: row.test}]->(t)
+    SET r.score = row.score, r.out_of = row.out_of
+"""
+
+# A blank cell means no score, so a score cleared since the last import goes
+DELETE_SCORES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (s:Student {grade: coalesce(row.grade, ""), roll_no: row.roll_no})
+          -[r:SCORED_IN {test: row.test}]->(t:Topic {name: row.topic})
+    WHERE t.grade = row.grade OR (t.grade IS NULL AND row.grade IS NULL)
+    DELETE r
+"""
+
+
+# Topics are shared between files, and their OPTIONAL MATCH + CREATE isn't
+# safe to run twice at once
+_topics_lock = threading.Lock()
+
+
+def student_keys(frame):
+    """"<grade>/<roll no>" per row of a students or scores frame, as in ScoreSheet.student_keys()."""
+    return frame["grade"].fillna("").astype(str) + "/" + frame["roll_no"].astype(str)
+
+
+def _run_batch(tx, query, rows):
+    tx.run(query, {"rows": rows}).consume()
+
+
+def _read_batch(tx, query, rows):
+    return tx.run(query, {"rows": rows}).data()
+
+
+def _records(chunk):
+    # NaN isn't a valid Cypher parameter; missing values go in as null
+    return chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+
+
+def write_batches(session, query, frame, batch_size=BATCH_SIZE):
+    """Write a frame's rows with an UNWIND query, one transaction per chunk."""
+    for start in range(0, len(frame), batch_size):
+        session.execute_write(_run_batch, query, _records(frame.iloc[start:start + batch_size]))
+    return len(frame)
+
+
+def read_batches(session, query, frame, batch_size=BATCH_SIZE):
+    """Run a read-only UNWIND query over a frame's rows; returns every result row."""
+    results = []
+    for start in range(0, len(frame), batch_size):
+        results.extend(
+            session.execute_read(_read_batch, query, _records(frame.iloc[start:start + batch_size]))
+        )
+    return results
+
+
+def manifest_path(csv_path):
+    return csv_path + ".manifest.json"
+
+
+def load_manifest(path):
+    """The last import's hashes, or None before the first import."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def scale_manifest(matrix):
+    """The per-column range similarity scaling uses; if it moves, every score vector does."""
+    return {"low": matrix.min(axis=0).tolist(), "high": matrix.max(axis=0).tolist()}
+
+
+def sheet_manifest(sheet):
+    return {
+        "grade": sheet.grade,
+        "students": sheet.student_hashes(),
+        "scores": sheet.score_hashes(),
+        "columns": sheet.column_hashes(),
+    }
+
+
+def merge_manifests(manifest, part):
+    """Fold one chunk's manifest into the whole sheet's."""
+    if manifest is None:
+        return part
+    manifest["students"].update(part["students"])
+    manifest["scores"].update(part["scores"])
+    for column, value in part["columns"].items():
+        # Column hashes are sums of per-row hashes, so chunks add up (mod 2**64)
+        total = int(manifest["columns"].get(column, 0)) + int(value)
+        manifest["columns"][column] = str(total % 2**64)
+    return manifest
+
+
+def save_manifest(path, manifest):
+    with open(path, "w") as f:
+        json.dump(manifest, f)
+
+
+def _changed(current, previous):
+    return {key for key, value in current.items() if previous.get(key) != value}
+
+
+def diff_manifest(current, previous):
+    """
+    Student keys and columns that differ from the last import, and whether
+    the similarity scaling moved. With no usable previous manifest
+    everything counts as changed.
+    """
+    if previous is None or previous.get("grade") != current["grade"]:
+        previous = {"students": {}, "scores": {}, "columns": {}}
+    return {
+        "students": _changed(current["students"], previous["students"]),
+        "score_rows": _changed(current["scores"], previous["scores"]),
+        "columns": _changed(current["columns"], previous["columns"]),
+        "rescaled": current.get("scale") != previous.get("scale"),
+    }
+
+
+def _report(label, name, rows, started):
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed else float("inf")
+    print(f"📥 {label}{name}: {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+
+def import_graph(session, sheet, batch_size=BATCH_SIZE, changes=None, label=""):
+    """
+    Write a ScoreSheet's students, topics and scores in UNWIND batches, and
+    delete the scores of blank cells. With ``changes`` from diff_manifest
+    only changed students and cells are touched. Returns the number of score
+    rows written.
+    """
+    students, scores, blanks = sheet.students(), sheet.long_scores(), sheet.blank_scores()
+    if changes is not None:
+        students = students[student_keys(students).isin(changes["students"])]
+        # A cell changed only if both its row and its column did; a new
+        # column or student changes every row or column it touches
+        columns = [(col.topic, col.test) for col in sheet.columns if col.column in changes["columns"]]
+
+        def changed_cells(cells):
+            return cells[
+                student_keys(cells).isin(changes["score_rows"])
+                & pd.MultiIndex.from_frame(cells[["topic", "test"]]).isin(columns)
+            ]
+
+        scores, blanks = changed_cells(scores), changed_cells(blanks)
+
+    started = time.perf_counter()
+    _report(label, "students", write_batches(session, STUDENTS_QUERY, students, batch_size), started)
+    started = time.perf_counter()
+    topics = scores[["topic", "grade"]].drop_duplicates()
+    with _topics_lock:
+        written = write_batches(session, TOPICS_QUERY, topics, batch_size)
+    _report(label, "topics", written, started)
+    started = time.perf_counter()
+    written = write_batches(session, SCORES_QUERY, scores, batch_size)
+    _report(label, "scores", written, started)
+    started = time.perf_counter()
+    _report(label, "blank cells", write_batches(session, DELETE_SCORES_QUERY, blanks, batch_size), started)
+    return written
+
+# Each student's SIMILAR_TO edges point at the peers it picked, so a student's
+# picks can be replaced without touching the edges other students own;
+# readers treat an edge in either direction as a similar pair. Picks are
+# computed from one sheet's scores and tagged with that sheet as their
+# source, so sheets covering the same students (one per subject, say) each
+# keep their own picks whatever order they are imported in. Edges without
+# a source predate the tag and are replaced by the next import.
+SIMILAR_QUERY = """
+    UNWIND $rows AS row
+    MATCH (a:Student {grade: row.a_grade, roll_no: row.a})
+    MATCH (b:Student {grade: row.b_grade, roll_no: row.b})
+    MERGE (a)-[s:SIMILAR_TO {source: row.source}]->(b)
+    SET s.similarity = row.similarity
+"""
+
+DELETE_SIMILAR_QUERY = """
+    UNWIND $rows AS row
+    MATCH (:Student {grade: row.grade, roll_no: row.roll_no})-[e:SIMILAR_TO]->()
+    WHERE e.source = row.source OR e.source IS NULL
+    DELETE e
+"""
+
+PICKED_BY_QUERY = """
+    UNWIND $rows AS row
+    MATCH (peer:Student)-[e:SIMILAR_TO]->(:Student {grade: row.grade, roll_no: row.roll_no})
+    WHERE e.source = row.source OR e.source IS NULL
+    RETURN DISTINCT peer.grade AS grade, peer.roll_no AS roll_no
+"""
+
+
+def sheet_source(path):
+    """The source tag of the SIMILAR_TO edges computed from a sheet."""
+    return os.path.abspath(path)
+
+
+def affected_rows(session, students, matrix, changed_rows, source, batch_size=BATCH_SIZE):
+    """
+    Rows whose picks from ``source`` can differ once ``changed_rows`` have
+    new score vectors: the changed students, peers that picked one of them
+    before (from the graph), and peers similar enough to one of them to pick
+    it now. Any other student's picks can't have changed, as long as the
+    scaling hasn't.
+    """
+    affected = set(changed_rows.tolist())
+    index = {key: row for row, key in enumerate(student_keys(students))}
+    targets = students.iloc[changed_rows].assign(source=source)
+    for peer in read_batches(session, PICKED_BY_QUERY, targets, batch_size):
+        row = index.get(f"{peer['grade']}/{peer['roll_no']}")
+        if row is not None:
+            affected.add(row)
+    i, j, _ = similar_pairs(matrix, max_neighbours=0, rows=changed_rows)
+    affected.update(i.tolist())
+    affected.update(j.tolist())
+    return np.array(sorted(affected), dtype=np.int64)
+
+
+def add_similarity_edges(
+    session, students, matrix, source, batch_size=BATCH_SIZE, changed=None, label=""
+):
+    """
+    Link students (a frame of grade and roll_no, one row per row of
+    ``matrix``) to the peers they pick by score similarity, replacing their
+    earlier picks from ``source``, in UNWIND batches. With ``changed``
+    student keys only the picks of affected_rows() are recomputed, which
+    gives the same edges as linking everyone. Returns the number of picks
+    written.
+    """
+    if not matrix.shape[1]:
+        print(f"⚠️ {label}No score columns found for similarity calculation")
+        return 0
+
+    started = time.perf_counter()
+    rows = None
+    if changed is not None:
+        changed_rows = np.flatnonzero(student_keys(students).isin(changed).to_numpy())
+        if not len(changed_rows):
+            print(f"🔗 {label}similarity: no score vectors changed")
+            return 0
+        rows = affected_rows(session, students, matrix, changed_rows, source, batch_size)
+
+    i, j, sim = similar_pairs(matrix, rows=rows, directed=True)
+    grades, roll_nos = students["grade"].to_numpy(), students["roll_no"].to_numpy()
+    pairs = pd.DataFrame(
+        {
+            "a_grade": grades[i],
+            "a": roll_nos[i],
+            "b_grade": grades[j],
+            "b": roll_nos[j],
+            "similarity": sim,
+            "source": source,
+        }
+    )
+    computed = time.perf_counter() - started
+    # Picks are replaced wholesale, so a peer that is no longer similar loses its edge
+    owners = students if rows is None else students.iloc[rows]
+    write_batches(session, DELETE_SIMILAR_QUERY, owners.assign(source=source), batch_size)
+    write_batches(session, SIMILAR_QUERY, pairs, batch_size)
+    linked = len(students) if rows is None else len(rows)
+    print(
+        f"🔗 {label}similarity: {len(pairs)} picks for {linked} students computed in "
+        f"{computed:.2f}s, written in {time.perf_counter() - started - computed:.2f}s"
+    )
+    return len(pairs)
+
+
+def read_sheets(path, grade, chunk_rows=CHUNK_ROWS):
+    """A CSV as ScoreSheets of at most ``chunk_rows`` rows each."""
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        # Validates each chunk and parses its header once
+        yield ScoreSheet(chunk, grade=grade)
+
+
+def scan_file(path, grade, chunk_rows=CHUNK_ROWS):
+    """
+    One pass over a CSV for its manifest, students (grade, roll_no) and score
+    matrix. Only those are kept, so memory grows with the cohort, not with
+    the file.
+    """
+    manifest, students, matrices = None, [], []
+    for sheet in read_sheets(path, grade, chunk_rows):
+        manifest = merge_manifests(manifest, sheet_manifest(sheet))
+        students.append(
+            pd.DataFrame({"grade": sheet.student_grades(), "roll_no": sheet.df["Roll No"]})
+        )
+        matrices.append(sheet.score_matrix())
+    if manifest is None:
+        raise ValueError("CSV file is empty")
+    matrix = np.vstack(matrices)
+    manifest["scale"] = scale_manifest(matrix)
+    return manifest, pd.concat(students, ignore_index=True), matrix
+
+
+def import_file(path, grade, batch_size=BATCH_SIZE, chunk_rows=CHUNK_ROWS, incremental=INCREMENTAL):
+    """Import one CSV, chunk by chunk, and return what was written."""
+    label = f"[{os.path.basename(path)}] "
+    started = time.perf_counter()
+    manifest, students, matrix = scan_file(path, grade, chunk_rows)
+
+    changes = None
+    if incremental:
+        previous = load_manifest(manifest_path(path))
+        changes = diff_manifest(manifest, previous)
+        print(
+            f"🔍 {label}{len(changes['students'])} students, {len(changes['score_rows'])} "
+            f"score rows and {len(changes['columns'])} of {matrix.shape[1]} columns "
+            f"changed (scanned in {time.perf_counter() - started:.2f}s)"
+        )
+        if changes["rescaled"] and previous is not None:
+            print(f"📏 {label}a column's range changed, so every student is re-linked")
+
+    scores = 0
+    with driver.session() as session:
+        for sheet in read_sheets(path, grade, chunk_rows):
+            scores += import_graph(session, sheet, batch_size, changes, label)
+        pairs = add_similarity_edges(
+            session, students, matrix, sheet_source(path), batch_size,
+            changed=changes["score_rows"] if changes and not changes["rescaled"] else None,
+            label=label,
+        )
+    save_manifest(manifest_path(path), manifest)
+    return {
+        "students": len(students),
+        "scores": scores,
+        "pairs": pairs,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def expand_paths(paths):
+    """CSV files named directly, by glob, or inside a directory."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path)))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(files))
+
+
+def file_student_keys(path, grade, chunk_rows=CHUNK_ROWS):
+    """The student keys ("<grade>/<roll no>") on a CSV, reading only its Roll No and Grade columns."""
+    keys = set()
+    for chunk in pd.read_csv(path, usecols=lambda c: c in ("Roll No", "Grade"), chunksize=chunk_rows):
+        keys.update(ScoreSheet(chunk, grade=grade).student_keys())
+    return keys
+
+
+def partition_files(keys_by_file):
+    """
+    Group files that share any student key, so every Student node, its
+    scores and its SIMILAR_TO edges are written by one group only. Files
+    without a student in common (e.g. different grades, or sections of one
+    grade with their own roll numbers) land in separate groups.
+    """
+    parent = {path: path for path in keys_by_file}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    owner = {}
+    for path, keys in keys_by_file.items():
+        for key in keys:
+            parent[find(path)] = find(owner.setdefault(key, path))
+
+    groups = {}
+    for path in keys_by_file:
+        groups.setdefault(find(path), []).append(path)
+    return list(groups.values())
+
+
+def import_partition(paths, args, report, lock):
+    """
+    Import one group of files that share students one after another; each
+    file is retried with backoff. Groups running at once only share Topic
+    nodes, whose creation is serialized by _topics_lock; a deadlock on a
+    topic's relationships is transient and retried by execute_write.
+    """
+    for path in paths:
+        for attempt in range(1, args.retries + 2):
+            try:
+                result = import_file(
+                    path, args.grade, args.batch_size, args.chunk_rows, args.incremental
+                )
+                result.update(status="ok", attempts=attempt)
+                break
+            except Exception as e:
+                if attempt > args.retries:
+                    result = {"status": "failed", "attempts": attempt, "error": str(e)}
+                    break
+                delay = args.backoff * 2 ** (attempt - 1)
+                print(f"⚠️ [{os.path.basename(path)}] attempt {attempt} failed: {e}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+        with lock:
+            report[path] = result
+
+
+def print_report(report):
+    print(f"\n{'file':<40}{'status':>8}{'students':>10}{'scores':>10}{'pairs':>10}{'secs':>8}")
+    for path, result in report.items():
+        name = os.path.basename(path)
+        if result["status"] == "ok":
+            print(
+                f"{name:<40}{'ok':>8}{result['students']:>10}{result['scores']:>10}"
+                f"{result['pairs']:>10}{result['seconds']:>8.1f}"
+            )
+        else:
+            print(f"{name:<40}{'failed':>8}  {result['error']} (after {result['attempts']} attempts)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=[CSV_PATH], help="CSV files, globs or directories")
+    parser.add_argument("--grade", default=GRADE, help="grade of sheets without a Grade column")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per UNWIND transaction")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="sheet rows read at a time")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="file groups imported at once")
+    parser.add_argument("--retries", type=int, default=RETRIES, help="retries per failed file")
+    parser.add_argument("--backoff", type=float, default=1.0, help="first retry delay in seconds")
+    parser.add_argument("--incremental", action="store_true", default=INCREMENTAL,
+                        help="only write what changed since each file's last import")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report, lock = {}, threading.Lock()
     try:
-        df = pd.read_csv(CSV_PATH)
-        
-        # Basic data validation
-        if df.empty:
-            raise ValueError("CSV file is empty")
-        if 'Roll No' not in df.columns:
-            raise ValueError("CSV must contain 'Roll No' column")
-            
+        files = expand_paths(args.paths)
+        if not files:
+            print("❌ No CSV files found")
+            return 1
+
+        keys_by_file = {}
+        for path in files:
+            try:
+                keys_by_file[path] = file_student_keys(path, args.grade, args.chunk_rows)
+            except Exception as e:
+                report[path] = {"status": "failed", "attempts": 0, "error": str(e)}
+        partitions = partition_files(keys_by_file)
+        print(f"🧩 {len(keys_by_file)} files in {len(partitions)} groups without shared students")
+
         with driver.session() as session:
-            session.write_transaction(import_graph, df)
-            session.write_transaction(add_similarity_edges, df)
-        print("✅ Graph import complete.")
-        
+            apply_schema(session)
+
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = [
+                pool.submit(import_partition, paths, args, report, lock)
+                for paths in partitions
+            ]
+            for future in as_completed(futures):
+                future.result()
+
+        imported = sum(1 for result in report.values() if result["status"] == "ok")
+        if imported:
+            with driver.session() as session:
+                # Invalidate cached analytics in every running app instance
+                version = session.execute_write(bump_data_version)
+            print(f"🔖 Score data version is now {version}")
+
+        print_report(report)
+        failed = len(report) - imported
+        print(
+            f"{'✅' if not failed else '⚠️'} Imported {imported}/{len(report)} files "
+            f"in {time.perf_counter() - started:.2f}s."
+        )
+        return 1 if failed else 0
+
     except Exception as e:
         print(f"❌ Error: {e}")
+        return 1
     finally:
         driver.close()  # Always close the driver
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
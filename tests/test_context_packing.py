@@ -0,0 +1,97 @@
+import asyncio
+import sys
+import threading
+
+import pytest
+
+from sahayak.tools import context_packing
+from sahayak.tools.context_packing import count_tokens, pack_contexts
+
+QUERY = "How does light travel through water?"
+FILLER = "Plants need sunlight, water and air to grow well in the school garden."
+
+
+@pytest.fixture(autouse=True)
+def length_estimate(monkeypatch):
+    # Count ~4 characters per token, so budgets don't depend on tiktoken's download
+    monkeypatch.setattr(context_packing, "_encoder", None)
+    monkeypatch.setattr(context_packing, "_encoder_failed", True)
+
+
+def record(text: str, score: float, name: str = "Science"):
+    return {"source_uri": f"gs://textbooks/{name}.pdf", "source_name": name, "text": text, "score": score}
+
+
+def distinct(i: int) -> str:
+    return f"Chapter {i} explains topic number {i} with example {i * 7} and exercise {i * 13} for the class."
+
+
+def test_packing_respects_the_budget():
+    results = [record(distinct(i) * 3, 0.1 + i / 100) for i in range(20)]
+    packed, stats = pack_contexts(QUERY, results, budget=200, chunk_tokens=100)
+    assert sum(count_tokens(r["text"]) for r in packed) <= 200
+    assert stats["tokens_after"] <= 200
+    assert stats["over_budget_dropped"] > 0
+    # Best (lowest distance) first
+    assert [r["score"] for r in packed] == sorted(r["score"] for r in packed)
+
+
+def test_near_duplicates_are_dropped():
+    text = "Light travels in straight lines and bends when it passes from air into water."
+    results = [record(text, 0.1), record(text.upper() + " ", 0.2), record(distinct(1), 0.3)]
+    packed, stats = pack_contexts(QUERY, results, budget=1000)
+    assert [r["score"] for r in packed] == [0.1, 0.3]
+    assert stats["duplicates_dropped"] == 1
+
+
+def test_chunks_contained_in_kept_text_are_dropped():
+    first = "Light travels in straight lines. " + distinct(1)
+    second = distinct(2)
+    # Every shingle of the third chunk was already kept, split across the first two
+    results = [record(first, 0.1), record(second, 0.2), record(distinct(1) + " " + distinct(2), 0.3)]
+    packed, stats = pack_contexts(QUERY, results, budget=1000)
+    assert [r["score"] for r in packed] == [0.1, 0.2]
+    assert stats["duplicates_dropped"] == 1
+
+
+def test_long_chunks_keep_their_most_relevant_sentences():
+    relevant = "Light bends as it travels from air into water."
+    text = " ".join([FILLER] * 4 + [relevant] + [FILLER.replace("garden", "yard")] * 4)
+    packed, stats = pack_contexts(QUERY, [record(text, 0.1)], budget=1000, chunk_tokens=40)
+    assert stats["trimmed"] == 1
+    assert relevant in packed[0]["text"]
+    assert count_tokens(packed[0]["text"]) <= 40
+    # Kept sentences stay in their original order
+    assert packed[0]["text"].index(FILLER) < packed[0]["text"].index(relevant)
+
+
+def test_stats_account_for_the_tokens_saved():
+    text = "Light travels in straight lines and bends when it passes from air into water."
+    results = [record(text, 0.1), record(text, 0.2), record(distinct(3) * 10, 0.3)]
+    packed, stats = pack_contexts(QUERY, results, budget=1000, chunk_tokens=50)
+    assert stats["tokens_before"] == sum(count_tokens(r["text"]) for r in results)
+    assert stats["tokens_after"] == sum(count_tokens(r["text"]) for r in packed)
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"] > 0
+
+
+def test_tokens_are_estimated_when_tiktoken_is_unavailable(monkeypatch):
+    monkeypatch.setattr(context_packing, "_encoder_failed", False)
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    assert count_tokens("x" * 40) == 10
+    assert context_packing._encoder_failed
+    # The failure is remembered rather than retried on every call
+    monkeypatch.delitem(sys.modules, "tiktoken")
+    assert context_packing.load_encoder() is None
+
+
+def test_encoder_loads_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(context_packing, "_encoder_failed", False)
+    threads = []
+    monkeypatch.setattr(context_packing, "load_encoder", lambda: threads.append(threading.get_ident()))
+
+    async def run():
+        await context_packing.load_encoder_async()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert threads and threads[0] != loop_thread
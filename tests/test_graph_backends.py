@@ -0,0 +1,91 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from benchmarks.graph_backends import CHECKS, GRADE, TOPICS, SnapshotReads
+from benchmarks.synthetic import synthetic_scores, to_score_sheet
+from sahayak.shared_libs.score_sheet import ScoreSheet
+from sahayak.shared_libs.similarity import similar_pairs
+from sahayak.tools.graph import GraphVisualizer
+from sahayak.tools.graph_backends import EmbeddedBackend, GraphBackend
+from sahayak.tools.score_snapshot import ScoreSnapshot
+
+
+@pytest.fixture(scope="module")
+def sheet_csv(tmp_path_factory):
+    frame = synthetic_scores(120, topics=TOPICS, tests=["Unit Test 1", "Unit Test 2"], grade=GRADE)
+    path = tmp_path_factory.mktemp("sheets") / "grade6.csv"
+    to_score_sheet(frame).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope="module")
+def embedded(sheet_csv):
+    backend = EmbeddedBackend.from_csv(str(sheet_csv), grade=GRADE)
+    yield backend
+    asyncio.run(backend.close())
+
+
+@pytest.mark.parametrize("read", list(CHECKS))
+def test_snapshot_matches_embedded_backend(embedded, read):
+    call, same = CHECKS[read]
+
+    async def both():
+        snapshot = ScoreSnapshot.from_frame(await embedded.snapshot_frame())
+        return await call(embedded), await call(SnapshotReads(snapshot))
+
+    expected, actual = asyncio.run(both())
+    assert same(expected, actual)
+
+
+def test_similar_pairs_match_the_importer_rules(embedded, sheet_csv):
+    sheet = ScoreSheet(pd.read_csv(sheet_csv), grade=GRADE)
+    roll_nos = sheet.df["Roll No"].to_numpy()
+    i, j, _ = similar_pairs(sheet.score_matrix())
+    expected = {frozenset((roll_nos[a], roll_nos[b])) for a, b in zip(i, j)}
+
+    actual = asyncio.run(embedded.similar_pairs(roll_nos.tolist(), GRADE))
+    assert expected and {frozenset(pair) for pair in actual} == expected
+
+
+def test_backends_must_implement_every_read():
+    class PartialBackend(GraphBackend):
+        async def data_version(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        PartialBackend()
+
+
+def test_bad_backend_setting_fails_the_query_not_the_import(monkeypatch):
+    monkeypatch.setenv("GRAPH_BACKEND", "bogus")
+    tool = GraphVisualizer()
+    content = tool.run("find_highest", topic_a="Light", grade=GRADE)
+    assert "Unknown GRAPH_BACKEND" in content.parts[0].text
+
+
+def test_null_scores_count_like_count_r(sheet_csv):
+    backend = EmbeddedBackend.from_csv(str(sheet_csv), grade=GRADE)
+    topic = TOPICS[0]
+
+    async def both(read):
+        snapshot = ScoreSnapshot.from_frame(await backend.snapshot_frame())
+        return await read(backend), await read(SnapshotReads(snapshot))
+
+    try:
+        (before,) = asyncio.run(backend.topic_statistics([topic], [GRADE]))
+        roll_no = backend.conn.execute("SELECT roll_no FROM scores WHERE topic = ?", (topic,)).fetchone()[0]
+        # A relationship whose score was never set, e.g. from an older import
+        backend.conn.execute(
+            "INSERT INTO scores VALUES (?, ?, ?, 'Unit Test 3', NULL, 20)", (roll_no, topic, GRADE)
+        )
+        for read in ("topic_statistics", "topic_statistics_all_grades", "team_scores"):
+            call, same = CHECKS[read]
+            expected, actual = asyncio.run(both(call))
+            assert same(expected, actual), read
+        (after,) = asyncio.run(backend.topic_statistics([topic], [GRADE]))
+        assert after["total_scores"] == before["total_scores"] + 1
+        assert after["average_score"] == before["average_score"]
+    finally:
+        asyncio.run(backend.close())
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from benchmarks.graph_concurrency import FakeBackend
+from sahayak.tools import graph
+from sahayak.tools.graph import GraphVisualizer
+from sahayak.tools.graph_cache import GraphResultCache
+
+KEY = GraphResultCache.make_key("find_highest", ["light"], ["6"], 1)
+
+
+def test_miss_then_hit():
+    cache = GraphResultCache(maxsize=16, ttl=60)
+    assert cache.get(KEY) is None
+    cache.set(KEY, "answer")
+    # Topic case and spacing normalise to the same key
+    assert cache.get(GraphResultCache.make_key("find_highest", [" Light "], [6], 1)) == "answer"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_other_grades_and_k_miss():
+    cache = GraphResultCache(maxsize=16, ttl=60)
+    cache.set(KEY, "answer")
+    assert cache.get(GraphResultCache.make_key("find_highest", ["light"], ["7"], 1)) is None
+    assert cache.get(GraphResultCache.make_key("find_top_students", ["light"], ["6"], 5)) is None
+
+
+def test_data_version_bump_invalidates():
+    cache = GraphResultCache(maxsize=16, ttl=60)
+    cache.set_version(1)
+    cache.set(KEY, "answer")
+    cache.set_version(1)
+    assert cache.get(KEY) == "answer"
+    cache.set_version(2)
+    assert cache.get(KEY) is None
+    assert cache.invalidations == 1 and cache.stats()["data_version"] == 2
+
+
+def test_explicit_zero_settings_are_kept():
+    cache = GraphResultCache(maxsize=0, ttl=0, version_poll_seconds=0)
+    assert (cache.maxsize, cache.ttl) == (0, 0)
+    cache.set(KEY, "answer")
+    assert cache.get(KEY) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = GraphResultCache(maxsize=4, ttl=60)
+    cache.enabled = False
+    cache.set(KEY, "answer")
+    assert cache.get(KEY) is None and cache.stats()["size"] == 0
+
+
+class CountingBackend(FakeBackend):
+    def __init__(self):
+        super().__init__(iter(lambda: 0, None))
+        self.version = 1
+        self.calls = []
+
+    async def data_version(self):
+        return self.version
+
+    async def top_students(self, topic, grade, k):
+        self.calls.append(("top_students", topic, grade, k))
+        return await super().top_students(topic, grade, k)
+
+    async def team_scores(self, topics, grade):
+        self.calls.append(("team_scores", tuple(topics), grade))
+        return [{"topic": topic, "topic_exists": True, "students": []} for topic in topics]
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = GraphResultCache(maxsize=16, ttl=60, version_poll_seconds=0)
+    monkeypatch.setattr(graph, "graph_cache", cache)
+    return cache
+
+
+def ask(tool: GraphVisualizer, **args):
+    return asyncio.run(tool.run_async(args=args, tool_context=None))["result"]
+
+
+def test_repeated_question_skips_the_backend(cache):
+    backend = CountingBackend()
+    tool = GraphVisualizer(backend=backend)
+    first = ask(tool, user_intent="find_highest", topic_a="light", grade="6")
+    # Topic case and spacing normalise to the same key
+    second = ask(tool, user_intent="find_highest", topic_a=" Light ", grade="6")
+    assert first == second and "Tanya Patel" in first
+    assert len(backend.calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_top_1_and_top_5_are_cached_apart(cache):
+    backend = CountingBackend()
+    tool = GraphVisualizer(backend=backend)
+    ask(tool, user_intent="find_highest", topic_a="light", grade="6")
+    ask(tool, user_intent="find_highest", topic_a="light", grade="7")
+    # Same topic, but a top-5 list isn't the top-1 answer
+    ask(tool, user_intent="find_top_students", topic_a="light", grade="6")
+    assert [call[3] for call in backend.calls] == [1, 1, 5]
+    assert cache.hits == 0
+
+
+def test_backend_data_version_bump_invalidates(cache):
+    backend = CountingBackend()
+    tool = GraphVisualizer(backend=backend)
+    ask(tool, user_intent="find_highest", topic_a="light", grade="6")
+    backend.version = 2
+    ask(tool, user_intent="find_highest", topic_a="light", grade="6")
+    ask(tool, user_intent="find_highest", topic_a="light", grade="6")
+    assert len(backend.calls) == 2
+    assert cache.invalidations == 1 and cache.stats()["data_version"] == 2
+
+
+def test_team_formation_is_never_cached(cache):
+    backend = CountingBackend()
+    tool = GraphVisualizer(backend=backend)
+    for _ in range(2):
+        ask(tool, user_intent="form_teams", topic_a="light", grade="6")
+    assert [call[0] for call in backend.calls] == ["team_scores", "team_scores"]
+    assert cache.stats()["size"] == 0 and cache.hits == cache.misses == 0
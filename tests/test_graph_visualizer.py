@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.graph_concurrency import FakeBackend
+from sahayak.tools.graph import GraphVisualizer
+from sahayak.tools.graph_cache import graph_cache
+
+ARGS = {"user_intent": "find_highest", "topic_a": "light", "grade": "6"}
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    # Every call must reach the backend
+    monkeypatch.setattr(graph_cache, "enabled", False)
+
+
+def test_run_async_calls_overlap():
+    latencies = [0.2] * 10
+    tool = GraphVisualizer(backend=FakeBackend(latencies))
+
+    async def run_all():
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(tool.run_async(args=ARGS, tool_context=None) for _ in latencies)
+        )
+        return time.perf_counter() - started, results
+
+    wall, results = asyncio.run(run_all())
+    assert wall < sum(latencies) / 2
+    assert all("Tanya Patel" in result["result"] for result in results)
+
+
+def test_run_works_without_an_event_loop():
+    tool = GraphVisualizer(backend=FakeBackend([0]))
+    content = tool.run("find_highest", topic_a="light", grade="6")
+    assert "Tanya Patel" in content.parts[0].text
+
+
+def test_run_refuses_a_running_event_loop():
+    tool = GraphVisualizer(backend=FakeBackend([0]))
+
+    async def call_sync_shim():
+        tool.run("find_highest", topic_a="light", grade="6")
+
+    with pytest.raises(RuntimeError, match="await run_async"):
+        asyncio.run(call_sync_shim())
@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+from sahayak.tools.image_cache import ImageCache
+
+MODEL = "imagen"
+
+
+class Generate:
+    def __init__(self, data=b"png", delay: float = 0.05):
+        self.calls = 0
+        self.data = data
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.data
+
+
+def files(cache: ImageCache):
+    return sorted(name for _, _, names in os.walk(cache.directory) for name in names)
+
+
+def test_concurrent_requests_share_one_generation(tmp_path):
+    cache = ImageCache(directory=str(tmp_path))
+    generate = Generate()
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_generate(MODEL, "a volcano", generate) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert generate.calls == 1
+    assert [data for data, _ in results] == [b"png"] * 5
+    assert sorted(cached for _, cached in results) == [False] + [True] * 4
+    assert cache.misses == 1 and cache.coalesced == 4
+
+
+def test_waiter_takes_over_when_the_leader_is_cancelled(tmp_path):
+    cache = ImageCache(directory=str(tmp_path))
+    generate = Generate()
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_generate(MODEL, "a volcano", generate))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.get_or_generate(MODEL, "a volcano", generate))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == (b"png", False)
+    assert generate.calls == 2 and cache.stats()["in_flight"] == 0
+
+
+def test_empty_shared_result_is_not_reported_as_cached(tmp_path):
+    cache = ImageCache(directory=str(tmp_path))
+    generate = Generate(data=None)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_generate(MODEL, "a volcano", generate) for _ in range(3)))
+
+    assert asyncio.run(run()) == [(None, False)] * 3
+    assert generate.calls == 1 and cache.coalesced == 0 and cache.hits == 0
+    assert files(cache) == []
+
+
+def test_least_recently_used_images_are_evicted_over_the_quota(tmp_path):
+    cache = ImageCache(directory=str(tmp_path), max_bytes=250)
+
+    async def run():
+        for name in ("first", "second"):
+            await cache.get_or_generate(MODEL, name, Generate(data=b"x" * 100, delay=0))
+        # Reading "first" makes "second" the oldest
+        await cache.get_or_generate(MODEL, "first", Generate())
+        await cache.get_or_generate(MODEL, "third", Generate(data=b"x" * 100, delay=0))
+
+    asyncio.run(run())
+    expected = sorted(f"{cache.make_key(MODEL, name)}.png" for name in ("first", "third"))
+    assert files(cache) == expected
+    assert cache.evictions == 1 and cache.stats()["bytes"] == 200
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    asyncio.run(ImageCache(directory=str(tmp_path)).get_or_generate(MODEL, "a volcano", Generate()))
+    generate = Generate()
+    assert asyncio.run(ImageCache(directory=str(tmp_path)).get_or_generate(MODEL, "A  Volcano", generate)) == (b"png", True)
+    assert generate.calls == 0
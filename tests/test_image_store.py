@@ -0,0 +1,110 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.slide_images import PNG, FakeModels, FakeToolContext
+from sahayak.tools import image, image_variants
+from sahayak.tools.image_cache import image_cache
+from sahayak.tools.image_store import ImageStore, image_filename, new_deck_id
+
+
+def mirrored_files(directory):
+    return {
+        os.path.relpath(os.path.join(root, name), directory): os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+    }
+
+
+def write_aged(store: ImageStore, session_id: str, filename: str, size: int, age: int):
+    path = store.write_mirror(session_id, filename, b"x" * size)
+    os.utime(path, (1_000_000 - age, 1_000_000 - age))
+
+
+def test_janitor_deletes_the_oldest_images_down_to_the_quota(tmp_path):
+    store = ImageStore(mirror_dir=str(tmp_path), quota_bytes=250)
+    write_aged(store, "alice", "old.png", 100, age=30)
+    write_aged(store, "bob", "older.png", 100, age=40)
+    write_aged(store, "bob", "new.png", 100, age=10)
+    write_aged(store, "carol", "newest.png", 100, age=0)
+
+    assert store.enforce_quota() == (2, 200)
+    assert mirrored_files(str(tmp_path)) == {os.path.join("bob", "new.png"): 100, os.path.join("carol", "newest.png"): 100}
+    # A session directory goes once its last image does
+    assert not os.path.exists(tmp_path / "alice")
+    assert store.enforce_quota() == (0, 0)
+
+
+def test_janitor_ignores_unfinished_writes(tmp_path):
+    store = ImageStore(mirror_dir=str(tmp_path), quota_bytes=0)
+    os.makedirs(tmp_path / "alice")
+    (tmp_path / "alice" / "slide.png.abc.tmp").write_bytes(b"x" * 100)
+    assert store.enforce_quota() == (0, 0)
+
+
+def test_saving_starts_the_janitor(tmp_path):
+    store = ImageStore(mirror_dir=str(tmp_path), quota_bytes=len(PNG) * 2, janitor_interval=0.01)
+    context = FakeToolContext([], "alice")
+
+    async def run():
+        for i in range(4):
+            await store.save(context, f"slide_{i}.png", PNG)
+            await store.flush()
+            await asyncio.sleep(0.03)
+        await store.close()
+
+    asyncio.run(run())
+    assert sum(mirrored_files(str(tmp_path)).values()) <= store.quota_bytes
+    stats = store.stats()
+    assert stats["mirrored"] == 4 and stats["janitor_deleted"] == 2 and stats["janitor_runs"] > 1
+    assert len(context.artifacts) == 4
+
+
+def test_deck_names_are_unique_per_deck_slide_and_variant():
+    decks = {new_deck_id() for _ in range(1000)}
+    assert len(decks) == 1000
+    deck = next(iter(decks))
+    names = {image_filename(deck, i, variant) for i in range(1, 4) for variant in ("", "compressed", "thumbnail")}
+    assert len(names) == 9
+
+
+def test_session_ids_cannot_escape_the_mirror(tmp_path):
+    store = ImageStore(mirror_dir=str(tmp_path))
+    path = store.mirror_path("../../etc", "slide.png")
+    assert os.path.dirname(os.path.dirname(path)) == str(tmp_path)
+
+
+@pytest.fixture
+def fake_images(monkeypatch, tmp_path):
+    store = ImageStore(mirror_dir=str(tmp_path))
+    monkeypatch.setattr(image, "image_store", store)
+    monkeypatch.setattr(image_cache, "enabled", False)
+    monkeypatch.setattr(image_variants, "IMAGE_VARIANTS_ENABLED", False)
+    latencies = {f"{session} picture {i}": 0.01 for session in ("alice", "bob") for i in range(3)}
+    monkeypatch.setattr(image, "_client", SimpleNamespace(aio=SimpleNamespace(models=FakeModels(latencies))))
+    return store
+
+
+def test_concurrent_decks_do_not_overwrite_each_other(fake_images):
+    def deck(session_id):
+        slides = [{"heading": f"Slide {i}", "image_description": f"{session_id} picture {i}"} for i in range(3)]
+        return FakeToolContext(slides, session_id)
+
+    contexts = [deck("alice"), deck("bob"), deck("alice")]
+
+    async def run():
+        results = await asyncio.gather(*(image.create_slide_images(context) for context in contexts))
+        await fake_images.close()
+        return results
+
+    assert all(result["status"] == "success" for result in asyncio.run(run()))
+    names = [set(context.artifacts) for context in contexts]
+    assert all(len(n) == 3 for n in names)
+    assert not (names[0] & names[2])
+    for session_id, context in zip(("alice", "bob", "alice"), contexts):
+        for name, versions in context.artifacts.items():
+            assert len(versions) == 1
+            with open(fake_images.mirror_path(session_id, name), "rb") as f:
+                assert f.read() == versions[0].inline_data.data
@@ -0,0 +1,77 @@
+import asyncio
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from sahayak.tools import image_variants
+from sahayak.tools.image_variants import create_variants, make_variants
+
+
+def png(width: int, height: int) -> bytes:
+    # Smooth gradients with a little noise, like an illustration rather than a flat fill
+    y, x = np.mgrid[0:height, 0:width]
+    noise = np.random.default_rng(0).integers(0, 24, (height, width))
+    pixels = np.stack([x * 255 // width, y * 255 // height, (x + y + noise) % 256], axis=-1).astype(np.uint8)
+    out = BytesIO()
+    Image.fromarray(pixels).save(out, format="PNG")
+    return out.getvalue()
+
+
+def opened(data: bytes) -> Image.Image:
+    image = Image.open(BytesIO(data))
+    image.load()
+    return image
+
+
+@pytest.mark.parametrize("fmt, pil_format, mime_type, extension", [
+    ("webp", "WEBP", "image/webp", "webp"),
+    ("jpeg", "JPEG", "image/jpeg", "jpg"),
+])
+def test_variants_are_smaller_and_in_the_requested_format(fmt, pil_format, mime_type, extension):
+    original = png(800, 600)
+    variants = make_variants(original, fmt, 75, 320)
+    assert set(variants) == {"compressed", "thumbnail"}
+    for data, variant_mime, variant_extension in variants.values():
+        assert (variant_mime, variant_extension) == (mime_type, extension)
+        assert opened(data).format == pil_format
+        assert len(data) < len(original)
+
+    assert opened(variants["compressed"][0]).size == (800, 600)
+    # The thumbnail keeps the aspect ratio within the longest-side bound
+    assert opened(variants["thumbnail"][0]).size == (320, 240)
+
+
+def test_small_images_are_not_enlarged():
+    variants = make_variants(png(200, 100), "jpeg", 75, 320)
+    assert opened(variants["thumbnail"][0]).size == (200, 100)
+
+
+def test_compressed_variant_is_skipped_when_it_is_not_smaller():
+    out = BytesIO()
+    Image.new("RGB", (8, 8), "white").save(out, format="PNG")
+    variants = make_variants(out.getvalue(), "jpeg", 95, 320)
+    assert set(variants) == {"thumbnail"}
+
+
+def test_transparent_images_become_jpeg():
+    out = BytesIO()
+    Image.new("RGBA", (400, 300), (255, 0, 0, 128)).save(out, format="PNG")
+    thumbnail = opened(make_variants(out.getvalue(), "jpeg", 75, 100)["thumbnail"][0])
+    assert thumbnail.mode == "RGB" and thumbnail.size == (100, 75)
+
+
+def test_create_variants_runs_in_the_worker_pool(monkeypatch):
+    monkeypatch.setattr(image_variants, "IMAGE_VARIANTS_ENABLED", True)
+    monkeypatch.setattr(image_variants, "IMAGE_VARIANT_FORMAT", "jpeg")
+    try:
+        variants = asyncio.run(create_variants(png(640, 480)))
+    finally:
+        image_variants.shutdown()
+    assert opened(variants["thumbnail"][0]).size == (320, 240)
+
+
+def test_disabled_variants_are_empty(monkeypatch):
+    monkeypatch.setattr(image_variants, "IMAGE_VARIANTS_ENABLED", False)
+    assert asyncio.run(create_variants(png(64, 64))) == {}
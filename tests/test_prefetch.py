@@ -0,0 +1,128 @@
+import asyncio
+
+from sahayak.tools.prefetch import RetrievalPrefetcher, predicted_queries
+
+
+class Fetches:
+    """Coroutine factories that block until released, recording which keys ran."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = []
+
+    def factory(self, key):
+        async def fetch():
+            self.started.append(key)
+            await self.release.wait()
+
+        return fetch
+
+    def keys(self, *keys):
+        return {key: self.factory(key) for key in keys}
+
+
+def never_cached(key):
+    return False
+
+
+def running(prefetcher: RetrievalPrefetcher, session_id: str):
+    session = prefetcher._sessions.get(session_id, {"intents": {}})
+    return sorted(key for tasks in session["intents"].values() for key, task in tasks.items() if not task.done())
+
+
+def test_switching_corpus_cancels_pending_prefetches():
+    async def run():
+        prefetcher = RetrievalPrefetcher(max_concurrency=4)
+        fetches = Fetches()
+        prefetcher.schedule("s1", "grade-6", fetches.keys("a", "b"), never_cached, intent="current_grade")
+        await asyncio.sleep(0)
+        prefetcher.schedule("s1", "grade-7", fetches.keys("c"), never_cached, intent="current_grade")
+        await asyncio.sleep(0)
+        assert prefetcher.cancelled == 2
+        assert running(prefetcher, "s1") == ["c"]
+        fetches.release.set()
+        await asyncio.sleep(0.01)
+        return prefetcher
+
+    prefetcher = asyncio.run(run())
+    assert prefetcher.completed == 1 and prefetcher.stats()["sessions"] == 0
+
+
+def test_new_prediction_cancels_only_dropped_keys():
+    async def run():
+        prefetcher = RetrievalPrefetcher(max_concurrency=4)
+        fetches = Fetches()
+        prefetcher.schedule("s1", "grade-6", fetches.keys("light", "sound", "heat"), never_cached, intent="chapters")
+        await asyncio.sleep(0)
+        started = prefetcher.schedule("s1", "grade-6", fetches.keys("light", "water"), never_cached, intent="chapters")
+        await asyncio.sleep(0)
+        # "light" keeps its running fetch rather than starting another
+        assert started == 1 and fetches.started.count("light") == 1
+        assert prefetcher.cancelled == 2
+        assert running(prefetcher, "s1") == ["light", "water"]
+        fetches.release.set()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+
+def test_other_intents_are_left_running():
+    async def run():
+        prefetcher = RetrievalPrefetcher(max_concurrency=4)
+        fetches = Fetches()
+        prefetcher.schedule("s1", "grade-6", fetches.keys("contents"), never_cached, intent="current_grade")
+        prefetcher.schedule("s1", "grade-6", fetches.keys("light"), never_cached, intent="chapters")
+        prefetcher.schedule("s1", "grade-6", fetches.keys("sound"), never_cached, intent="chapters")
+        await asyncio.sleep(0)
+        assert running(prefetcher, "s1") == ["contents", "sound"]
+        fetches.release.set()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+
+def test_lookups_of_prefetched_keys_count_as_hits():
+    async def run():
+        prefetcher = RetrievalPrefetcher(max_concurrency=4)
+        fetches = Fetches()
+        fetches.release.set()
+        prefetcher.schedule("s1", "grade-6", fetches.keys("a", "b", "c"), never_cached)
+        await asyncio.sleep(0.01)
+        for key in ("a", "a", "b", "unpredicted"):
+            prefetcher.note_lookup(key)
+        return prefetcher
+
+    prefetcher = asyncio.run(run())
+    stats = prefetcher.stats()
+    assert stats["used"] == 2 and stats["hit_rate"] == 2 / 3
+
+
+def test_cancelled_prefetches_are_not_hits():
+    async def run():
+        prefetcher = RetrievalPrefetcher(max_concurrency=4)
+        prefetcher.schedule("s1", "grade-6", Fetches().keys("a"), never_cached)
+        await asyncio.sleep(0)
+        prefetcher.cancel("s1")
+        await asyncio.sleep(0)
+        prefetcher.note_lookup("a")
+        return prefetcher
+
+    assert asyncio.run(run()).used == 0
+
+
+def test_cached_keys_are_not_prefetched():
+    async def run():
+        prefetcher = RetrievalPrefetcher(max_concurrency=4)
+        started = prefetcher.schedule("s1", "grade-6", Fetches().keys("a", "b"), lambda key: key == "a")
+        return prefetcher, started
+
+    prefetcher, started = asyncio.run(run())
+    assert started == 1 and prefetcher.already_cached == 1
+
+
+def test_predictions_follow_the_saved_curriculum():
+    curriculum = {"terms": [{"chapters": [{"name": "Light"}, {"name": "Sound"}]}]}
+    queries = predicted_queries("current_grade", {"grade": 6}, {"curriculum": curriculum})
+    assert len(queries) == 3 and "Light" in queries[1] and "Sound" in queries[2]
+    assert predicted_queries("confirmed_chapters", ["Light"], {}) == queries[1:2]
+    assert predicted_queries("teacher_name", "Asha", {}) == []
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sahayak.tools.rag_cache import RagResultCache
+
+RESULTS = [{"source_uri": "gs://textbooks/grade6.pdf", "text": "Light travels in straight lines."}]
+
+
+@pytest.fixture
+def cache():
+    cache = RagResultCache(maxsize=16, ttl=60)
+    cache.enabled = True
+    return cache
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        yield pool
+
+
+class CountingFetch:
+    def __init__(self, delay: float = 0.0, results=RESULTS):
+        self.calls = 0
+        self.delay = delay
+        self.results = results
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.results
+
+
+def test_miss_then_hit(cache):
+    fetch = CountingFetch()
+    key = cache.make_key("corpus", "How does light travel?", 3, 0.5)
+    assert cache.get_or_fetch(key, fetch) == RESULTS
+    # Case, spacing and trailing punctuation normalise to the same key
+    same = cache.make_key("corpus", "  how does LIGHT travel ", 3, 0.5)
+    assert cache.get_or_fetch(same, fetch) == RESULTS
+    assert fetch.calls == 1
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_other_parameters_miss(cache):
+    fetch = CountingFetch()
+    cache.get_or_fetch(cache.make_key("corpus", "light", 3, 0.5), fetch)
+    cache.get_or_fetch(cache.make_key("corpus", "light", 5, 0.5), fetch)
+    cache.get_or_fetch(cache.make_key("other corpus", "light", 3, 0.5), fetch)
+    assert fetch.calls == 3
+
+
+def test_concurrent_callers_share_one_fetch(cache, executor):
+    fetch = CountingFetch(delay=0.2)
+    key = cache.make_key("corpus", "light", 3, 0.5)
+
+    async def ask_at_once():
+        return await asyncio.gather(
+            *(cache.get_or_fetch_async(key, fetch, executor, timeout=5) for _ in range(10))
+        )
+
+    assert asyncio.run(ask_at_once()) == [RESULTS] * 10
+    assert fetch.calls == 1
+    assert (cache.misses, cache.coalesced) == (1, 9)
+
+
+def test_errors_reach_every_waiter_and_are_not_cached(cache, executor):
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("retrieval service unavailable")
+
+    key = cache.make_key("corpus", "light", 3, 0.5)
+
+    async def ask_at_once():
+        return await asyncio.gather(
+            *(cache.get_or_fetch_async(key, failing, executor, timeout=5) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(e, RuntimeError) for e in asyncio.run(ask_at_once()))
+    assert len(calls) == 1
+    assert cache.get_or_fetch(key, CountingFetch()) == RESULTS
+
+
+def test_timed_out_fetch_still_fills_the_cache(cache, executor):
+    fetch = CountingFetch(delay=0.3)
+    key = cache.make_key("corpus", "light", 3, 0.5)
+
+    async def impatient():
+        with pytest.raises(asyncio.TimeoutError):
+            await cache.get_or_fetch_async(key, fetch, executor, timeout=0.05)
+
+    asyncio.run(impatient())
+    time.sleep(0.4)
+    assert cache.get_or_fetch(key, CountingFetch()) == RESULTS
+    assert fetch.calls == 1
+
+
+def test_fetch_running_across_a_flush_is_not_cached(cache):
+    released = threading.Event()
+    key = cache.make_key("corpus", "light", 3, 0.5)
+    stale = [{"text": "before re-indexing"}]
+    fresh = [{"text": "after re-indexing"}]
+    answers = []
+
+    def slow_fetch():
+        released.wait(5)
+        return stale
+
+    leader = threading.Thread(target=lambda: answers.append(cache.get_or_fetch(key, slow_fetch)))
+    leader.start()
+    time.sleep(0.05)
+    cache.flush("corpus")
+    # New callers don't wait on the fetch from before the flush
+    assert cache.get_or_fetch(key, lambda: fresh) == fresh
+    released.set()
+    leader.join()
+
+    assert answers == [stale]
+    assert cache.get_or_fetch(key, CountingFetch()) == fresh
+    assert cache.stale_fills == 1
+
+
+def test_disabled_cache_always_fetches(cache):
+    cache.enabled = False
+    fetch = CountingFetch()
+    key = cache.make_key("corpus", "light", 3, 0.5)
+    cache.get_or_fetch(key, fetch)
+    cache.get_or_fetch(key, fetch)
+    assert fetch.calls == 2
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from sahayak.tools import rag
+from sahayak.tools.rag_cache import rag_cache
+from sahayak.tools.semantic_cache import semantic_cache
+
+
+class SlowRetrieval:
+    """Stands in for the blocking Vertex AI call, recording how many run at once."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, rag_corpus, query, top_k, threshold):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return [{"source_uri": "gs://textbooks/grade6.pdf", "source_name": "Science", "text": query, "score": 0.2}]
+
+
+@pytest.fixture
+def retrieval(monkeypatch):
+    monkeypatch.setenv("RAG_CORPUS_GRADE_6", "projects/p/locations/l/ragCorpora/grade6")
+    monkeypatch.setattr(rag_cache, "enabled", False)
+    monkeypatch.setattr(semantic_cache, "enabled", False)
+    slow = SlowRetrieval(delay=0.3)
+    monkeypatch.setattr(rag, "_retrieval_query", slow)
+    return slow
+
+
+def query(text: str):
+    return rag.rag_query("", text, SimpleNamespace(state={"current_grade": {"grade": 6}}))
+
+
+def test_rag_query_leaves_the_event_loop_free(retrieval):
+    async def run():
+        ticks = 0
+        task = asyncio.create_task(query("How does light travel?"))
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return ticks, task.result()
+
+    ticks, result = asyncio.run(run())
+    assert result["status"] == "success"
+    # A blocking call would hold the loop for the whole 0.3s retrieval
+    assert ticks >= 10
+
+
+def test_rag_query_times_out_with_an_error_payload(retrieval, monkeypatch):
+    monkeypatch.setattr(rag, "RAG_TIMEOUT_SECONDS", 0.05)
+    result = asyncio.run(query("How does light travel?"))
+    assert result["status"] == "error"
+    assert "timed out" in result["message"]
+    assert result["query"] == "How does light travel?"
+
+
+def test_pool_size_bounds_concurrent_retrievals(retrieval, monkeypatch):
+    retrieval.delay = 0.1
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(rag, "rag_executor", pool)
+
+        async def run():
+            return await asyncio.gather(*(query(f"question {i}") for i in range(6)))
+
+        results = asyncio.run(run())
+    assert all(result["status"] == "success" for result in results)
+    assert retrieval.peak == 2
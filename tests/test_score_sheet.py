@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sahayak.shared_libs.score_sheet import ScoreSheet, parse_score_column
+
+
+def raw_sheet(**extra) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Roll No": ["1", "2", "3"],
+            "Name": ["Asha", "Ravi", "Meena"],
+            "Gender": ["F", "M", "F"],
+            "UT1 - Light (out of 20)": [18, None, 12],
+            "UT1 - Sound (out of 20)": [15, 9, "absent"],
+            "Remarks": ["good", "", "ok"],
+            **extra,
+        }
+    )
+
+
+def test_assessment_headers_are_parsed():
+    column = parse_score_column("Mid Term - Light & Shadows (out of 50)")
+    assert (column.test, column.topic, column.out_of) == ("Mid Term", "Light & Shadows", 50)
+    assert parse_score_column("Remarks") is None
+    assert parse_score_column("UT1 - Light (out of twenty)") is None
+
+
+def test_long_scores_have_one_row_per_score():
+    scores = ScoreSheet(raw_sheet(), grade=6).long_scores()
+    assert list(scores.columns) == ["roll_no", "topic", "grade", "test", "score", "out_of"]
+    rows = sorted(scores.itertuples(index=False, name=None))
+    assert rows == [
+        (1, "Light", "6", "UT1", 18, 20),
+        (1, "Sound", "6", "UT1", 15, 20),
+        (2, "Sound", "6", "UT1", 9, 20),
+        (3, "Light", "6", "UT1", 12, 20),
+    ]
+
+
+def test_blank_and_non_numeric_cells_are_skipped():
+    scores = ScoreSheet(raw_sheet(), grade=6).long_scores()
+    assert not ((scores["roll_no"] == 2) & (scores["topic"] == "Light")).any()
+    assert not ((scores["roll_no"] == 3) & (scores["topic"] == "Sound")).any()
+    # They count as 0 for similarity
+    matrix = ScoreSheet(raw_sheet(), grade=6).score_matrix()
+    np.testing.assert_array_equal(matrix, [[18, 15], [0, 9], [12, 0]])
+
+
+def test_grade_column_wins_over_the_default():
+    scores = ScoreSheet(raw_sheet(Grade=[6, 7, 7]), grade=8).long_scores()
+    assert dict(zip(scores["roll_no"], scores["grade"])) == {1: "6", 2: "7", 3: "7"}
+
+
+def test_repeated_columns_keep_the_last_score():
+    sheet = raw_sheet()
+    sheet.insert(3, "UT1 - Light (out of 20) ", [1, 2, 3])
+    scores = ScoreSheet(sheet, grade=6).long_scores()
+    light = scores[scores["topic"] == "Light"].set_index("roll_no")["score"]
+    assert light.to_dict() == {1: 18, 2: 2, 3: 12}
+
+
+def test_sheet_without_assessments():
+    sheet = ScoreSheet(raw_sheet()[["Roll No", "Name", "Gender"]], grade=6)
+    assert sheet.long_scores().empty
+    assert sheet.score_matrix().shape == (3, 0)
+
+
+def test_invalid_sheets_are_rejected():
+    with pytest.raises(ValueError):
+        ScoreSheet(pd.DataFrame())
+    with pytest.raises(ValueError):
+        ScoreSheet(raw_sheet().drop(columns="Roll No"))
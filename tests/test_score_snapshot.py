@@ -0,0 +1,47 @@
+import pandas as pd
+
+from sahayak.tools.score_snapshot import ScoreSnapshot
+
+COLUMNS = ["roll_no", "name", "topic", "grade", "test", "score", "out_of"]
+
+
+def snapshot(rows) -> ScoreSnapshot:
+    return ScoreSnapshot.from_frame(pd.DataFrame(rows, columns=COLUMNS))
+
+
+ROWS = [
+    (1, "Asha", "Light", "6", "UT1", 18, 20),
+    (2, "Ravi", "Light", "6", "UT1", 12, 20),
+    (1, "Asha", "Light", "6", "UT2", 15, 20),
+    # A relationship without a score still counts, like count(r) in Cypher
+    (2, "Ravi", "Light", "6", "UT2", None, 20),
+    (1, "Asha", "Sound", "6", "UT1", None, 20),
+]
+
+
+def test_statistics_count_rows_and_aggregate_scores():
+    light, sound = snapshot(ROWS).topic_statistics(["Light", "Sound"], ["6"])
+    assert light == {
+        "topic": "Light", "grade": "6", "topic_exists": True,
+        "total_scores": 4, "average_score": 15.0, "min_score": 12, "max_score": 18,
+    }
+    assert sound == {
+        "topic": "Sound", "grade": "6", "topic_exists": True,
+        "total_scores": 1, "average_score": None, "min_score": None, "max_score": None,
+    }
+
+
+def test_statistics_for_a_missing_topic():
+    (row,) = snapshot(ROWS).topic_statistics(["Volcanoes"], ["6"])
+    assert row["topic_exists"] is False and row["total_scores"] == 0
+
+
+def test_null_scores_are_left_out_of_rankings_and_team_means():
+    data = snapshot(ROWS)
+    assert data.top_students("Light", "6", 5) == [
+        {"student_name": "Asha", "score": 18},
+        {"student_name": "Asha", "score": 15},
+        {"student_name": "Ravi", "score": 12},
+    ]
+    (light,) = data.team_scores(["Light"], "6")
+    assert {s["roll_no"]: s["score"] for s in light["scores"]} == {1: 16.5, 2: 12.0}
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from sahayak.tools.embeddings import hashed_embedding
+from sahayak.tools.semantic_cache import SemanticRagCache
+
+CORPUS = "grade-6"
+
+
+class Fetch:
+    def __init__(self, label: str = "retrieved"):
+        self.calls = 0
+        self.label = label
+
+    def __call__(self):
+        self.calls += 1
+        return [{"source_uri": "gs://book.pdf", "text": self.label, "score": 0.3}]
+
+
+def broken(texts):
+    raise RuntimeError("embedding service unavailable")
+
+
+def make_cache(embed, **kwargs) -> SemanticRagCache:
+    cache = SemanticRagCache(embed=embed, threshold=0.8, **kwargs)
+    cache.enabled = True
+    return cache
+
+
+def test_similar_query_reuses_results():
+    cache = make_cache(hashed_embedding)
+    fetch = Fetch()
+    cache.get_or_fetch(CORPUS, "how do plants make their food", 10, 0.6, fetch)
+    cache.get_or_fetch(CORPUS, "How do plants make their food?", 10, 0.6, fetch)
+    assert fetch.calls == 1 and cache.hits == 1
+
+
+def test_failed_embedding_falls_back_to_retrieval():
+    cache = make_cache(broken)
+    fetch = Fetch()
+    results = cache.get_or_fetch(CORPUS, "light", 10, 0.6, fetch)
+    assert results[0]["text"] == "retrieved" and fetch.calls == 1
+    assert cache.stats()["embed_errors"] == 1
+    assert cache.stats()["corpora"] == {}
+
+
+def test_slow_embedding_is_cut_off_and_indexes_late():
+    release = threading.Event()
+
+    def hanging(texts):
+        release.wait(5)
+        return hashed_embedding(texts)
+
+    cache = make_cache(hanging, embed_timeout=0.1)
+    started = time.perf_counter()
+    results = cache.get_or_fetch(CORPUS, "light", 10, 0.6, Fetch())
+    assert results and time.perf_counter() - started < 0.5
+    assert cache.stats()["embed_timeouts"] == 1
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while cache.stats()["corpora"].get(CORPUS) != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.stats()["corpora"].get(CORPUS) == 1
+
+
+def test_breaker_skips_embeddings_until_a_probe_succeeds():
+    calls = []
+
+    def counted(texts):
+        calls.append(texts)
+        return embed(texts)
+
+    embed = broken
+    cache = make_cache(counted, breaker_failures=3, breaker_cooldown=0.2)
+    for i in range(5):
+        assert cache.get_or_fetch(CORPUS, f"query {i}", 10, 0.6, Fetch())
+    stats = cache.stats()
+    assert len(calls) == 3 and stats["breaker_open"] and stats["breaker_skips"] == 2
+
+    embed = hashed_embedding
+    time.sleep(0.2)
+    cache.get_or_fetch(CORPUS, "after cooldown", 10, 0.6, Fetch())
+    assert len(calls) == 4 and not cache.stats()["breaker_open"]
+
+
+@pytest.mark.parametrize("flushed", [CORPUS, None])
+def test_results_fetched_across_a_flush_are_not_indexed(flushed):
+    cache = make_cache(hashed_embedding)
+
+    def fetch_then_flush():
+        cache.flush(flushed)
+        return Fetch()()
+
+    cache.get_or_fetch(CORPUS, "light", 10, 0.6, fetch_then_flush)
+    assert cache.stats()["corpora"] == {} and cache.stats()["stale_fills"] == 1
+
+
+def test_explicit_zero_settings_are_kept():
+    cache = SemanticRagCache(embed=hashed_embedding, threshold=0.0, ttl=0, max_entries=0, embed_timeout=0)
+    assert (cache.threshold, cache.ttl, cache.max_entries, cache.embed_timeout) == (0.0, 0, 0, 0)
+
+
+@pytest.mark.parametrize("setting", [{"ttl": 0}, {"max_entries": 0}])
+def test_zero_ttl_or_capacity_never_reuses_results(setting):
+    cache = make_cache(hashed_embedding, **setting)
+    fetch = Fetch()
+    for _ in range(2):
+        cache.get_or_fetch(CORPUS, "how do plants make their food", 10, 0.6, fetch)
+    assert fetch.calls == 2 and cache.hits == 0
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import MinMaxScaler
+
+from sahayak.shared_libs.similarity import similar_pairs
+
+
+def cohort(n: int = 60, topics: int = 4, seed: int = 0) -> np.ndarray:
+    # Continuous scores, so no two peers tie for a top-k place
+    return np.random.default_rng(seed).random((n, topics)) * 20
+
+
+def dense_picks(matrix, threshold, k):
+    """Each student's picks, from the full cosine similarity matrix."""
+    similarity = cosine_similarity(MinMaxScaler().fit_transform(matrix))
+    np.fill_diagonal(similarity, -np.inf)
+    picks = {}
+    for i, row in enumerate(similarity):
+        peers = np.argsort(-row, kind="stable")[:k] if k else np.arange(len(row))
+        picks[i] = {int(j): float(row[j]) for j in peers if row[j] > threshold}
+    return picks
+
+
+def as_dict(i, j, sim):
+    return {(int(a), int(b)): float(s) for a, b, s in zip(i, j, sim)}
+
+
+def assert_same_pairs(actual, expected):
+    assert set(actual) == set(expected)
+    for pair, sim in expected.items():
+        assert actual[pair] == pytest.approx(sim, abs=1e-5)
+
+
+def undirected(picks):
+    return {(min(i, j), max(i, j)): sim for i, peers in picks.items() for j, sim in peers.items()}
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.85, 0.95])
+@pytest.mark.parametrize("k", [None, 3])
+@pytest.mark.parametrize("memory_mb", [256, 0.001])
+def test_matches_dense_cosine_similarity(threshold, k, memory_mb):
+    matrix = cohort()
+    # memory_mb=0.001 computes one student per block
+    actual = as_dict(*similar_pairs(matrix, threshold=threshold, max_neighbours=k, memory_mb=memory_mb))
+    assert_same_pairs(actual, undirected(dense_picks(matrix, threshold, k)))
+    assert all(i < j for i, j in actual)
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.85])
+@pytest.mark.parametrize("k", [None, 3])
+def test_directed_rows_are_those_students_own_picks(threshold, k):
+    matrix = cohort()
+    rows = np.array([0, 7, 8, 41])
+    expected = dense_picks(matrix, threshold, k)
+    actual = as_dict(*similar_pairs(matrix, threshold=threshold, max_neighbours=k, rows=rows, directed=True))
+    assert_same_pairs(actual, {(i, j): sim for i in rows.tolist() for j, sim in expected[i].items()})
+
+
+@pytest.mark.parametrize("k", [None, 3])
+def test_undirected_rows_cover_those_students_pairs(k):
+    matrix = cohort()
+    rows = np.array([3, 4, 50])
+    picks = dense_picks(matrix, 0.85, k)
+    if k:
+        # Top-k: the queried students' own picks, not everyone else's
+        expected = undirected({i: picks[i] for i in rows.tolist()})
+    else:
+        expected = {pair: sim for pair, sim in undirected(picks).items() if set(pair) & set(rows.tolist())}
+    actual = as_dict(*similar_pairs(matrix, threshold=0.85, max_neighbours=k, rows=rows, memory_mb=0.001))
+    assert_same_pairs(actual, expected)
+
+
+def test_top_k_bounds_pairs_per_student():
+    matrix = cohort(n=200)
+    i, j, _ = similar_pairs(matrix, threshold=0.0, max_neighbours=2)
+    assert len(i) <= 200 * 2
+    # Every student picks its two peers, so nobody is left out
+    assert set(i) | set(j) == set(range(200))
+
+
+def test_tiny_or_empty_cohorts_have_no_pairs():
+    for matrix in (np.empty((0, 3)), np.ones((1, 3)), np.empty((5, 0))):
+        i, j, sim = similar_pairs(matrix)
+        assert len(i) == len(j) == len(sim) == 0
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+from sahayak.tools.slide_events import SlideEventBroker
+
+
+def replay(broker: SlideEventBroker, session_id: str, after=None):
+    """The events a client connecting now would get before waiting for live ones."""
+
+    async def run():
+        received = []
+        events = broker.subscribe(session_id, after=after)
+        try:
+            while True:
+                received.append(await asyncio.wait_for(events.__anext__(), 0.05))
+        except asyncio.TimeoutError:
+            return received
+        finally:
+            await events.aclose()
+
+    return [event["slide"] for event in asyncio.run(run())]
+
+
+def publish(broker: SlideEventBroker, session_id: str, slides):
+    return [broker.publish(session_id, "slide_ready", slide=slide) for slide in slides]
+
+
+def test_reconnect_resumes_after_the_last_event_id():
+    broker = SlideEventBroker()
+    events = publish(broker, "s1", range(1, 6))
+    assert replay(broker, "s1", after=events[2]["id"]) == [4, 5]
+    assert replay(broker, "s1", after=events[-1]["id"]) == []
+    assert replay(broker, "s1") == [1, 2, 3, 4, 5]
+
+
+def test_ids_from_before_a_restart_replay_everything_kept():
+    before = SlideEventBroker()
+    old = publish(before, "s1", range(50))
+    time.sleep(0.001)
+    after = SlideEventBroker()
+    assert after.generation != before.generation
+    publish(after, "s1", [1, 2, 3])
+    # The old id's sequence (50) is past every new one, but belongs to another generation
+    assert replay(after, "s1", after=old[-1]["id"]) == [1, 2, 3]
+
+
+def test_malformed_ids_replay_everything_kept():
+    broker = SlideEventBroker()
+    publish(broker, "s1", [1, 2])
+    for last_event_id in ("", "garbage", f"{broker.generation}-x", f"{broker.generation}"):
+        assert replay(broker, "s1", after=last_event_id) == [1, 2]
+
+
+def test_sessions_do_not_see_each_others_events():
+    broker = SlideEventBroker()
+    publish(broker, "s1", [1])
+    publish(broker, "s2", [2])
+    assert replay(broker, "s1") == [1] and replay(broker, "s2") == [2]
+
+
+def test_slow_subscribers_lose_the_oldest_events_instead_of_blocking():
+    broker = SlideEventBroker(queue_size=2)
+
+    async def run():
+        events = broker.subscribe("s1")
+        first = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        publish(broker, "s1", range(1, 6))
+        publishing = time.perf_counter() - started
+        received = [await first, await events.__anext__()]
+        await events.aclose()
+        return publishing, [event["slide"] for event in received]
+
+    publishing, received = asyncio.run(run())
+    assert publishing < 0.05
+    assert received == [4, 5]
+    assert broker.dropped == 3
+    assert broker.stats()["subscribers"] == 0
+
+
+def test_history_is_bounded_per_session_and_across_sessions():
+    broker = SlideEventBroker(history=3, max_sessions=2)
+    publish(broker, "s1", range(1, 6))
+    assert replay(broker, "s1") == [3, 4, 5]
+    publish(broker, "s2", [1])
+    publish(broker, "s3", [1])
+    assert replay(broker, "s1") == []
+    assert broker.stats()["sessions"] == 2
@@ -0,0 +1,81 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import main
+from sahayak.tools.session_key import SESSION_KEY_STATE
+from sahayak.tools.slide_events import slide_events
+
+
+class FakeRequest:
+    def __init__(self, disconnected: bool = False):
+        self.disconnected = disconnected
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+class Sessions:
+    """Stands in for the ADK get_session route: hands out the states in turn, then keeps the last."""
+
+    def __init__(self, *states):
+        self.states = list(states)
+        self.calls = 0
+
+    async def __call__(self, app_name, user_id, session_id):
+        state = self.states[min(self.calls, len(self.states) - 1)]
+        self.calls += 1
+        if state is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        return SimpleNamespace(state=state)
+
+
+def stream(monkeypatch, sessions, request=None, wait=5.0, stop_after=None):
+    monkeypatch.setattr(main, "get_session", sessions)
+    monkeypatch.setattr(main, "SLIDE_EVENT_KEY_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(main, "SLIDE_EVENT_KEY_WAIT_SECONDS", wait)
+
+    async def run():
+        response = await main.stream_slide_events(request or FakeRequest(), "sahayak", "teacher", "s1", None)
+        received = []
+        async for message in response.body_iterator:
+            received.append(message)
+            if stop_after and len(received) == stop_after:
+                break
+        return received
+
+    return asyncio.run(asyncio.wait_for(run(), 5))
+
+
+def test_stream_ends_when_no_turn_sets_the_key(monkeypatch):
+    sessions = Sessions({})
+    assert stream(monkeypatch, sessions, wait=0.1) == []
+    assert sessions.calls > 1
+
+
+def test_stream_ends_when_the_session_is_deleted(monkeypatch):
+    sessions = Sessions({}, {}, None)
+    assert stream(monkeypatch, sessions) == []
+    assert sessions.calls == 3
+
+
+def test_stream_stops_polling_once_the_client_is_gone(monkeypatch):
+    sessions = Sessions({})
+    assert stream(monkeypatch, sessions, request=FakeRequest(disconnected=True)) == []
+    assert sessions.calls == 1
+
+
+def test_missing_session_is_404(monkeypatch):
+    with pytest.raises(HTTPException) as error:
+        stream(monkeypatch, Sessions(None))
+    assert error.value.status_code == 404
+
+
+def test_stream_follows_the_key_once_the_first_turn_sets_it(monkeypatch):
+    event = slide_events.publish("key-1", "deck_started", slides=2)
+    received = stream(monkeypatch, Sessions({}, {SESSION_KEY_STATE: "key-1"}), stop_after=1)
+    assert received[0]["id"] == event["id"]
+    assert json.loads(received[0]["data"])["slides"] == 2
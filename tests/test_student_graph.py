@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import student_graph
+from benchmarks.incremental_import import FakeDriver, FakeGraph, picks
+from benchmarks.synthetic import synthetic_scores, to_score_sheet
+
+STUDENTS = 120
+
+
+def sheet(topics, seed):
+    return to_score_sheet(
+        synthetic_scores(STUDENTS, topics=topics, tests=["UT1", "UT2"], seed=seed)
+    )
+
+
+@pytest.fixture
+def sheets(tmp_path):
+    """Two sheets over the same students, one per subject."""
+    science, english = tmp_path / "science.csv", tmp_path / "english.csv"
+    sheet(["Light", "Sound", "Water"], seed=1).to_csv(science, index=False)
+    sheet(["Grammar", "Poems"], seed=2).to_csv(english, index=False)
+    return str(science), str(english)
+
+
+def import_all(monkeypatch, paths, incremental=False, graph=None):
+    graph = graph or FakeGraph()
+    monkeypatch.setattr(student_graph, "driver", FakeDriver(graph))
+    for path in paths:
+        student_graph.import_file(path, "6", incremental=incremental)
+    return graph
+
+
+def test_overlapping_sheets_link_the_same_in_either_order(monkeypatch, sheets):
+    forward = import_all(monkeypatch, sheets)
+    backward = import_all(monkeypatch, reversed(sheets))
+
+    assert picks(forward) == picks(backward)
+    assert forward.scores == backward.scores
+    # Each sheet keeps its own picks instead of the last one replacing the other's
+    sources = {source for _, _, source in forward.edges}
+    assert sources == {student_graph.sheet_source(path) for path in sheets}
+
+
+def test_incremental_reimport_of_one_sheet_matches_a_full_import(monkeypatch, sheets):
+    science, english = sheets
+    incremental = import_all(monkeypatch, sheets, incremental=True)
+
+    edited = sheet(["Light", "Sound", "Water"], seed=1)
+    columns = [c for c in edited.columns if "out of" in c]
+    # Keep every column's range, so only affected students are re-linked
+    edited.loc[0, columns], edited.loc[1, columns] = 0, 10
+    edited.to_csv(science, index=False)
+    import_all(monkeypatch, sheets, incremental=True, graph=incremental)
+
+    rng = np.random.default_rng(3)
+    rows = rng.choice(np.arange(2, STUDENTS), size=15, replace=False)
+    edited = edited.astype({c: float for c in columns})
+    edited.loc[rows, columns[0]] = rng.integers(0, 11, size=len(rows))
+    edited.loc[rows[:5], columns[1]] = np.nan
+    edited.to_csv(science, index=False)
+    import_all(monkeypatch, [science], incremental=True, graph=incremental)
+
+    full = import_all(monkeypatch, sheets)
+    assert incremental.scores == full.scores
+    assert picks(incremental) == picks(full)
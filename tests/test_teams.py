@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from sahayak.tools.teams import form_teams, greedy_balance, group_similar, snake_draft
+
+# Combined scores whose best split into two teams of two is exact: .9+.1 and .8+.2
+BALANCED = np.array([[0.9, 0.9], [0.8, 0.8], [0.2, 0.2], [0.1, 0.1]])
+TOPICS = ["Light", "Sound"]
+
+
+def cohort(n: int, seed: int = 0):
+    scores = np.random.default_rng(seed).random((n, len(TOPICS)))
+    return [f"Student {i}" for i in range(n)], list(range(1, n + 1)), scores
+
+
+@pytest.mark.parametrize("n, n_teams", [(10, 3), (31, 4), (7, 7), (100, 9)])
+def test_team_sizes_differ_by_at_most_one(n, n_teams):
+    combined = np.random.default_rng(n).random(n)
+    for assignment in (snake_draft(combined, n_teams), greedy_balance(combined, n_teams)):
+        counts = np.bincount(assignment, minlength=n_teams)
+        assert counts.sum() == n and counts.max() - counts.min() <= 1
+
+
+@pytest.mark.parametrize("strategy", ["snake", "greedy"])
+def test_known_scores_split_into_equal_teams(strategy):
+    result = form_teams(["A", "B", "C", "D"], [1, 2, 3, 4], BALANCED, TOPICS, team_size=2, strategy=strategy)
+    teams = [sorted(m["roll_no"] for m in team["members"]) for team in result["teams"]]
+    assert sorted(teams) == [[1, 4], [2, 3]]
+    assert [team["mean"] for team in result["teams"]] == [50.0, 50.0]
+    assert result["summary"]["team_mean_range"] == 0.0
+
+
+def test_greedy_keeps_avoided_pairs_apart():
+    combined = np.array([0.9, 0.8, 0.7, 0.3, 0.2, 0.1])
+    # Unconstrained, students 2 and 3 end up on the same team
+    assert greedy_balance(combined, 3)[2] == greedy_balance(combined, 3)[3]
+    assignment = greedy_balance(combined, 3, avoid={2: {3}, 3: {2}})
+    assert assignment[2] != assignment[3]
+    assert np.bincount(assignment).tolist() == [2, 2, 2]
+
+
+def test_mix_mode_separates_similar_peers():
+    names, roll_nos, scores = cohort(30)
+    pairs = [(1, 2), (3, 4), (5, 6), (7, 8)]
+    result = form_teams(names, roll_nos, scores, TOPICS, team_size=3, similar_pairs=pairs, peer_similarity="mix")
+    team_of = {m["roll_no"]: t for t, team in enumerate(result["teams"]) for m in team["members"]}
+    assert result["strategy"] == "greedy_mix_similar"
+    assert all(team_of[a] != team_of[b] for a, b in pairs)
+
+
+def test_group_similar_joins_connected_peers():
+    combined = np.array([0.9, 0.1, 0.5, 0.8, 0.7, 0.2])
+    # 0-1-5 are linked through 1, so they form one component led by 0's score
+    assignment = group_similar(combined, 2, 3, [(0, 1), (1, 5)])
+    assert assignment.tolist() == [0, 0, 1, 1, 1, 0]
+
+
+def test_form_teams_result_shape():
+    names, roll_nos, scores = cohort(10)
+    result = form_teams(names, roll_nos, scores, TOPICS, team_size=3)
+    assert result["type"] == "study_buddy" and result["strategy"] == "snake"
+    assert result["students"] == 10 and len(result["teams"]) == 4
+    members = [m for team in result["teams"] for m in team["members"]]
+    assert sorted(m["roll_no"] for m in members) == roll_nos
+    for team in result["teams"]:
+        assert set(team) == {"name", "members", "mean", "spread"}
+    for member in members:
+        assert set(member) == {"name", "roll_no", "scores", "strengths", "needs_help"}
+        assert set(member["scores"]) == set(TOPICS)
+        assert sorted(member["strengths"] + member["needs_help"]) == sorted(TOPICS)
+
+
+def test_fewer_students_than_a_team_make_one_team():
+    result = form_teams(["A", "B"], [1, 2], BALANCED[:2], TOPICS, team_size=3)
+    assert len(result["teams"]) == 1
+    assert [m["roll_no"] for m in result["teams"][0]["members"]] == [1, 2]
+    assert result["summary"]["team_mean_range"] == 0.0
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        form_teams(["A"], [1], BALANCED[:1], TOPICS, strategy="random")